@@ -0,0 +1,212 @@
+# benchmarks/load.py
+"""
+Load test for `gastrack start --workers N`.
+
+For each worker count, starts a real server (uvicorn, own temporary database
+seeded with synthetic data), drives it from several client processes for a fixed
+duration with a mixed workload, then checks ingest correctness: every reading
+acknowledged with 201 must be in the database exactly once.
+
+    python -m benchmarks.load --workers 1 2 4 --clients 8 --duration 15
+
+The gain from extra workers depends on free cores: client processes compete for
+the same CPUs, so leave some headroom (or run the clients on another machine).
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import msgspec
+
+from benchmarks.suite import REPO_ROOT, RESULTS_DIR, _latency_stats, _meta, write_results
+from benchmarks.synthetic import DEFAULT_START, iter_reading_batches
+
+SEED_DAYS = 60
+INGEST_ROWS = 100
+
+# (operation, weight): ingest writes, the rest is the dashboard / report read mix.
+WORKLOAD = (
+    ("ingest", 2),
+    ("readings_one_day", 4),
+    ("latest", 2),
+    ("report_month", 2),
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _seed(db_path: Path) -> int:
+    """Fill a fresh database in a child interpreter (GASTRACK_DB_PATH is read at import)."""
+    code = (
+        "from benchmarks.synthetic import daily_flows, iter_reading_batches\n"
+        "from src.gastrack.db import connection, crud\n"
+        "connection.init_db()\n"
+        f"crud.ingest_daily_flow_inputs(daily_flows({SEED_DAYS}))\n"
+        f"print(sum(crud.ingest_analyzer_readings(b) for b in iter_reading_batches({SEED_DAYS})))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, env={**os.environ, "GASTRACK_DB_PATH": str(db_path)},
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return int(out.strip().splitlines()[-1])
+
+
+def _wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/api/factors", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout}s.")
+
+
+def _client(base_url: str, duration: float, client_id: int, results) -> None:
+    """One client process: weighted random operations back-to-back until the deadline."""
+    import httpx
+
+    rng = random.Random(client_id)
+    names = [name for name, _ in WORKLOAD]
+    weights = [weight for _, weight in WORKLOAD]
+    encoder = msgspec.msgpack.Encoder()
+    # Fresh time range per client, so ingested rows never collide with the seed data or each other.
+    ingest_start = DEFAULT_START + timedelta(days=SEED_DAYS + 30 * (client_id + 1))
+    batches = iter_reading_batches(30, 1, INGEST_ROWS, start=ingest_start, seed=client_id)
+    month = DEFAULT_START.strftime("%Y-%m")
+
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    ingested = 0
+    with httpx.Client(base_url=base_url, timeout=30.0) as http:
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            op = rng.choices(names, weights)[0]
+            if op == "ingest":
+                batch = next(batches)
+                request = lambda: http.post(
+                    "/api/readings/ingest", content=encoder.encode(batch),
+                    headers={"Content-Type": "application/msgpack"},
+                )
+            elif op == "readings_one_day":
+                day = DEFAULT_START + timedelta(days=rng.randrange(SEED_DAYS))
+                request = lambda: http.get(
+                    "/api/readings", params={"sample_point": "Inlet", "start": day.date().isoformat(),
+                                             "end": (day + timedelta(days=1)).date().isoformat()},
+                    headers={"Accept": "application/msgpack"},
+                )
+            elif op == "latest":
+                request = lambda: http.get("/api/analyzer/latest", params={"point": "Outlet"})
+            else:
+                request = lambda: http.get("/api/reports/emissions", params={"month": month})
+
+            t0 = time.perf_counter()
+            try:
+                response = request()
+                ok = response.status_code < 300
+            except httpx.HTTPError:
+                ok = False
+            latencies[op].append(time.perf_counter() - t0)
+            if not ok:
+                errors[op] += 1
+            elif op == "ingest":
+                ingested += len(batch)
+    results.put({"latencies": latencies, "errors": errors, "ingested": ingested})
+
+
+def run_load(workers: int, clients: int, duration: float) -> Dict[str, object]:
+    with tempfile.TemporaryDirectory(prefix="gastrack-load-") as tmp:
+        db_path = Path(tmp) / "load.db"
+        seeded = _seed(db_path)
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "src.main", "start", "--port", str(port), "--workers", str(workers)],
+            cwd=REPO_ROOT, env={**os.environ, "GASTRACK_DB_PATH": str(db_path)},
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_ready(base_url)
+            queue = multiprocessing.Queue()
+            procs = [
+                multiprocessing.Process(target=_client, args=(base_url, duration, i, queue)) for i in range(clients)
+            ]
+            started = time.perf_counter()
+            for proc in procs:
+                proc.start()
+            outcomes = [queue.get() for _ in procs]
+            for proc in procs:
+                proc.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            stored = conn.execute("SELECT COUNT(*) FROM ts_analyzer_reading").fetchone()[0]
+        finally:
+            conn.close()
+
+    ops: Dict[str, Dict[str, object]] = {}
+    for name, _ in WORKLOAD:
+        samples = [s for o in outcomes for s in o["latencies"][name]]
+        errors = sum(o["errors"][name] for o in outcomes)
+        ops[name] = {**(_latency_stats(samples) if samples else {"n": 0}), "errors": errors}
+    requests = sum(op["n"] for op in ops.values())
+    ingested = sum(o["ingested"] for o in outcomes)
+    return {
+        "workers": workers,
+        "clients": clients,
+        "seconds": round(elapsed, 3),
+        "requests": requests,
+        "requests_per_sec": round(requests / elapsed, 1),
+        "ingested_rows": ingested,
+        "ingest_rows_per_sec": round(ingested / elapsed, 1),
+        "ingest_correct": stored == seeded + ingested,
+        "operations": ops,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load per worker count")
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    runs = []
+    for workers in args.workers:
+        result = run_load(workers, args.clients, args.duration)
+        runs.append(result)
+        print(
+            f"workers={workers}: {result['requests_per_sec']} req/s, "
+            f"{result['ingest_rows_per_sec']} ingest rows/s, ingest correct: {result['ingest_correct']}"
+        )
+
+    results = {"meta": {**_meta(), "cpu_count": os.cpu_count()}, "runs": runs}
+    out = args.out or RESULTS_DIR / f"load-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}.json"
+    print(f"Results written to {write_results(results, out)}")
+    return 0 if all(run["ingest_correct"] for run in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+# benchmarks/suite.py
+"""
+GasTrack performance benchmarks.
+
+Measures, on a database filled with synthetic data (benchmarks/synthetic.py):
+- ingest rows/sec through crud.ingest_analyzer_readings and through POST /api/readings/ingest
+- query latency of the read endpoints and of crud.get_readings_page
+- emissions report computation time (crud/calcs and GET /api/reports/emissions)
+- peak RSS and database file size
+
+Results are written as JSON so runs can be compared between releases.
+The HTTP numbers go through Starlette's in-process TestClient: they include
+routing, decoding, the write queue and encoding, but no network.
+
+Standalone (uses its own database file, never gastrack.db):
+    python -m benchmarks.suite --days 365 --out bench.json
+    python -m benchmarks.suite --days 365 --compare benchmarks/results/previous.json
+Under pytest, tests/test_benchmarks.py runs a small-scale smoke version.
+"""
+import argparse
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tomllib
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import msgspec
+
+from benchmarks.synthetic import ALL_SAMPLE_POINTS, DEFAULT_START, daily_flows, iter_reading_batches
+
+try:
+    import resource  # POSIX only
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+DEFAULT_DAYS = 365
+DEFAULT_INTERVAL_MINUTES = 15
+DEFAULT_API_DAYS = 7
+DEFAULT_REPEAT = 50
+CRUD_BATCH_ROWS = 5000
+API_BATCH_ROWS = 500
+
+MSGPACK_HEADERS = {"Content-Type": "application/msgpack", "Accept": "application/msgpack"}
+
+
+# --- Measurement helpers ---
+
+def _latency_stats(samples: List[float]) -> Dict[str, float]:
+    """Seconds in, milliseconds out."""
+    ms = sorted(s * 1000 for s in samples)
+    p50, p95 = (statistics.quantiles(ms, n=100, method="inclusive")[i] for i in (49, 94)) if len(ms) > 1 else (ms[0], ms[0])
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def _time_calls(fn: Callable[[int], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t0)
+    return _latency_stats(samples)
+
+
+def _throughput(rows: int, seconds: float) -> Dict[str, float]:
+    return {"rows": rows, "seconds": round(seconds, 3), "rows_per_sec": round(rows / seconds, 1) if seconds else None}
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # bytes on macOS, KiB on Linux
+
+
+def db_size_bytes(db_path: Path) -> Dict[str, int]:
+    """Main file size after a WAL checkpoint, plus whatever is left in the WAL."""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    wal = db_path.with_name(db_path.name + "-wal")
+    return {"db_bytes": db_path.stat().st_size, "wal_bytes": wal.stat().st_size if wal.exists() else 0}
+
+
+# --- Benchmarks ---
+
+def bench_crud_ingest(days: int, interval_minutes: int, start: datetime, seed: int) -> Dict[str, float]:
+    from src.gastrack.db import crud
+
+    rows, elapsed = 0, 0.0
+    for batch in iter_reading_batches(days, interval_minutes, CRUD_BATCH_ROWS, start=start, seed=seed):
+        t0 = time.perf_counter()  # time the inserts only, not the generator
+        rows += crud.ingest_analyzer_readings(batch)
+        elapsed += time.perf_counter() - t0
+    return _throughput(rows, elapsed)
+
+
+def bench_api_ingest(client, days: int, interval_minutes: int, start: datetime, seed: int) -> Dict[str, float]:
+    encoder = msgspec.msgpack.Encoder()
+    rows, elapsed = 0, 0.0
+    for batch in iter_reading_batches(days, interval_minutes, API_BATCH_ROWS, start=start, seed=seed):
+        body = encoder.encode(batch)
+        t0 = time.perf_counter()
+        response = client.post("/api/readings/ingest", content=body, headers=MSGPACK_HEADERS)
+        elapsed += time.perf_counter() - t0
+        response.raise_for_status()
+        rows += len(batch)
+    return _throughput(rows, elapsed)
+
+
+def bench_queries(client, days: int, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    from src.gastrack.db import crud
+
+    rng = random.Random(seed)
+    day_starts = [DEFAULT_START + timedelta(days=rng.randrange(days)) for _ in range(repeat)]
+
+    def day_window(i):
+        return day_starts[i].date().isoformat(), (day_starts[i] + timedelta(days=1)).date().isoformat()
+
+    def get(url):
+        response = client.get(url, headers={"Accept": "application/msgpack"})
+        response.raise_for_status()
+
+    return {
+        "api_readings_one_day": _time_calls(
+            lambda i: get("/api/readings?sample_point=Inlet&start={}&end={}&limit=1000".format(*day_window(i))), repeat
+        ),
+        "api_readings_daily_all": _time_calls(lambda i: get("/api/readings/daily?sample_point=Outlet"), repeat),
+        # A distinct point count per call defeats the series cache; the cached variant reuses one.
+        "api_series_full_range": _time_calls(
+            lambda i: get(f"/api/readings/series?sample_point=Inlet&channel=h2s_ppm&points={1000 + i}"), repeat
+        ),
+        "api_series_full_range_cached": _time_calls(
+            lambda i: get("/api/readings/series?sample_point=Inlet&channel=h2s_ppm&points=1000"), repeat
+        ),
+        "api_latest": _time_calls(lambda i: get("/api/analyzer/latest?point=Inlet"), repeat),
+        "api_factors": _time_calls(lambda i: get("/api/factors"), repeat),
+        "crud_readings_page_one_day": _time_calls(
+            lambda i: crud.get_readings_page("Inlet", day_starts[i], day_starts[i] + timedelta(days=1), limit=1000),
+            repeat,
+        ),
+    }
+
+
+def bench_reports(client, days: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    from src.gastrack.core import calcs
+
+    start = DEFAULT_START.date().isoformat()
+    end = (DEFAULT_START + timedelta(days=days)).date().isoformat()
+    month = DEFAULT_START.strftime("%Y-%m")
+    reports = {
+        "calcs_month": _time_calls(lambda i: calcs.compute_monthly_report(month), repeat),
+        "calcs_full_range": _time_calls(lambda i: calcs.compute_report(start, end), max(1, repeat // 10)),
+    }
+
+    def api_month(i):
+        client.get(f"/api/reports/emissions?month={month}").raise_for_status()
+
+    reports["api_month"] = _time_calls(api_month, repeat)
+    return reports
+
+
+def _meta() -> Dict[str, object]:
+    try:
+        version = tomllib.loads((REPO_ROOT / "pyproject.toml").read_text())["project"]["version"]
+    except (OSError, KeyError, tomllib.TOMLDecodeError):
+        version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "gastrack_version": version,
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def run(
+    days: int = DEFAULT_DAYS,
+    interval_minutes: int = DEFAULT_INTERVAL_MINUTES,
+    api_days: int = DEFAULT_API_DAYS,
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+    client=None,
+) -> Dict[str, object]:
+    """
+    Run every benchmark against the database at connection.DB_PATH, which must be
+    freshly initialised (the caller owns it: a temp file standalone, the test DB under pytest).
+    Pass an already running TestClient to reuse its app; otherwise one is started here.
+    """
+    from starlette.testclient import TestClient
+    from src.gastrack.core.server import get_app
+    from src.gastrack.db import crud
+    from src.gastrack.db.connection import DB_PATH
+
+    results: Dict[str, object] = {
+        "meta": _meta(),
+        "params": {
+            "days": days, "interval_minutes": interval_minutes, "api_days": api_days,
+            "repeat": repeat, "seed": seed, "sample_points": len(ALL_SAMPLE_POINTS),
+        },
+    }
+    with (TestClient(get_app()) if client is None else nullcontext(client)) as client:
+        crud.ingest_daily_flow_inputs(daily_flows(days + api_days, seed=seed))
+        results["ingest"] = {
+            "crud": bench_crud_ingest(days, interval_minutes, DEFAULT_START, seed),
+            # After the crud range, so both ingest paths write fresh rollup days.
+            "api": bench_api_ingest(client, api_days, interval_minutes, DEFAULT_START + timedelta(days=days), seed + 1),
+        }
+        results["queries"] = bench_queries(client, days, repeat, seed)
+        results["reports"] = bench_reports(client, days, repeat)
+    results["resources"] = {"peak_rss_bytes": peak_rss_bytes(), **db_size_bytes(Path(DB_PATH))}
+    return results
+
+
+# --- Results files ---
+
+def write_results(results: Dict[str, object], path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(msgspec.json.format(msgspec.json.encode(results), indent=2) + b"\n")
+    return path
+
+
+def _flatten(tree: Dict[str, object], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in tree.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(previous: Dict[str, object], current: Dict[str, object]) -> List[tuple]:
+    """(metric, previous, current, current/previous) for every numeric metric present in both runs."""
+    before = _flatten({k: v for k, v in previous.items() if k not in ("meta", "params")})
+    after = _flatten({k: v for k, v in current.items() if k not in ("meta", "params")})
+    return [
+        (name, before[name], after[name], round(after[name] / before[name], 3) if before[name] else None)
+        for name in sorted(before.keys() & after.keys())
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="days of readings ingested through crud")
+    parser.add_argument("--interval-minutes", type=int, default=DEFAULT_INTERVAL_MINUTES)
+    parser.add_argument("--api-days", type=int, default=DEFAULT_API_DAYS, help="days of readings posted to the API")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="samples per latency measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="results file (default benchmarks/results/bench-<version>-<time>.json)")
+    parser.add_argument("--db", type=Path, help="database file to fill (default: a temp file, deleted afterwards)")
+    parser.add_argument("--compare", type=Path, help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    tmp_dir = None
+    db_path = args.db
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory(prefix="gastrack-bench-")
+        db_path = Path(tmp_dir.name) / "bench.db"
+    elif db_path.exists():
+        parser.error(f"{db_path} already exists; benchmarks need an empty database.")
+    # Must be set before anything imports src.gastrack.db.connection.
+    os.environ["GASTRACK_DB_PATH"] = str(db_path)
+
+    try:
+        results = run(args.days, args.interval_minutes, args.api_days, args.repeat, args.seed)
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    out = args.out or RESULTS_DIR / "bench-{}-{}.json".format(
+        results["meta"]["gastrack_version"], datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    )
+    print(f"Results written to {write_results(results, out)}")
+    for section in ("ingest", "resources"):
+        print(section, msgspec.json.encode(results[section]).decode())
+
+    if args.compare:
+        previous = msgspec.json.decode(args.compare.read_bytes())
+        print(f"\n{'metric':<50} {'previous':>14} {'current':>14} {'ratio':>7}")
+        for name, before, after, ratio in compare(previous, results):
+            print(f"{name:<50} {before:>14} {after:>14} {ratio if ratio is not None else '-':>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
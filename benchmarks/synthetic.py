@@ -0,0 +1,96 @@
+# benchmarks/synthetic.py
+"""
+Deterministic synthetic biogas data for benchmarks.
+
+Readings look like the analyzer export: every sample point is visited once per
+interval (with a few seconds of jitter, so the series is irregular), CH4 drifts
+slowly with a daily cycle, CO2/O2/N2 fill the balance, H2S is high at the Inlet
+and scrubbed down at the Outlet, and a small share of channels is missing.
+Generated lazily in batches so years of data never sit in memory at once.
+"""
+import math
+import random
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Sequence, get_args
+
+from src.gastrack.core.models import AnalyzerReading, DailyFlowInput, SAMPLE_POINTS
+
+ALL_SAMPLE_POINTS: Sequence[str] = get_args(SAMPLE_POINTS)
+DEFAULT_START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+# Typical H2S (ppm) per point: raw gas at the Inlet, scrubber sheets in between, clean gas at the Outlet.
+_H2S_BASE = {"Inlet": 2200.0, "Outlet": 40.0, **{f"Sheet {i}": 2200.0 / (i + 1) for i in range(1, 7)}}
+
+# MJ/m3 of pure methane, net and gross.
+_CH4_NET_MJ_M3 = 35.89
+_CH4_GROSS_MJ_M3 = 39.82
+
+MISSING_CHANNEL_RATE = 0.02
+
+
+def _maybe(rng: random.Random, value: float, digits: int) -> Optional[float]:
+    return None if rng.random() < MISSING_CHANNEL_RATE else round(value, digits)
+
+
+def reading_count(days: int, interval_minutes: int, sample_points: Sequence[str] = ALL_SAMPLE_POINTS) -> int:
+    return days * (24 * 60 // interval_minutes) * len(sample_points)
+
+
+def iter_reading_batches(
+    days: int,
+    interval_minutes: int = 15,
+    batch_size: int = 5000,
+    start: datetime = DEFAULT_START,
+    sample_points: Sequence[str] = ALL_SAMPLE_POINTS,
+    seed: int = 0,
+) -> Iterator[List[AnalyzerReading]]:
+    """Yield lists of at most batch_size readings, in timestamp order."""
+    rng = random.Random(seed)
+    step = timedelta(minutes=interval_minutes)
+    steps = days * (24 * 60 // interval_minutes)
+    batch: List[AnalyzerReading] = []
+    for i in range(steps):
+        slot = start + i * step
+        day_fraction = (slot.hour * 60 + slot.minute) / 1440.0
+        season = math.sin(2 * math.pi * slot.timetuple().tm_yday / 365.0)
+        for point in sample_points:
+            ch4 = 60.0 + 3.0 * season + 1.5 * math.sin(2 * math.pi * day_fraction) + rng.gauss(0, 0.4)
+            o2 = abs(rng.gauss(0.4, 0.2))
+            n2 = abs(rng.gauss(1.5, 0.5))
+            co2 = 100.0 - ch4 - o2 - n2 - 0.3
+            h2s = max(0.0, _H2S_BASE[point] * (1 + 0.15 * season) * rng.lognormvariate(0, 0.2))
+            batch.append(AnalyzerReading(
+                timestamp=slot + timedelta(seconds=rng.randint(0, 30)),
+                sample_point=point,
+                o2_pct=_maybe(rng, o2, 2),
+                co2_pct=_maybe(rng, co2, 2),
+                h2s_ppm=_maybe(rng, h2s, 1),
+                ch4_pct=_maybe(rng, ch4, 2),
+                net_cal_val_mj_m3=_maybe(rng, ch4 / 100 * _CH4_NET_MJ_M3, 3),
+                gross_cal_val_mj_m3=_maybe(rng, ch4 / 100 * _CH4_GROSS_MJ_M3, 3),
+                t_sensor_f=_maybe(rng, 78.0 + 15.0 * season + rng.gauss(0, 2), 1),
+                balance_n2_pct=_maybe(rng, n2, 2),
+            ))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def daily_flows(days: int, start: date = DEFAULT_START.date(), seed: int = 0) -> List[DailyFlowInput]:
+    """One DailyFlowInput per day, flare volume and blower air in plausible scf/day ranges."""
+    rng = random.Random(seed)
+    flows = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        flows.append(DailyFlowInput(
+            date=day.isoformat(),
+            blower_1_scf_day=round(rng.uniform(0.9e6, 1.2e6)),
+            blower_2a_scf_day=round(rng.uniform(4.0e5, 6.0e5)),
+            blower_2b_scf_day=round(rng.uniform(4.0e5, 6.0e5)),
+            blower_2c_scf_day=round(rng.uniform(4.0e5, 6.0e5)),
+            biorem_ambient_air_scf_day=round(rng.uniform(1.0e5, 2.0e5)),
+            biogas_flared_scf_day=round(rng.uniform(2.0e5, 6.0e5)),
+        ))
+    return flows
@@ -1,15 +1,57 @@
 # --- src/gastrack/cli.py ---
 
+import time
+from typing import List, Optional
+
+_CLI_IMPORT_START = time.perf_counter()
 import typer
 from rich.console import Console
+_CLI_IMPORT_SECONDS = time.perf_counter() - _CLI_IMPORT_START
 
-# We'll use the main function from src.gastrack.core.server
-from src.gastrack.core.server import run_server
-from src.gastrack.db.connection import DB_PATH, init_db
+# Everything else (server, DB, calcs) is imported inside the commands that need it,
+# so `gastrack db-path` does not pay for uvicorn, Starlette and the handlers.
 
 app = typer.Typer(help="GasTrack Command Line Interface for managing the server, database, and utilities.")
 console = Console()
 
+
+@app.callback(invoke_without_command=True)
+def main(
+    ctx: typer.Context,
+    profile_startup: bool = typer.Option(
+        False,
+        "--profile-startup",
+        help="Report import and initialisation timings. Without a command, profiles server start-up without serving.",
+    ),
+):
+    if not profile_startup:
+        if ctx.invoked_subcommand is None:
+            console.print(ctx.get_help())
+        return
+
+    from src.gastrack.core.startup import StartupProfile
+
+    profile = StartupProfile()
+    profile.record("cli imports (typer, rich)", _CLI_IMPORT_SECONDS)
+    profile.start_import_timing()
+
+    if ctx.invoked_subcommand is not None:
+        start = time.perf_counter()
+        ctx.call_on_close(lambda: (
+            profile.record(f"command {ctx.invoked_subcommand}", time.perf_counter() - start),
+            profile.print_report(console),
+        ))
+        return
+
+    with profile.phase("import core.server"):
+        from src.gastrack.core.server import get_app
+        from src.gastrack.db.connection import init_db
+    with profile.phase("init_db"):
+        init_db()
+    with profile.phase("get_app (schema already current)"):
+        get_app()
+    profile.print_report(console)
+
 @app.command()
 def start(
     port: int = typer.Option(
@@ -17,37 +59,386 @@ def start(
         "--port", 
         "-p", 
         help="Port to run the Starlette server on."
-    )
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        min=1,
+        help="Worker processes. More than one spreads decoding, calculations and serialisation across cores.",
+    ),
 ):
     """
     Starts the GasTrack API server using Uvicorn.
     """
-    console.print(f"[bold green]Starting GasTrack API server on http://127.0.0.1:{port}[/bold green]")
+    from src.gastrack.core.server import run_server
+
+    console.print(f"[bold green]Starting GasTrack API server on http://127.0.0.1:{port}[/bold green]"
+                  + (f" [green]({workers} workers)[/green]" if workers > 1 else ""))
     try:
-        run_server(port)
+        run_server(port, workers)
     except Exception as e:
         console.print(f"[bold red]Server failed to start:[/bold red] {e}")
 
 @app.command()
 def db_init():
     """Re-run schema + default factors (safe to run multiple times)."""
-    init_db()
+    from src.gastrack.db.connection import init_db
+
+    init_db(force=True)
     console.print("[bold cyan]Database schema and default factors ensured.[/bold cyan]")
 
 @app.command()
 def db_clear():
     """Delete the database file."""
+    from src.gastrack.db.paths import DB_PATH
+
     if DB_PATH.exists():
         DB_PATH.unlink()
         console.print(f"[bold yellow]Database deleted:[/bold yellow] {DB_PATH}")
     else:
         console.print("[bold yellow]No database file to delete.[/bold yellow]")
 
+@app.command()
+def db_rebuild_rollup():
+    """Rebuild the daily analyzer rollup table from the raw readings."""
+    from src.gastrack.db import crud
+    from src.gastrack.db.connection import init_db
+
+    init_db()
+    rows = crud.rebuild_daily_rollup()
+    console.print(f"[bold cyan]Daily rollup rebuilt:[/bold cyan] {rows} (day, sample point) rows.")
+
+@app.command()
+def db_invalidate_derived():
+    """Mark every persisted derived value stale (recomputed when next reported), e.g. after changing the LOCF gap."""
+    from src.gastrack.db import derived
+    from src.gastrack.db.connection import init_db
+
+    init_db()
+    rows = derived.mark_all_dirty()
+    console.print(f"[bold cyan]Derived values marked stale:[/bold cyan] {rows} (day, sample point) rows.")
+
+@app.command()
+def db_migrate_storage(
+    batch_size: int = typer.Option(10_000, "--batch-size", help="Readings copied per transaction."),
+    vacuum: bool = typer.Option(True, "--vacuum/--no-vacuum", help="VACUUM afterwards to return the freed space."),
+):
+    """Convert readings to the compact storage format (stop the server first; resumable)."""
+    from rich.progress import Progress
+    from src.gastrack.db.connection import DB_PATH
+    from src.gastrack.db.migrate import migrate_storage
+
+    with Progress(console=console) as progress:
+        task = progress.add_task("Migrating readings", total=None)
+
+        def on_batch(done: int, total: int):
+            progress.update(task, completed=done, total=total)
+
+        copied = migrate_storage(DB_PATH, batch_size=batch_size, vacuum=vacuum, progress=on_batch)
+    if copied:
+        console.print(f"[bold cyan]Migrated {copied} readings to the compact storage format.[/bold cyan]")
+    else:
+        console.print("[bold cyan]Database already uses the compact storage format.[/bold cyan]")
+
+@app.command()
+def db_archive(
+    keep_months: int = typer.Option(3, "--keep-months", help="Months kept hot, counting the current one."),
+    before: str = typer.Option(None, "--before", help="Archive the months before YYYY-MM instead."),
+    vacuum: bool = typer.Option(True, "--vacuum/--no-vacuum", help="VACUUM afterwards to return the freed space."),
+):
+    """Move closed months of readings into per-month archive files (still readable; resumable)."""
+    from rich.progress import Progress
+    from src.gastrack.db import archive
+    from src.gastrack.db.connection import DB_PATH
+
+    cutoff = before or archive.cutoff_month(keep_months)
+    with Progress(console=console) as progress:
+        task = progress.add_task(f"Archiving months before {cutoff}", total=None)
+
+        def on_month(month: str, done: int, total: int):
+            progress.update(task, completed=done, total=total, description=f"Archived {month}")
+
+        moved = archive.archive_months(cutoff, DB_PATH, vacuum=vacuum, progress=on_month)
+    for month, count in moved:
+        console.print(f"[bold cyan]{month}:[/bold cyan] {count} readings -> {archive.archive_path(month)}")
+    if not moved:
+        console.print(f"[bold cyan]No hot readings before {cutoff}.[/bold cyan]")
+
 @app.command()
 def db_path():
     """Show where the database lives."""
+    from src.gastrack.db.paths import DB_PATH
+
     console.print(f"Database path: {DB_PATH.resolve()}")
 
+@app.command()
+def report(
+    month: str = typer.Argument(None, help="Month in YYYY-MM format (e.g., 2025-09)"),
+    sample_point: str = typer.Option(
+        "Outlet",  # calcs.DEFAULT_SAMPLE_POINT, spelled out to keep calcs out of CLI start-up
+        "--sample-point",
+        "-s",
+        help="Analyzer sample point whose gas composition is used."
+    ),
+    year: int = typer.Option(None, "--year", "-y", help="Report every month of this year instead of one month."),
+    scenarios: List[str] = typer.Option(
+        None, "--scenario",
+        help="Also report with some factors overridden: NAME:KEY=VALUE[,KEY=VALUE...] (repeatable).",
+    ),
+    workers: int = typer.Option(
+        None, "--workers", "-w", min=1, help="Report processes for --year / --scenario (default: one per CPU).",
+    ),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON instead of a table."),
+):
+    """Generate the monthly biogas emissions report (or monthly totals for a year and factor scenarios)."""
+    import msgspec
+    from rich.table import Table
+    from src.gastrack.core import calcs
+    from src.gastrack.db.connection import init_db
+
+    if (month is None) == (year is None):
+        console.print("[bold red]Report failed:[/bold red] give either a MONTH or --year.")
+        raise typer.Exit(code=1)
+
+    def fmt(value):
+        if value is None:
+            return "-"
+        return value if isinstance(value, str) else f"{value:,.3f}"
+
+    init_db()
+    if year is not None or scenarios:
+        _report_batch(month, year, sample_point, scenarios or [], workers, as_json, fmt)
+        return
+    try:
+        result = calcs.compute_monthly_report(month, sample_point)
+    except (ValueError, KeyError) as e:
+        console.print(f"[bold red]Report failed:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    if as_json:
+        console.print_json(msgspec.json.encode(result).decode())
+        return
+
+    table = Table(title=f"GasTrack emissions {month} ({sample_point})")
+    columns = ("date", "biogas_flared_scf", "ch4_pct", "h2s_ppm", "mmbtu", "nox_lbs", "co_lbs", "voc_lbs", "so2_lbs")
+    for name in columns:
+        table.add_column(name, justify="left" if name == "date" else "right")
+    for day in result.days:
+        table.add_row(*(fmt(getattr(day, name)) for name in columns))
+    table.add_row("total", *(fmt(result.totals.get(name)) for name in columns[1:]), style="bold")
+    console.print(table)
+
+
+def _report_batch(
+    month: Optional[str], year: Optional[int], sample_point: str, scenario_specs: List[str],
+    workers: Optional[int], as_json: bool, fmt,
+) -> None:
+    """`gastrack report --year / --scenario`: monthly totals per scenario, from a process pool."""
+    import msgspec
+    from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+    from rich.table import Table
+    from src.gastrack.core import report_batch
+
+    try:
+        scenarios = [report_batch.parse_scenario(spec) for spec in scenario_specs]
+    except ValueError as e:
+        console.print(f"[bold red]Report failed:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    months = [month] if year is None else report_batch.year_months(year)
+    try:
+        columns = (TextColumn("{task.description}"), BarColumn(), MofNCompleteColumn(), TimeElapsedColumn())
+        with Progress(*columns, console=console, transient=as_json) as progress:
+            task = progress.add_task("Reporting", total=None)
+            result = report_batch.run_batch(
+                months, scenarios, sample_point, workers=workers,
+                progress=lambda done, total: progress.update(task, completed=done, total=total),
+            )
+    except (ValueError, KeyError) as e:
+        console.print(f"[bold red]Report failed:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    if as_json:
+        console.print_json(msgspec.json.encode(result).decode())
+        return
+
+    title = f"{result.months[0]} to {result.months[-1]}" if len(result.months) > 1 else result.months[0]
+    table = Table(title=f"GasTrack emissions {title} ({sample_point})")
+    columns = ("biogas_flared_scf", "mmbtu", "nox_lbs", "co_lbs", "voc_lbs", "so2_lbs")
+    for name in ("scenario", "month", "days") + columns:
+        table.add_column(name, justify="left" if name in ("scenario", "month") else "right")
+    for period in result.periods:
+        table.add_row(period.scenario, period.month, str(period.days), *(fmt(period.totals.get(n)) for n in columns))
+        if period.month == result.months[-1]:
+            totals = result.totals[period.scenario]
+            table.add_row(
+                period.scenario, "total", str(totals["days"]), *(fmt(totals.get(n)) for n in columns),
+                style="bold", end_section=True,
+            )
+    console.print(table)
+
+@app.command("import")
+def import_(
+    paths: List[str] = typer.Argument(..., help="CSV / XLSX files, or directories to search for them."),
+    sample_point: str = typer.Option(
+        None, "--sample-point", "-s", help="Sample point for tables without a sample_point column (default: the sheet name)."
+    ),
+    workers: int = typer.Option(None, "--workers", "-w", min=1, help="Parser processes (default: one per CPU)."),
+    restart: bool = typer.Option(
+        False, "--restart", help="Forget earlier progress and import these files from the first row again.",
+    ),
+):
+    """Bulk-load historical analyzer sheets and daily flow logs (parallel parsing, resumable)."""
+    from rich.progress import Progress, TextColumn, TimeElapsedColumn
+    from rich.table import Table
+    from src.gastrack.db import importer
+    from src.gastrack.db.connection import DB_PATH
+
+    start = time.perf_counter()
+    columns = (TextColumn("{task.description}"), TimeElapsedColumn())
+    try:
+        with Progress(*columns, console=console) as progress:
+            task = progress.add_task("Importing", total=None)
+
+            def on_commit(imported: int, rejected: int):
+                rate = (imported + rejected) / max(time.perf_counter() - start, 1e-9)
+                progress.update(
+                    task, description=f"Imported {imported:,} rows, rejected {rejected:,} ({rate:,.0f} rows/s)",
+                )
+
+            summary = importer.import_files(
+                paths, DB_PATH, workers=workers, sample_point=sample_point, restart=restart, progress=on_commit,
+            )
+    except FileNotFoundError as e:
+        console.print(f"[bold red]Import failed:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    table = Table(title="GasTrack import")
+    for name in ("source", "sheet", "status", "kind", "imported", "rejected", "note"):
+        table.add_column(name, justify="right" if name in ("imported", "rejected") else "left")
+    for t in summary.tables:
+        table.add_row(
+            t.source, t.sheet, t.status, t.kind or "-", f"{t.imported:,}", f"{t.rejected:,}", t.note or "",
+        )
+    console.print(table)
+    for t in summary.tables:
+        for error in t.errors:
+            console.print(f"[yellow]{t.sheet}[/yellow] {error}")
+    console.print(
+        f"[bold cyan]{summary.imported:,} rows imported, {summary.rejected:,} rejected "
+        f"in {summary.seconds:.1f} s ({summary.rows_per_second:,.0f} rows/s).[/bold cyan]"
+    )
+    if any(t.status in ("failed", "changed") for t in summary.tables):
+        raise typer.Exit(code=1)
+
+
+export_app = typer.Typer(help="Export readings or daily flows to CSV / columnar msgpack files (any time span).")
+app.add_typer(export_app, name="export")
+
+
+def _run_export(kind: str, batches, output: str, fmt: str, gzip: bool):
+    """Write export batches to output ('-' for stdout) through a .part file; report rows/sec."""
+    import shutil
+    import sys
+    from pathlib import Path
+    from rich.progress import Progress
+    from src.gastrack.api.export import ExportEncoder
+
+    encoder = ExportEncoder(kind, fmt, gzip=gzip)
+    start = time.perf_counter()
+    if output == "-":
+        out = sys.stdout.buffer
+        out.write(encoder.header())
+        for rows in batches:
+            out.write(encoder.encode(rows))
+        out.write(encoder.finish())
+        out.flush()
+        return
+
+    path = Path(output)
+    part = path.with_name(path.name + ".part")  # an interrupted export never looks complete
+    with open(part, "wb") as out, Progress(console=console) as progress:
+        task = progress.add_task(f"Exporting {kind}", total=None)
+        out.write(encoder.header())
+        for rows in batches:
+            out.write(encoder.encode(rows))
+            progress.update(task, completed=encoder.rows, description=f"Exporting {kind}: {encoder.rows:,} rows")
+        out.write(encoder.finish())
+    shutil.move(part, path)
+    seconds = time.perf_counter() - start
+    console.print(
+        f"[bold cyan]Exported {encoder.rows:,} {kind}[/bold cyan] -> {path} "
+        f"({path.stat().st_size:,} bytes, {encoder.rows / max(seconds, 1e-9):,.0f} rows/s)"
+    )
+
+
+def _export_dates(start: str, end: str):
+    from datetime import datetime
+
+    try:
+        return (datetime.fromisoformat(start) if start else None), (datetime.fromisoformat(end) if end else None)
+    except ValueError as e:
+        console.print(f"[bold red]Export failed:[/bold red] start/end must be ISO 8601 dates or datetimes ({e}).")
+        raise typer.Exit(code=1)
+
+
+def _export_target(kind: str, fmt: str, output: Optional[str], gzip: Optional[bool]):
+    """Validate the format and settle the output name and gzip flag from each other."""
+    if fmt not in ("csv", "msgpack"):  # api.export.EXPORT_FORMATS, spelled out to keep it out of start-up
+        console.print(f"[bold red]Export failed:[/bold red] --format must be csv or msgpack, not {fmt!r}.")
+        raise typer.Exit(code=1)
+    if output is None:
+        output = f"gastrack-{kind}.{fmt}" + (".gz" if gzip else "")
+    if gzip is None:
+        gzip = output.endswith(".gz")
+    return output, gzip
+
+_EXPORT_FORMAT_HELP = "csv, or msgpack (columnar batches, length-prefixed frames)."
+_EXPORT_OUTPUT_HELP = "Output file ('-' for stdout). Default: gastrack-<kind>.<format>[.gz]."
+_EXPORT_GZIP_HELP = "gzip the output. Default: on when the output name ends in .gz."
+
+
+@export_app.command("readings")
+def export_readings(
+    sample_point: List[str] = typer.Option(None, "--sample-point", "-s", help="Sample point(s) to export (default all)."),
+    start: str = typer.Option(None, "--start", help="First timestamp or date (ISO 8601, inclusive)."),
+    end: str = typer.Option(None, "--end", help="End timestamp or date (ISO 8601, exclusive)."),
+    fmt: str = typer.Option("csv", "--format", "-f", help=_EXPORT_FORMAT_HELP),
+    output: str = typer.Option(None, "--output", "-o", help=_EXPORT_OUTPUT_HELP),
+    gzip: Optional[bool] = typer.Option(None, "--gzip/--no-gzip", help=_EXPORT_GZIP_HELP),
+):
+    """Export analyzer readings (grouped by sample point, oldest first), streamed in batches."""
+    from src.gastrack.db import crud
+    from src.gastrack.db.connection import init_db
+
+    start_ts, end_ts = _export_dates(start, end)
+    output, gzip = _export_target("readings", fmt, output, gzip)
+    init_db()
+    _run_export("readings", crud.iter_reading_rows(sample_point or None, start_ts, end_ts), output, fmt, gzip)
+
+
+@export_app.command("flows")
+def export_flows(
+    start: str = typer.Option(None, "--start", help="First date (inclusive)."),
+    end: str = typer.Option(None, "--end", help="End date (exclusive)."),
+    fmt: str = typer.Option("csv", "--format", "-f", help=_EXPORT_FORMAT_HELP),
+    output: str = typer.Option(None, "--output", "-o", help=_EXPORT_OUTPUT_HELP),
+    gzip: Optional[bool] = typer.Option(None, "--gzip/--no-gzip", help=_EXPORT_GZIP_HELP),
+):
+    """Export daily flow inputs, streamed in batches."""
+    from src.gastrack.db import crud
+    from src.gastrack.db.connection import init_db
+
+    start_ts, end_ts = _export_dates(start, end)
+    output, gzip = _export_target("flows", fmt, output, gzip)
+    init_db()
+    batches = crud.iter_flow_rows(
+        start_ts.date().isoformat() if start_ts else None, end_ts.date().isoformat() if end_ts else None,
+    )
+    _run_export("flows", batches, output, fmt, gzip)
+
+
 if __name__ == "__main__":
     app()
 
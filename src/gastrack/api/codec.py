@@ -0,0 +1,164 @@
+# src/gastrack/api/codec.py
+"""
+Content negotiation and msgspec codecs shared by every API handler.
+
+- Request bodies: format from Content-Type (JSON or msgpack). A missing Content-Type
+  means msgpack, which is what the ingest endpoints have always accepted.
+- Responses: format from Accept (q-values honoured); JSON unless the client prefers msgpack.
+- Compression: request bodies may be sent with Content-Encoding: gzip; respond_compressed()
+  gzips larger responses for clients that send Accept-Encoding: gzip (sync endpoints).
+
+Decoders are built once per (format, type) and reused; Structs are encoded straight to
+bytes by the two shared encoders, never through intermediate dicts.
+"""
+import gzip
+import zlib
+from typing import Any, Dict, Literal, Optional, Tuple
+
+import msgspec
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+
+Format = Literal["json", "msgpack"]
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+JSON_MEDIA_TYPES = (JSON_MEDIA_TYPE, "text/json")
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+MEDIA_TYPES: Dict[str, str] = {"json": JSON_MEDIA_TYPE, "msgpack": MSGPACK_MEDIA_TYPE}
+
+json_encoder = msgspec.json.Encoder()
+msgpack_encoder = msgspec.msgpack.Encoder()
+ENCODERS = {"json": json_encoder, "msgpack": msgpack_encoder}
+
+_decoders: Dict[Tuple[str, Any], Any] = {}
+
+# Largest request body accepted after gzip decompression (guards against decompression bombs).
+MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024
+# Smaller responses are not worth compressing.
+GZIP_MIN_BYTES = 1024
+
+
+def get_decoder(fmt: Format, type_: Any):
+    """The cached msgspec Decoder for (format, type)."""
+    key = (fmt, type_)
+    decoder = _decoders.get(key)
+    if decoder is None:
+        module = msgspec.json if fmt == "json" else msgspec.msgpack
+        decoder = _decoders[key] = module.Decoder(type_)
+    return decoder
+
+
+def encode(obj: Any, fmt: Format = "json") -> bytes:
+    return ENCODERS[fmt].encode(obj)
+
+
+def media_type_of(request: Request) -> str:
+    return request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+def request_format(request: Request) -> Format:
+    media_type = media_type_of(request)
+    if media_type in JSON_MEDIA_TYPES or media_type.endswith("+json"):
+        return "json"
+    if not media_type or media_type in MSGPACK_MEDIA_TYPES or media_type == "application/octet-stream":
+        return "msgpack"
+    raise HTTPException(
+        status_code=415,
+        detail=f"Unsupported Content-Type {media_type!r}; use {JSON_MEDIA_TYPE} or {MSGPACK_MEDIA_TYPE}.",
+    )
+
+
+def response_format(request: Request) -> Format:
+    """Pick the response format from Accept, preferring JSON on ties."""
+    accept = request.headers.get("accept")
+    if not accept:
+        return "json"
+    best: Optional[Format] = None
+    best_q = 0.0
+    for entry in accept.split(","):
+        media_type, _, params = entry.strip().partition(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in MSGPACK_MEDIA_TYPES:
+            fmt = "msgpack"
+        elif media_type in JSON_MEDIA_TYPES or media_type in ("*/*", "application/*"):
+            fmt = "json"
+        else:
+            continue
+        if q > best_q or (q == best_q and fmt == "json"):
+            best, best_q = fmt, q
+    return best or "json"
+
+
+async def read_body(request: Request) -> bytes:
+    """The request body, gunzipped if it was sent with Content-Encoding: gzip."""
+    body = await request.body()
+    encoding = request.headers.get("content-encoding", "identity").strip().lower()
+    if encoding in ("", "identity"):
+        return body
+    if encoding not in ("gzip", "x-gzip"):
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding {encoding!r}; use gzip.")
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(body, MAX_DECOMPRESSED_BYTES)
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid gzip body: {e}")
+    if decompressor.unconsumed_tail:
+        raise HTTPException(status_code=413, detail=f"Body exceeds {MAX_DECOMPRESSED_BYTES} bytes uncompressed.")
+    if not decompressor.eof:
+        raise HTTPException(status_code=400, detail="Invalid gzip body: truncated.")
+    return data
+
+
+def accepts_gzip(request: Request) -> bool:
+    for entry in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = entry.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "x-gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0")
+    return False
+
+
+def respond_compressed(request: Request, obj: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """respond(), gzipped when the client accepts it and the body is large enough to gain from it."""
+    fmt = response_format(request)
+    body = encode(obj, fmt)
+    headers = {**(headers or {}), "Vary": "Accept, Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and accepts_gzip(request):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, status_code=status_code, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+async def decode_body(request: Request, type_: Any) -> Any:
+    """Read and validate the request body as type_; 400 on bad data, 415 on an unknown format."""
+    fmt = request_format(request)
+    body = await read_body(request)
+    try:
+        return get_decoder(fmt, type_).decode(body)
+    except msgspec.ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Validation Error: {e}")
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid payload format: {e}")
+
+
+def respond(request: Request, obj: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Encode obj in the negotiated format."""
+    fmt = response_format(request)
+    return encoded_response(encode(obj, fmt), fmt, status_code, headers)
+
+
+def encoded_response(
+    body: bytes, fmt: Format, status_code: int = 200, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Wrap already-encoded bytes (e.g. from a cache)."""
+    headers = {**(headers or {}), "Vary": "Accept"}
+    return Response(body, status_code=status_code, media_type=MEDIA_TYPES[fmt], headers=headers)
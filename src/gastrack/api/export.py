@@ -0,0 +1,144 @@
+# src/gastrack/api/export.py
+"""
+Bulk export encodings, shared by /api/export/* and `gastrack export`.
+
+Rows arrive in batches straight from crud.iter_reading_rows() / iter_flow_rows() (stored
+columns, no Structs) and each batch is encoded on its own, so an export of ten years
+needs no more memory than one of a day:
+- csv:     header line, then one line per row. Readings: ISO 8601 UTC timestamps ('Z'),
+           UUID ids, empty cells for missing values.
+- msgpack: columnar. One length-prefixed frame (api/streaming.py framing) per batch,
+           each a map of column name -> list of values. Readings keep the stored
+           encodings: timestamp_us (epoch microseconds, UTC) and 16-byte ids.
+Either can be gzipped as a whole: one gzip stream, flushed after every batch.
+"""
+import csv
+import io
+import zlib
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Literal, Sequence, Tuple
+
+from msgspec import msgpack
+
+from src.gastrack.api.streaming import LENGTH_PREFIX_BYTES, frame_length_prefixed
+from src.gastrack.core.models import GAS_CHANNELS
+from src.gastrack.db.storage import EPOCH_ORDINAL, US_PER_DAY, US_PER_SECOND
+
+ExportFormat = Literal["csv", "msgpack"]
+EXPORT_FORMATS: Tuple[str, ...] = ("csv", "msgpack")
+MEDIA_TYPES: Dict[str, str] = {"csv": "text/csv; charset=utf-8", "msgpack": "application/msgpack"}
+
+# Output columns, in order. Readings come from crud.READING_COLUMNS, flows from crud.FLOW_COLUMNS.
+READING_EXPORT_COLUMNS = ("timestamp", "sample_point", *GAS_CHANNELS, "is_manual_override", "override_note", "id")
+FLOW_EXPORT_COLUMNS = (
+    "date", "blower_1_scf_day", "blower_2a_scf_day", "blower_2b_scf_day",
+    "blower_2c_scf_day", "biorem_ambient_air_scf_day", "biogas_flared_scf_day",
+)
+EXPORT_COLUMNS = {"readings": READING_EXPORT_COLUMNS, "flows": FLOW_EXPORT_COLUMNS}
+
+GZIP_LEVEL = 6
+
+
+def _iso_utc(us: int) -> str:
+    """from_epoch_us(us).isoformat() with 'Z', without building a datetime per row."""
+    days, us_of_day = divmod(us, US_PER_DAY)
+    seconds, micros = divmod(us_of_day, US_PER_SECOND)
+    minutes, second = divmod(seconds, 60)
+    text = f"{_day_text(days)}T{minutes // 60:02d}:{minutes % 60:02d}:{second:02d}"
+    return f"{text}.{micros:06d}Z" if micros else text + "Z"
+
+
+@lru_cache(maxsize=4096)
+def _day_text(days: int) -> str:
+    return date.fromordinal(EPOCH_ORDINAL + days).isoformat()
+
+
+def _uuid_text(blob: bytes) -> str:
+    h = blob.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# Positions in crud.READING_COLUMNS: id, timestamp, sample_point, <GAS_CHANNELS>, is_manual_override, override_note.
+_CHANNELS_END = 3 + len(GAS_CHANNELS)
+
+
+def _reading_csv_row(row) -> tuple:
+    return (
+        _iso_utc(row[1]), row[2], *row[3:_CHANNELS_END],
+        1 if row[_CHANNELS_END] else 0, row[_CHANNELS_END + 1], _uuid_text(row[0]),
+    )
+
+
+def _reading_columns(rows: Sequence) -> Dict[str, list]:
+    columns = {
+        "timestamp_us": [row["timestamp"] for row in rows],
+        "sample_point": [row["sample_point"] for row in rows],
+    }
+    for ch in GAS_CHANNELS:
+        columns[ch] = [row[ch] for row in rows]
+    columns["is_manual_override"] = [bool(row["is_manual_override"]) for row in rows]
+    columns["override_note"] = [row["override_note"] for row in rows]
+    columns["id"] = [row["id"] for row in rows]
+    return columns
+
+
+class ExportEncoder:
+    """Turns batches of stored rows of one kind ('readings' | 'flows') into output bytes."""
+
+    def __init__(self, kind: str, fmt: ExportFormat = "csv", gzip: bool = False):
+        if kind not in EXPORT_COLUMNS:
+            raise ValueError(f"Unknown export kind {kind!r}; expected one of {tuple(EXPORT_COLUMNS)}.")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}; expected one of {EXPORT_FORMATS}.")
+        self.kind = kind
+        self.fmt = fmt
+        self.rows = 0
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None
+        self._text = io.StringIO()
+        self._csv = csv.writer(self._text, lineterminator="\n")
+
+    def header(self) -> bytes:
+        if self.fmt != "csv":
+            return b""
+        self._csv.writerow(EXPORT_COLUMNS[self.kind])
+        return self._pack(self._take_text())
+
+    def encode(self, rows: Sequence) -> bytes:
+        """One batch of stored rows."""
+        if not rows:
+            return b""
+        self.rows += len(rows)
+        if self.fmt == "csv":
+            self._csv.writerows(map(_reading_csv_row, rows) if self.kind == "readings" else rows)
+            return self._pack(self._take_text())
+        columns = _reading_columns(rows) if self.kind == "readings" else {
+            name: list(values) for name, values in zip(FLOW_EXPORT_COLUMNS, zip(*rows))
+        }
+        return self._pack(frame_length_prefixed(msgpack.encode(columns)))
+
+    def finish(self) -> bytes:
+        return self._compressor.flush() if self._compressor else b""
+
+    def _take_text(self) -> bytes:
+        data = self._text.getvalue().encode()
+        self._text.seek(0)
+        self._text.truncate()
+        return data
+
+    def _pack(self, data: bytes) -> bytes:
+        if self._compressor is None:
+            return data
+        # Z_SYNC_FLUSH: every batch is decodable as soon as it is sent, at a few bytes per batch.
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def decode_columnar(data: bytes) -> List[Dict[str, list]]:
+    """Client-side helper: the column batches of a (gunzipped) msgpack export."""
+    batches, start = [], 0
+    while start < len(data):
+        size = int.from_bytes(data[start:start + LENGTH_PREFIX_BYTES], "big")
+        start += LENGTH_PREFIX_BYTES
+        batches.append(msgpack.decode(data[start:start + size]))
+        start += size
+    return batches
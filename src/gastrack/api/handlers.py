@@ -1,99 +1,769 @@
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
 from starlette.routing import Route
 from starlette.exceptions import HTTPException
-from typing import List
+import asyncio
+import base64
+from datetime import date, datetime
+from typing import List, Optional, Tuple, get_args
 from dataclasses import asdict
-from msgspec import msgpack, ValidationError
+import logging
+import msgspec
+from msgspec import ValidationError
+
+from src.gastrack.db import async_crud, derived
+from src.gastrack.db.executor import DBBusyError, DBTimeoutError, get_executor
+from src.gastrack.db.write_queue import get_write_queue
+from src.gastrack.db.storage import to_epoch_us
+from src.gastrack.api import codec, export
+from src.gastrack.api.codec import MSGPACK_MEDIA_TYPES
+from src.gastrack.api.streaming import (
+    NDJSON_MEDIA_TYPES, SSE_MEDIA_TYPE, FramingError, iter_ndjson, iter_length_prefixed, sse_event, sse_comment,
+)
+from src.gastrack.core.models import (
+    AnalyzerReading, DailyFlowInput, Factor, SAMPLE_POINTS, GAS_CHANNELS,
+    ApiStatus, ChunkSummary, ReadingsPage, RecordError, StreamIngestResult, ThresholdRule,
+)
+from src.gastrack.core.cache import latest_readings, series_cache
+from src.gastrack.core.pubsub import live_readings
+from src.gastrack.core import calcs, downsample
+from src.gastrack.core.metrics import PROMETHEUS_MEDIA_TYPE, render_prometheus
+
+logger = logging.getLogger(__name__)
+
+# Streaming ingest: rows per transaction, and how many record errors are echoed back.
+STREAM_CHUNK_ROWS = 5000
+STREAM_MAX_CHUNK_ROWS = 50000
+STREAM_MAX_ERRORS_REPORTED = 100
+
+
+# Range queries: default / max page size, and rows fetched per keyset round-trip while streaming.
+READINGS_PAGE_SIZE = 1000
+READINGS_MAX_PAGE_SIZE = 10000
+READINGS_FETCH_BATCH = 500
+
+# Downsampled series: default / max number of points returned.
+SERIES_POINTS = 1000
+SERIES_MAX_POINTS = 10000
+
+# Exceedance listing: default / max number of events returned.
+EXCEEDANCES_LIMIT = 1000
+EXCEEDANCES_MAX_LIMIT = 10000
+
+# Delta sync: batch id length cap, and default / max changes examined per pull.
+SYNC_BATCH_ID_MAX_LENGTH = 128
+SYNC_PULL_LIMIT = 5000
+SYNC_PULL_MAX_LIMIT = 50000
+
+# Bulk export: rows fetched and encoded per batch (memory stays at one batch).
+EXPORT_BATCH_ROWS = 5000
+
+# Live stream: idle keep-alive interval, so proxies keep the connection and dead clients are noticed.
+LIVE_HEARTBEAT_SECONDS = 15.0
+
+# --- Query parameter helpers ---
+
+def _sample_point_param(request: Request) -> str:
+    # "point" is what the Node-RED dashboard sends.
+    sample_point = request.query_params.get("sample_point") or request.query_params.get("point")
+    if sample_point not in get_args(SAMPLE_POINTS):
+        raise HTTPException(status_code=400, detail=f"sample_point must be one of {get_args(SAMPLE_POINTS)}.")
+    return sample_point
+
+
+def _sample_points_param(request: Request) -> Optional[List[str]]:
+    """Zero or more sample points (?point=Inlet&point=Outlet or ?point=Inlet,Outlet); None means all."""
+    values = request.query_params.getlist("sample_point") + request.query_params.getlist("point")
+    points = [p.strip() for value in values for p in value.split(",") if p.strip()]
+    for point in points:
+        if point not in get_args(SAMPLE_POINTS):
+            raise HTTPException(status_code=400, detail=f"sample_point must be one of {get_args(SAMPLE_POINTS)}.")
+    return points or None
+
+
+def _datetime_param(request: Request, name: str) -> Optional[datetime]:
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO 8601 date or datetime.")
+
+
+def _int_param(request: Request, name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an integer.")
+    return max(lo, min(value, hi))
+
+
+def _encode_cursor(key: Tuple[int, bytes]) -> str:
+    """Opaque keyset cursor: the stored (epoch-us timestamp, id bytes) of the last row."""
+    timestamp_us, id_bytes = key
+    return base64.urlsafe_b64encode(msgspec.json.encode((timestamp_us, id_bytes.hex()))).decode()
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, bytes]]:
+    if not cursor:
+        return None
+    try:
+        timestamp_us, id_hex = msgspec.json.decode(base64.urlsafe_b64decode(cursor.encode()), type=Tuple[int, str])
+        id_bytes = bytes.fromhex(id_hex)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if len(id_bytes) != 16:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return timestamp_us, id_bytes
 
-from src.gastrack.db import crud
-from src.gastrack.core.models import AnalyzerReading, DailyFlowInput, Factor
 
 # --- Handlers ---
 
 async def ingest_readings(request: Request):
     """
     POST endpoint to ingest time-series analyzer readings.
-    Expects a JSON body that can be decoded into a list of AnalyzerReading structs.
+    Expects a JSON or msgpack body (per Content-Type) that can be decoded into a list
+    of AnalyzerReading structs.
     """
-    try:
-        # 1. Decode and Validate using msgspec
-        # Use msgspec's decoding for high-performance and validation
-        body = await request.body()
-        readings: List[AnalyzerReading] = msgpack.decode(
-            body, type=List[AnalyzerReading], 
-            # Allow 'extra_fields' is often good for flexibility, 
-            # but we keep it strict for better data quality.
-            # extra_fields='forbid' is the default for msgspec.
-        )
-    except ValidationError as e:
-        # Return a 400 Bad Request if validation fails
-        raise HTTPException(status_code=400, detail=f"Validation Error: {e}")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid payload format: {e}")
+    # 1. Decode and Validate using msgspec (400 on bad data).
+    # extra_fields='forbid' is the default for msgspec: we keep it strict for better data quality.
+    readings: List[AnalyzerReading] = await codec.decode_body(request, List[AnalyzerReading])
 
     # 2. Database Ingestion
+    # Goes through the group-commit queue: concurrent posts share one transaction.
     try:
-        inserted_count = crud.ingest_analyzer_readings(readings)
-        return JSONResponse(
-            {"status": "success", "message": f"Successfully ingested {inserted_count} analyzer readings."}, 
+        write_queue = get_write_queue()
+        inserted_count = await write_queue.submit(readings)
+        if write_queue.durability == "enqueue":
+            return codec.respond(
+                request,
+                ApiStatus(status="accepted", message=f"Queued {inserted_count} analyzer readings for ingestion."),
+                status_code=202
+            )
+        return codec.respond(
+            request,
+            ApiStatus(status="success", message=f"Successfully ingested {inserted_count} analyzer readings."),
             status_code=201
         )
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         # Log this error properly in a production system
         raise HTTPException(status_code=500, detail=f"Database ingestion failed: {e}")
 
 
-async def ingest_flows(request: Request):
+async def ingest_readings_stream(request: Request):
     """
-    POST endpoint to ingest daily flow summary data.
-    Expects a JSON body that can be decoded into a list of DailyFlowInput structs.
+    POST endpoint for large backfills of analyzer readings.
+    Reads the body incrementally and decodes one record at a time:
+    - Content-Type application/x-ndjson: one JSON AnalyzerReading per line.
+    - Content-Type application/msgpack: 4-byte big-endian length prefix + one msgpack AnalyzerReading.
+    Valid records are inserted in chunked transactions (?chunk_size=, default 5000).
+    Invalid records are skipped and reported; the response summarises every chunk.
+    """
+    media_type = codec.media_type_of(request)
+    if media_type in NDJSON_MEDIA_TYPES:
+        records, decoder = iter_ndjson(request.stream()), codec.get_decoder("json", AnalyzerReading)
+    elif media_type in MSGPACK_MEDIA_TYPES:
+        records, decoder = iter_length_prefixed(request.stream()), codec.get_decoder("msgpack", AnalyzerReading)
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported Content-Type {media_type!r}; use one of {NDJSON_MEDIA_TYPES + MSGPACK_MEDIA_TYPES}.",
+        )
+
+    chunk_rows = _int_param(request, "chunk_size", STREAM_CHUNK_ROWS, 1, STREAM_MAX_CHUNK_ROWS)
+
+    chunks: List[ChunkSummary] = []
+    errors: List[RecordError] = []
+    error_count = 0
+    inserted_total = 0
+    pending: List[AnalyzerReading] = []
+    rejected = 0
+    first_record = 0
+
+    def record_error(index, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < STREAM_MAX_ERRORS_REPORTED:
+            errors.append(RecordError(record=index, error=message))
+
+    async def flush(last_record):
+        nonlocal pending, rejected, first_record, inserted_total
+        summary = ChunkSummary(chunk=len(chunks), first_record=first_record, last_record=last_record,
+                               rejected=rejected)
+        if pending:
+            try:
+                summary.inserted = await async_crud.ingest_analyzer_readings(pending)
+            except Exception as e:
+                summary.rejected += len(pending)
+                summary.error = f"Database ingestion failed: {e}"
+        inserted_total += summary.inserted
+        chunks.append(summary)
+        logger.info("Stream ingest chunk %d: %d inserted, %d rejected (records %d-%d)",
+                    summary.chunk, summary.inserted, summary.rejected, first_record, last_record)
+        pending, rejected, first_record = [], 0, last_record + 1
+
+    index = -1
+    try:
+        async for index, raw in records:
+            try:
+                pending.append(decoder.decode(raw))
+            except (ValidationError, msgspec.DecodeError) as e:
+                rejected += 1
+                record_error(index, str(e))
+            if len(pending) + rejected >= chunk_rows:
+                await flush(index)
+    except FramingError as e:
+        record_error(index + 1, str(e))
+    if pending or rejected:
+        await flush(index)
+
+    failed = error_count or any(c.error is not None for c in chunks)
+    return codec.respond(
+        request,
+        StreamIngestResult(
+            status="partial" if failed else "success",
+            message=f"Successfully ingested {inserted_total} analyzer readings in {len(chunks)} chunks.",
+            inserted=inserted_total,
+            error_count=error_count,
+            errors=errors,
+            chunks=chunks,
+        ),
+        status_code=207 if failed else 201,
+    )
+
+
+async def list_readings(request: Request):
     """
+    GET endpoint for the readings of one sample point in [start, end), oldest first.
+    Query: sample_point (required), start, end (ISO 8601), limit (page size), cursor.
+    Keyset pagination: pass the returned next_cursor to get the following page.
+    Returns {"items": [...], "next_cursor": "..." | null}. JSON is streamed batch by batch;
+    msgpack (Accept: application/msgpack) needs the item count up front, so the
+    (bounded) page is encoded in one go.
+    """
+    sample_point = _sample_point_param(request)
+    start = _datetime_param(request, "start")
+    end = _datetime_param(request, "end")
+    limit = _int_param(request, "limit", READINGS_PAGE_SIZE, 1, READINGS_MAX_PAGE_SIZE)
+    after = _decode_cursor(request.query_params.get("cursor"))
+
+    async def batches():
+        """Yield keyset batches of the page, then the next cursor (or None)."""
+        key = after
+        remaining = limit
+        exhausted = False
+        while remaining > 0:
+            want = min(remaining, READINGS_FETCH_BATCH)
+            batch = await async_crud.get_readings_page(sample_point, start, end, key, want)
+            if batch:
+                yield batch
+                remaining -= len(batch)
+                key = (to_epoch_us(batch[-1].timestamp), batch[-1].id.bytes)
+            if len(batch) < want:
+                exhausted = True
+                break
+        yield None if exhausted or key is None else _encode_cursor(key)
+
+    # The first batch (msgpack: the whole page) is fetched before the response starts, so a
+    # busy or failing database still gets a proper status instead of a truncated 200.
+    fmt = codec.response_format(request)
+    parts = batches()
+    fetched = []
     try:
-        body = await request.body()
-        flows: List[DailyFlowInput] = msgpack.decode(body, type=List[DailyFlowInput])
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=f"Validation Error: {e}")
+        fetched.append(await anext(parts))
+        while fmt == "msgpack" and isinstance(fetched[-1], list):
+            fetched.append(await anext(parts))
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid payload format: {e}")
+        logger.exception("Error listing readings")
+        raise HTTPException(status_code=500, detail=f"Could not list readings: {e}")
+
+    if fmt == "msgpack":
+        items: List[AnalyzerReading] = [item for part in fetched[:-1] for item in part]
+        return codec.encoded_response(
+            codec.encode(ReadingsPage(items=items, next_cursor=fetched[-1]), "msgpack"), "msgpack"
+        )
+
+    async def rest():
+        yield fetched[0]
+        if isinstance(fetched[0], list):
+            async for part in parts:
+                yield part
+
+    async def body():
+        first = True
+        yield b'{"items":['
+        async for part in rest():
+            if isinstance(part, list):
+                if not first:
+                    yield b","
+                yield codec.json_encoder.encode(part)[1:-1]  # strip the list brackets, items only
+                first = False
+            else:
+                yield b'],"next_cursor":' + codec.json_encoder.encode(part) + b"}"
+
+    return StreamingResponse(body(), media_type=codec.JSON_MEDIA_TYPE, headers={"Vary": "Accept"})
+
+
+async def reading_series(request: Request):
+    """
+    GET endpoint for one channel of a sample point downsampled for charting.
+    Query: sample_point, channel (e.g. ch4_pct), start, end (ISO 8601, [start, end)),
+    points (max points returned), method (lttb | minmax).
+    Returns columnar {"timestamps_ms": [...], "values": [...], "raw_count": n, ...};
+    results are cached until readings inside the range are ingested.
+    """
+    sample_point = _sample_point_param(request)
+    channel = request.query_params.get("channel")
+    if channel not in GAS_CHANNELS:
+        raise HTTPException(status_code=400, detail=f"channel must be one of {GAS_CHANNELS}.")
+    method = request.query_params.get("method", "lttb")
+    if method not in downsample.METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of {downsample.METHODS}.")
+    start = _datetime_param(request, "start")
+    end = _datetime_param(request, "end")
+    points = _int_param(request, "points", SERIES_POINTS, 3, SERIES_MAX_POINTS)
+
+    fmt = codec.response_format(request)
+    start_us = to_epoch_us(start) if start else None
+    end_us = to_epoch_us(end) if end else None
+    key = (sample_point, channel, start_us, end_us, points, method)
+    body = series_cache.get(key, fmt)
+    if body is None:
+        generation = series_cache.generation
+        try:
+            series = await get_executor().run_read(
+                downsample.downsample_series, sample_point, channel, start, end, points, method
+            )
+        except DBBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except DBTimeoutError as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        body = series_cache.store(key, sample_point, start_us, end_us, generation, series)[fmt]
+    return codec.encoded_response(body, fmt)
+
+
+async def daily_readings(request: Request):
+    """
+    GET endpoint for per-day reading statistics of one sample point, from the daily rollup.
+    Query: sample_point (required), start, end (dates, [start, end)).
+    """
+    sample_point = _sample_point_param(request)
+    start = _datetime_param(request, "start")
+    end = _datetime_param(request, "end")
+    try:
+        rollup = await async_crud.get_daily_rollup(
+            sample_point,
+            start.date().isoformat() if start else None,
+            end.date().isoformat() if end else None,
+        )
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return codec.respond(request, rollup)
+
+
+async def latest_reading(request: Request):
+    """
+    GET endpoint for the newest reading at a sample point (?point=Inlet), served
+    from the in-process last-value cache. Without a point, returns the newest
+    reading of every sample point seen so far.
+    """
+    if "point" not in request.query_params and "sample_point" not in request.query_params:
+        return codec.respond(request, latest_readings.all())
+
+    sample_point = _sample_point_param(request)
+    fmt = codec.response_format(request)
+    body = latest_readings.get_encoded(sample_point, fmt)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"No readings yet for {sample_point!r}.")
+    return codec.encoded_response(body, fmt)
+
+
+def _reading_event(body: bytes, reading: AnalyzerReading) -> bytes:
+    return sse_event(body, event="reading", event_id=str(to_epoch_us(reading.timestamp)))
+
+
+async def live_readings_stream(request: Request):
+    """
+    GET endpoint pushing every newly committed reading as Server-Sent Events
+    (EventSource in the browser, instead of polling /analyzer/latest).
+    Query: point / sample_point (repeatable or comma-separated; default all points).
+
+    The current value of each subscribed point is sent first, then one "reading"
+    event per ingested reading. If the client falls behind, the oldest queued
+    readings are dropped and a "lagged" event reports how many.
+    """
+    points = _sample_points_param(request)
+    subscription = live_readings.subscribe(points)
+
+    async def events():
+        try:
+            for point in points or get_args(SAMPLE_POINTS):
+                reading = latest_readings.get(point)
+                if reading is not None:
+                    yield _reading_event(latest_readings.get_encoded(point, "json"), reading)
+            reported_drops = 0
+            while True:
+                try:
+                    event = await subscription.get(timeout=LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield sse_comment("keep-alive")
+                    continue
+                if event is None:  # server shutting down
+                    return
+                if subscription.dropped != reported_drops:
+                    yield sse_event(str(subscription.dropped - reported_drops).encode(), event="lagged")
+                    reported_drops = subscription.dropped
+                yield _reading_event(event.json_body, event.reading)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def ingest_flows(request: Request):
+    """
+    POST endpoint to ingest daily flow summary data.
+    Expects a JSON or msgpack body (per Content-Type) that can be decoded into a list
+    of DailyFlowInput structs.
+    """
+    flows: List[DailyFlowInput] = await codec.decode_body(request, List[DailyFlowInput])
     
     try:
-        inserted_count = crud.ingest_daily_flow_inputs(flows)
-        return JSONResponse(
-            {"status": "success", "message": f"Successfully ingested {inserted_count} daily flow inputs (REPLACE used)."}, 
+        inserted_count = await async_crud.ingest_daily_flow_inputs(flows)
+        return codec.respond(
+            request,
+            ApiStatus(status="success", message=f"Successfully ingested {inserted_count} daily flow inputs (REPLACE used)."),
             status_code=201
         )
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database ingestion failed: {e}")
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers etag (RFC 9110 weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
 async def get_factors(request: Request):
     """
     GET endpoint to retrieve all emission and conversion factors.
+    Served from the in-process factor cache as a pre-encoded body with a strong ETag;
+    a matching If-None-Match gets 304 Not Modified.
     """
     try:
-        factors: List[Factor] = crud.get_all_factors()
-        
-        # 3. Serialization: Convert the list of Factor objects to a list of dicts
-        serializable_factors = [
-            {
-                "key": f.key,
-                "value": f.value,
-                "description": f.description
-            }
-            for f in factors
-        ]
-        # Pass the serializable list of dictionaries to JSONResponse
-        return JSONResponse(serializable_factors)
-    
+        snapshot = await async_crud.get_factor_snapshot()
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
-        print(f"\n--- FATAL HANDLER EXCEPTION ---\nError during get_factors: {e}\n-------------------------------\n")
+        logger.exception("Error during get_factors")
         raise HTTPException(status_code=500, detail=f"Could not retrieve factors: {e}")
 
+    fmt = codec.response_format(request)
+    headers = {
+        "ETag": snapshot.etags[fmt],
+        "Cache-Control": "no-cache",  # clients may cache, but must revalidate
+        "X-Factors-Version": str(snapshot.version),
+        "Vary": "Accept",
+    }
+    if _etag_matches(request, snapshot.etags[fmt]):
+        return Response(status_code=304, headers=headers)
+    return codec.encoded_response(snapshot.bodies[fmt], fmt, headers=headers)
+
+
+async def update_factors(request: Request):
+    """
+    POST endpoint to add or replace emission and conversion factors.
+    Expects a JSON or msgpack body (per Content-Type) that can be decoded into a list of Factor structs.
+    Invalidates the factor cache (and with it the ETag).
+    """
+    factors: List[Factor] = await codec.decode_body(request, List[Factor])
+
+    try:
+        updated_count = await async_crud.upsert_factors(factors)
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Factor update failed: {e}")
+    return codec.respond(
+        request,
+        ApiStatus(status="success", message=f"Successfully updated {updated_count} factors."),
+        status_code=201
+    )
+
+
+async def emissions_report(request: Request):
+    """
+    GET endpoint for daily emissions (BTU, MMBtu, NOx/CO/VOC/SO2 lbs) and totals.
+    Query: month=YYYY-MM, or start/end dates ([start, end)); sample_point (default Outlet).
+    """
+    params = request.query_params
+    try:
+        if "month" in params:
+            start, end = calcs.month_range(params["month"])
+        elif "start" in params and "end" in params:
+            start = date.fromisoformat(params["start"]).isoformat()
+            end = date.fromisoformat(params["end"]).isoformat()
+        else:
+            raise ValueError("Pass month=YYYY-MM, or start and end dates.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sample_point = _sample_point_param(request) if ("sample_point" in params or "point" in params) else calcs.DEFAULT_SAMPLE_POINT
+
+    try:
+        report, pending = await get_executor().run_read(calcs.load_report, start, end, sample_point)
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=500, detail=f"Missing factor {e} in the factors table.")
+    if pending is not None:
+        # Recomputed derived rows go back through the single writer thread. Best effort:
+        # rows not saved stay dirty and are recomputed by the next report.
+        try:
+            await get_executor().run_write(derived.save, pending)
+        except (DBBusyError, DBTimeoutError) as e:
+            logger.warning("Derived values not saved (they stay dirty): %s", e)
+    return codec.respond(request, report)
+
+
+def _export_format_param(request: Request) -> str:
+    fmt = request.query_params.get("format", "csv").lower()
+    if fmt not in export.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {export.EXPORT_FORMATS}.")
+    return fmt
+
+
+async def _export_response(request: Request, kind: str, fmt: str, batches) -> StreamingResponse:
+    """
+    Stream an export download batch by batch. The first batch is fetched up front so a busy
+    or failing database still gets a proper status; a later failure aborts the response
+    (the client sees an incomplete body, never a silently short file).
+    """
+    try:
+        first = await anext(batches, None)
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.exception("Error during %s export", kind)
+        raise HTTPException(status_code=500, detail=f"Could not export {kind}: {e}")
+
+    gzip = codec.accepts_gzip(request)
+    encoder = export.ExportEncoder(kind, fmt, gzip=gzip)
+    headers = {"Content-Disposition": f'attachment; filename="gastrack-{kind}.{fmt}"', "Vary": "Accept-Encoding"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    async def body():
+        yield encoder.header()
+        if first is not None:
+            yield encoder.encode(first)
+            try:
+                async for rows in batches:
+                    yield encoder.encode(rows)
+            except Exception:
+                logger.exception("%s export aborted after %d rows", kind, encoder.rows)
+                raise
+        yield encoder.finish()
+
+    return StreamingResponse(body(), media_type=export.MEDIA_TYPES[fmt], headers=headers)
+
+
+async def export_readings(request: Request):
+    """
+    GET endpoint streaming readings as a download (regulatory submissions, any time span).
+    Query: sample_point (repeatable or comma-separated; default all), start, end (ISO 8601, [start, end)),
+    format (csv | msgpack: columnar batches). Rows are grouped by sample point, oldest first.
+    gzipped for Accept-Encoding: gzip.
+    """
+    fmt = _export_format_param(request)
+    sample_points = _sample_points_param(request)
+    start = _datetime_param(request, "start")
+    end = _datetime_param(request, "end")
+    batches = async_crud.iter_reading_rows(sample_points, start, end, EXPORT_BATCH_ROWS)
+    return await _export_response(request, "readings", fmt, batches)
+
+
+async def export_flows(request: Request):
+    """
+    GET endpoint streaming daily flow inputs as a download.
+    Query: start, end (dates, [start, end)), format (csv | msgpack). gzipped for Accept-Encoding: gzip.
+    """
+    fmt = _export_format_param(request)
+    start = _datetime_param(request, "start")
+    end = _datetime_param(request, "end")
+    batches = async_crud.iter_flow_rows(
+        start.date().isoformat() if start else None, end.date().isoformat() if end else None, EXPORT_BATCH_ROWS,
+    )
+    return await _export_response(request, "flows", fmt, batches)
+
+
+async def sync_push(request: Request):
+    """
+    POST endpoint for store-and-forward devices: one batch of readings, applied exactly once.
+    Query: batch_id (required, chosen by the device and reused on every retry), device (optional).
+    Body: a list of AnalyzerReading as msgpack or JSON, optionally Content-Encoding: gzip.
+    201 when the batch was applied now, 200 with status "replayed" (and the original counts)
+    when it had already been committed. Readings stored before are counted as duplicates.
+    """
+    batch_id = request.query_params.get("batch_id", "").strip()
+    if not batch_id or len(batch_id) > SYNC_BATCH_ID_MAX_LENGTH:
+        raise HTTPException(status_code=400, detail=f"batch_id is required (at most {SYNC_BATCH_ID_MAX_LENGTH} characters).")
+    readings: List[AnalyzerReading] = await codec.decode_body(request, List[AnalyzerReading])
+
+    try:
+        result = await async_crud.sync_push(batch_id, readings, request.query_params.get("device"))
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database ingestion failed: {e}")
+    return codec.respond_compressed(request, result, status_code=201 if result.status == "applied" else 200)
+
+
+async def sync_pull(request: Request):
+    """
+    GET endpoint returning the readings committed after a change-sequence cursor.
+    Query: since (cursor from the previous pull, 0 for everything), limit (changes examined),
+    sample_point (repeatable or comma-separated; default all).
+    Returns {"readings": [...], "cursor": n, "more": bool}; gzipped for Accept-Encoding: gzip.
+    Keep pulling with since=cursor while more is true.
+    """
+    try:
+        since = int(request.query_params.get("since", "0"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since must be an integer cursor.")
+    limit = _int_param(request, "limit", SYNC_PULL_LIMIT, 1, SYNC_PULL_MAX_LIMIT)
+    sample_points = _sample_points_param(request)
+
+    try:
+        changes = await async_crud.get_changes_since(max(since, 0), limit, sample_points)
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.exception("Error during sync_pull")
+        raise HTTPException(status_code=500, detail=f"Could not retrieve changes: {e}")
+    return codec.respond_compressed(request, changes)
+
+
+async def list_exceedances(request: Request):
+    """
+    GET endpoint for threshold exceedances found on ingest, newest first.
+    Query: sample_point, rule (rule key), start, end (ISO 8601; events overlapping [start, end)),
+    open=true (only exceedances still in progress), limit.
+    """
+    params = request.query_params
+    sample_point = _sample_point_param(request) if ("sample_point" in params or "point" in params) else None
+    start = _datetime_param(request, "start")
+    end = _datetime_param(request, "end")
+    open_only = params.get("open", "").lower() in ("1", "true", "yes")
+    limit = _int_param(request, "limit", EXCEEDANCES_LIMIT, 1, EXCEEDANCES_MAX_LIMIT)
+    try:
+        events = await async_crud.get_exceedances(sample_point, params.get("rule"), start, end, open_only, limit)
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.exception("Error during list_exceedances")
+        raise HTTPException(status_code=500, detail=f"Could not retrieve exceedances: {e}")
+    return codec.respond(request, events)
+
+
+async def get_thresholds(request: Request):
+    """GET endpoint listing the threshold rules evaluated on every ingest."""
+    try:
+        rules = await async_crud.get_threshold_rules()
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not retrieve threshold rules: {e}")
+    return codec.respond(request, rules)
+
+
+async def update_thresholds(request: Request):
+    """
+    POST endpoint to add or replace threshold rules (a list of ThresholdRule, JSON or msgpack).
+    New limits apply from the next ingested batch; past exceedances are kept as recorded.
+    """
+    rules: List[ThresholdRule] = await codec.decode_body(request, List[ThresholdRule])
+    try:
+        updated_count = await async_crud.upsert_threshold_rules(rules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DBBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DBTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Threshold rule update failed: {e}")
+    return codec.respond(
+        request,
+        ApiStatus(status="success", message=f"Successfully updated {updated_count} threshold rules."),
+        status_code=201
+    )
+
+
+async def metrics(request: Request):
+    """GET endpoint exposing request and SQL metrics in the Prometheus text format."""
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_MEDIA_TYPE)
+
 
 # --- API Routes ---
 api_routes = [
+    Route("/readings", endpoint=list_readings, methods=["GET"]),
+    Route("/readings/daily", endpoint=daily_readings, methods=["GET"]),
+    Route("/readings/series", endpoint=reading_series, methods=["GET"]),
     Route("/readings/ingest", endpoint=ingest_readings, methods=["POST"]),
+    Route("/readings/ingest/stream", endpoint=ingest_readings_stream, methods=["POST"]),
+    Route("/readings/live", endpoint=live_readings_stream, methods=["GET"]),
+    Route("/analyzer/latest", endpoint=latest_reading, methods=["GET"]),
     Route("/flows/ingest", endpoint=ingest_flows, methods=["POST"]),
     Route("/factors", endpoint=get_factors, methods=["GET"]),
+    Route("/factors", endpoint=update_factors, methods=["POST"]),
+    Route("/reports/emissions", endpoint=emissions_report, methods=["GET"]),
+    Route("/export/readings", endpoint=export_readings, methods=["GET"]),
+    Route("/export/flows", endpoint=export_flows, methods=["GET"]),
+    Route("/sync/push", endpoint=sync_push, methods=["POST"]),
+    Route("/sync/pull", endpoint=sync_pull, methods=["GET"]),
+    Route("/exceedances", endpoint=list_exceedances, methods=["GET"]),
+    Route("/thresholds", endpoint=get_thresholds, methods=["GET"]),
+    Route("/thresholds", endpoint=update_thresholds, methods=["POST"]),
+    Route("/metrics", endpoint=metrics, methods=["GET"]),
 ]
\ No newline at end of file
@@ -0,0 +1,88 @@
+# src/gastrack/api/streaming.py
+"""
+Incremental record framing for streamed request bodies.
+
+Two framings are supported, one record at a time, so memory stays flat no matter
+how large the upload is:
+- NDJSON:                 one JSON object per line.
+- Length-prefixed msgpack: 4-byte big-endian unsigned length, then that many bytes of msgpack.
+
+Plus the outgoing Server-Sent Events framing used by the live readings stream.
+"""
+from typing import AsyncIterator, Optional, Tuple
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+SSE_MEDIA_TYPE = "text/event-stream"
+
+LENGTH_PREFIX_BYTES = 4
+MAX_RECORD_BYTES = 1 << 20  # a single reading is a few hundred bytes; refuse absurd frames
+
+
+class FramingError(ValueError):
+    """The byte stream cannot be split into records (truncated or oversized frame)."""
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yield (record_index, raw_line) for each non-blank line."""
+    buf = bytearray()
+    index = 0
+    async for chunk in chunks:
+        buf += chunk
+        start = 0
+        while True:
+            end = buf.find(b"\n", start)
+            if end < 0:
+                break
+            line = bytes(buf[start:end]).strip()
+            start = end + 1
+            if line:
+                yield index, line
+                index += 1
+        del buf[:start]
+        if len(buf) > MAX_RECORD_BYTES:
+            raise FramingError(f"Record {index} exceeds {MAX_RECORD_BYTES} bytes without a newline.")
+    tail = bytes(buf).strip()
+    if tail:
+        yield index, tail
+
+
+async def iter_length_prefixed(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yield (record_index, raw_record) for each length-prefixed frame."""
+    buf = bytearray()
+    index = 0
+    async for chunk in chunks:
+        buf += chunk
+        start = 0
+        while len(buf) - start >= LENGTH_PREFIX_BYTES:
+            size = int.from_bytes(buf[start:start + LENGTH_PREFIX_BYTES], "big")
+            if size > MAX_RECORD_BYTES:
+                raise FramingError(f"Record {index} declares {size} bytes (max {MAX_RECORD_BYTES}).")
+            end = start + LENGTH_PREFIX_BYTES + size
+            if len(buf) < end:
+                break
+            yield index, bytes(buf[start + LENGTH_PREFIX_BYTES:end])
+            index += 1
+            start = end
+        del buf[:start]
+    if buf:
+        raise FramingError(f"Stream ended inside record {index} ({len(buf)} trailing bytes).")
+
+
+def frame_length_prefixed(record: bytes) -> bytes:
+    """Client-side helper: frame one encoded record for a length-prefixed upload."""
+    return len(record).to_bytes(LENGTH_PREFIX_BYTES, "big") + record
+
+
+def sse_event(data: bytes, event: Optional[str] = None, event_id: Optional[str] = None) -> bytes:
+    """One Server-Sent Event. data must be single-line (compact JSON is)."""
+    out = b""
+    if event:
+        out += b"event: " + event.encode() + b"\n"
+    if event_id:
+        out += b"id: " + event_id.encode() + b"\n"
+    return out + b"data: " + data + b"\n\n"
+
+
+def sse_comment(text: str = "") -> bytes:
+    """An SSE comment line; clients ignore it, proxies see traffic (keep-alive)."""
+    return b": " + text.encode() + b"\n\n"
@@ -0,0 +1,266 @@
+# src/gastrack/core/cache.py
+"""
+In-process caches that keep hot, rarely-changing reads off SQLite.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import msgspec
+
+from src.gastrack.core.models import AnalyzerReading, Factor
+
+# Cached bodies are kept in both wire formats the API speaks (see api/codec.py).
+_encoders = {"json": msgspec.json.Encoder(), "msgpack": msgspec.msgpack.Encoder()}
+
+
+def _encode_all(obj) -> Dict[str, bytes]:
+    return {fmt: encoder.encode(obj) for fmt, encoder in _encoders.items()}
+
+
+def _utc(ts: datetime) -> datetime:
+    """Naive timestamps are taken as UTC so they compare with aware ones."""
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)
+
+
+class LatestReadingCache:
+    """
+    Last-value cache: the newest AnalyzerReading per sample_point, plus its
+    pre-encoded JSON and msgpack bodies, so dashboard polling never touches SQLite.
+
+    Written from the DB writer thread after each commit, read from the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest: Dict[str, AnalyzerReading] = {}
+        self._encoded: Dict[str, Dict[str, bytes]] = {}
+
+    def update(self, readings: Iterable[AnalyzerReading]) -> None:
+        """Keep a reading only if it is newer than the cached one (backfills don't regress the gauges)."""
+        newest: Dict[str, AnalyzerReading] = {}
+        for r in readings:
+            current = newest.get(r.sample_point)
+            if current is None or _utc(r.timestamp) >= _utc(current.timestamp):
+                newest[r.sample_point] = r
+        if not newest:
+            return
+        with self._lock:
+            for point, r in newest.items():
+                cached = self._latest.get(point)
+                if cached is None or _utc(r.timestamp) >= _utc(cached.timestamp):
+                    self._latest[point] = r
+                    self._encoded[point] = _encode_all(r)
+
+    def get(self, sample_point: str) -> Optional[AnalyzerReading]:
+        return self._latest.get(sample_point)
+
+    def get_encoded(self, sample_point: str, fmt: str = "json") -> Optional[bytes]:
+        encoded = self._encoded.get(sample_point)
+        return None if encoded is None else encoded[fmt]
+
+    def all(self) -> List[AnalyzerReading]:
+        return list(self._latest.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._latest.clear()
+            self._encoded.clear()
+
+
+latest_readings = LatestReadingCache()
+
+
+class FactorSnapshot(msgspec.Struct, frozen=True):
+    """One immutable, fully prepared view of the factors table."""
+    version: int
+    factors: Tuple[Factor, ...]
+    by_key: Dict[str, Factor]
+    bodies: Dict[str, bytes]  # pre-encoded, per wire format
+    etags: Dict[str, str]     # strong ETag per representation
+
+    def value(self, key: str) -> float:
+        return self.by_key[key].value
+
+
+class FactorCache:
+    """
+    The factors table, loaded once and kept until a write invalidates it.
+
+    Every invalidation bumps `version`; a load that raced with a write is
+    discarded instead of caching stale values (compare-and-set on version).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot: Optional[FactorSnapshot] = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def snapshot(self) -> Optional[FactorSnapshot]:
+        return self._snapshot
+
+    def store(self, factors: List[Factor], loaded_at_version: int) -> FactorSnapshot:
+        bodies = _encode_all(factors)
+        snapshot = FactorSnapshot(
+            version=loaded_at_version,
+            factors=tuple(factors),
+            by_key={f.key: f for f in factors},
+            bodies=bodies,
+            # strong ETag: content hash of each representation
+            etags={fmt: '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"' for fmt, body in bodies.items()},
+        )
+        with self._lock:
+            if self._version == loaded_at_version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+
+factor_cache = FactorCache()
+
+
+class SeriesCache:
+    """
+    LRU of encoded downsampled series (GET /api/readings/series).
+
+    An entry stays valid until an ingest adds readings for its sample point inside
+    its time range, so charts of closed historical ranges stay cached while the live
+    end of the data keeps changing. Ingests are kept in a short log of
+    (generation, sample_point, first_us, last_us); if an entry is older than the
+    log reaches back, it is treated as stale.
+    """
+
+    def __init__(self, max_entries: int = 256, max_log: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._generation = 0
+        self._log: deque = deque(maxlen=max_log)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def note_ingest(self, ranges: Dict[str, Tuple[int, int]]) -> None:
+        """ranges: sample_point -> (first, last) epoch-us timestamp of the committed readings."""
+        if not ranges:
+            return
+        with self._lock:
+            self._generation += 1
+            for point, (first, last) in ranges.items():
+                self._log.append((self._generation, point, first, last))
+
+    def _touched(self, point: str, lo: float, hi: float, since: int) -> bool:
+        if self._log and self._log[0][0] > since + 1:
+            return True  # the log no longer covers every ingest since the entry was stored
+        return any(
+            generation > since and p == point and first < hi and last >= lo
+            for generation, p, first, last in self._log
+        )
+
+    def get(self, key: Hashable, fmt: str = "json") -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            generation, point, lo, hi, bodies = entry
+            if generation != self._generation:
+                if self._touched(point, lo, hi, generation):
+                    del self._entries[key]
+                    return None
+                self._entries[key] = (self._generation, point, lo, hi, bodies)
+            self._entries.move_to_end(key)
+            return bodies[fmt]
+
+    def store(self, key: Hashable, point: str, start_us: Optional[int], end_us: Optional[int],
+              generation: int, obj) -> Dict[str, bytes]:
+        """Cache obj's encodings; `generation` must be read before obj was computed (so racing ingests count)."""
+        bodies = _encode_all(obj)
+        if self.max_entries <= 0:
+            return bodies
+        lo = float("-inf") if start_us is None else start_us
+        hi = float("inf") if end_us is None else end_us
+        with self._lock:
+            if generation != self._generation and self._touched(point, lo, hi, generation):
+                return bodies  # computed from data that has changed since
+            self._entries[key] = (self._generation, point, lo, hi, bodies)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return bodies
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+series_cache = SeriesCache(int(os.environ.get("GASTRACK_SERIES_CACHE_ENTRIES", "256")))
+
+
+class DailyResampleCache:
+    """
+    Time-weighted daily values (core/resample.py ResampledDay) per (sample_point, day).
+
+    Invalidated day by day: note_ingest() drops the days of a sample point whose values
+    newly committed readings can change. A per-point generation guards store() against
+    an ingest that raced with the computation (compare-and-set, as in FactorCache).
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], object]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._clears = 0
+
+    def generation(self, sample_point: str) -> Tuple[int, int]:
+        return self._clears, self._generations.get(sample_point, 0)
+
+    def note_ingest(self, days: Dict[str, Iterable[str]]) -> None:
+        """days: sample_point -> the days ('YYYY-MM-DD') whose values may have changed."""
+        if not days:
+            return
+        with self._lock:
+            for point, point_days in days.items():
+                self._generations[point] = self._generations.get(point, 0) + 1
+                for day in point_days:
+                    self._entries.pop((point, day), None)
+
+    def get(self, sample_point: str, day: str):
+        with self._lock:
+            entry = self._entries.get((sample_point, day))
+            if entry is not None:
+                self._entries.move_to_end((sample_point, day))
+            return entry
+
+    def store(self, sample_point: str, generation: Tuple[int, int], days: Iterable) -> None:
+        """Cache ResampledDays computed after reading `generation` for their sample point."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation != (self._clears, self._generations.get(sample_point, 0)):
+                return  # readings of this point were committed while they were computed
+            for day in days:
+                self._entries[(sample_point, day.day)] = day
+                self._entries.move_to_end((sample_point, day.day))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._clears += 1
+
+
+resample_cache = DailyResampleCache(int(os.environ.get("GASTRACK_RESAMPLE_CACHE_DAYS", "4096")))
@@ -0,0 +1,156 @@
+# src/gastrack/core/calcgraph.py
+"""
+The emissions calculation graph (the biogasCalcsV2.xlsx formulas as a DAG).
+
+Every derived daily column is a CalcNode that declares what it reads: input
+columns, other nodes, and factor keys. A change to one input therefore only
+recomputes the nodes that depend on it (see db/derived.py, which persists the
+results and keeps a dirty bitmask per day).
+
+Inputs, per (sample_point, date):
+- FLOW_INPUTS: the date's daily_flow_input row;
+- READING_INPUTS: the day's time-weighted gas composition (core/resample.py).
+
+Nodes are listed in dependency order. Each computes a whole column at once:
+map(operator.mul, a, b) over array('d') columns runs in C, with no per-row
+Python code. Missing inputs are NaN and propagate to NaN outputs (reported as null).
+
+Per day, with flared gas Q [scf/day], mean CH4 [%] and mean H2S [ppm] at the sample point:
+    HHV   [BTU/scf] = CH4 * HHV_PER_CH4_PCT
+    BTU             = Q * HHV
+    MMBtu           = BTU / 1e6
+    NOx/CO/VOC [lb] = MMBtu * EMF_<pollutant>_LBS_MMBTU
+    H2S  [gr/ccf]   = H2S / H2S_PPM_TO_GRAINS_CCF_RATIO
+    H2S  [lb]       = Q / 100 * gr/ccf / 7000
+    SO2  [lb]       = H2S lb * (MW_SO2 / MW_H2S) * EMF_SO2_H2S_CONVERSION_FACTOR
+"""
+import math
+import operator
+from array import array
+from typing import Callable, Collection, Dict, Iterable, List, Optional, Tuple
+
+from msgspec import Struct
+
+from src.gastrack.core.cache import FactorSnapshot
+
+GRAINS_PER_LB = 7000.0
+SCF_PER_CCF = 100.0
+MW_SO2 = 64.066
+MW_H2S = 34.081
+
+NAN = float("nan")
+
+FLOW_INPUTS = ("biogas_flared_scf",)
+READING_INPUTS = ("ch4_pct", "h2s_ppm", "ch4_coverage", "h2s_coverage", "reading_count")
+
+
+# --- Column helpers (whole-column operations) ---
+
+def to_column(values) -> array:
+    """A float column from values, None as NaN."""
+    return array("d", [NAN if v is None else v for v in values])
+
+
+def _mul(a: array, b: array) -> array:
+    return array("d", map(operator.mul, a, b))
+
+
+def _scale(a: array, k: float) -> array:
+    return array("d", map(k.__mul__, a))
+
+
+def nan_to_none(a: array) -> List[Optional[float]]:
+    """A column as a list, NaN as None (for storage and the API)."""
+    return [None if math.isnan(v) else v for v in a]
+
+
+def nansum(a: array) -> float:
+    """Exact sum of a column, skipping NaN (missing) values."""
+    return math.fsum(v for v in a if not math.isnan(v))
+
+
+# --- Nodes ---
+
+class CalcNode(Struct, frozen=True):
+    name: str
+    inputs: Tuple[str, ...]   # input columns or earlier nodes
+    factors: Tuple[str, ...]  # factor keys, passed after the input columns
+    fn: Callable[..., array]
+
+
+def _btu(flared_scf: array, ch4_pct: array, hhv_per_ch4_pct: float) -> array:
+    return _mul(flared_scf, _scale(ch4_pct, hhv_per_ch4_pct))
+
+
+def _mmbtu(btu: array) -> array:
+    return _scale(btu, 1e-6)
+
+
+def _so2_lbs(flared_scf: array, h2s_ppm: array, ppm_per_grains_ccf: float, so2_conversion: float) -> array:
+    grains_per_ccf = _scale(h2s_ppm, 1.0 / ppm_per_grains_ccf)
+    h2s_lbs = _mul(_scale(flared_scf, 1.0 / SCF_PER_CCF / GRAINS_PER_LB), grains_per_ccf)
+    return _scale(h2s_lbs, MW_SO2 / MW_H2S * so2_conversion)
+
+
+NODES = (
+    CalcNode("btu", ("biogas_flared_scf", "ch4_pct"), ("HHV_PER_CH4_PCT",), _btu),
+    CalcNode("mmbtu", ("btu",), (), _mmbtu),
+    CalcNode("nox_lbs", ("mmbtu",), ("EMF_NOX_LBS_MMBTU",), _scale),
+    CalcNode("co_lbs", ("mmbtu",), ("EMF_CO_LBS_MMBTU",), _scale),
+    CalcNode("voc_lbs", ("mmbtu",), ("EMF_VOC_LBS_MMBTU",), _scale),
+    CalcNode(
+        "so2_lbs", ("biogas_flared_scf", "h2s_ppm"),
+        ("H2S_PPM_TO_GRAINS_CCF_RATIO", "EMF_SO2_H2S_CONVERSION_FACTOR"), _so2_lbs,
+    ),
+)
+
+OUTPUT_COLUMNS = tuple(node.name for node in NODES)
+
+# Dirty-mask bits: the reading inputs as one group (reloading them means resampling the
+# readings), then one per node. Persisted by db/derived.py: only append to this.
+READINGS = "readings"
+DIRTY_BITS: Dict[str, int] = {name: 1 << i for i, name in enumerate((READINGS,) + OUTPUT_COLUMNS)}
+ALL_DIRTY = sum(DIRTY_BITS.values())
+
+
+def dependents(changed: Iterable[str]) -> List[str]:
+    """Names of the nodes reading any of `changed`, directly or through other nodes, in dependency order."""
+    affected = set(changed)
+    names = []
+    for node in NODES:
+        if affected.intersection(node.inputs):
+            affected.add(node.name)
+            names.append(node.name)
+    return names
+
+
+def dirty_mask(names: Iterable[str]) -> int:
+    mask = 0
+    for name in names:
+        mask |= DIRTY_BITS[name]
+    return mask
+
+
+def flow_mask() -> int:
+    """Nodes to recompute when a date's flows change."""
+    return dirty_mask(dependents(FLOW_INPUTS))
+
+
+def readings_mask() -> int:
+    """Reading inputs to reload, and nodes to recompute, when a day's readings change."""
+    return dirty_mask([READINGS, *dependents(READING_INPUTS)])
+
+
+def factor_mask(keys: Collection[str]) -> int:
+    """Nodes to recompute when the values of factor `keys` change."""
+    direct = [node.name for node in NODES if set(node.factors) & set(keys)]
+    return dirty_mask(direct + dependents(direct))
+
+
+def evaluate(columns: Dict[str, array], factors: FactorSnapshot, names: Optional[Collection[str]] = None) -> Dict[str, array]:
+    """Compute the nodes in `names` (default: all) into `columns`, which holds their inputs; returns columns."""
+    for node in NODES:
+        if names is None or node.name in names:
+            args = [columns[name] for name in node.inputs] + [factors.value(key) for key in node.factors]
+            columns[node.name] = node.fn(*args)
+    return columns
@@ -0,0 +1,103 @@
+# src/gastrack/core/calcs.py
+"""
+Monthly emissions / compliance calculations (the biogasCalcsV2.xlsx replacement).
+
+The formulas are the nodes of core/calcgraph.py. Reports read the daily values
+through db/derived.py, which persists them and recomputes only the days (and
+nodes) that an ingest of flows, readings or factors has marked dirty.
+CH4 and H2S are the time-weighted daily means of core/resample.py, so a reading
+counts for as long as it stood rather than once per sample.
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from msgspec import Struct
+
+from src.gastrack.core.cache import FactorSnapshot
+from src.gastrack.core.calcgraph import OUTPUT_COLUMNS, nansum, to_column
+from src.gastrack.db import crud, derived
+
+DEFAULT_SAMPLE_POINT = "Outlet"  # gas composition as it goes to the flare
+
+
+class DailyEmissions(Struct):
+    date: str
+    biogas_flared_scf: Optional[float]
+    ch4_pct: Optional[float]
+    h2s_ppm: Optional[float]
+    reading_count: int
+    ch4_coverage: float  # fraction of the day with a CH4 value in effect (< 1: gaps)
+    h2s_coverage: float
+    btu: Optional[float]
+    mmbtu: Optional[float]
+    nox_lbs: Optional[float]
+    co_lbs: Optional[float]
+    voc_lbs: Optional[float]
+    so2_lbs: Optional[float]
+
+
+class EmissionsReport(Struct):
+    start: str  # inclusive
+    end: str    # exclusive
+    sample_point: str
+    factors_version: int
+    days: List[DailyEmissions]
+    totals: Dict[str, float]
+
+
+# --- Calculation ---
+
+def load_report(
+    start: str,
+    end: str,
+    sample_point: str = DEFAULT_SAMPLE_POINT,
+    factors: Optional[FactorSnapshot] = None,
+) -> Tuple[EmissionsReport, Optional[derived.PendingRows]]:
+    """
+    Daily emissions and totals for the daily_flow_input dates in [start, end), without
+    writing: also the recomputed derived rows, for derived.save() on the write path.
+    """
+    if factors is None:
+        factors = crud.get_factor_snapshot()
+    columns, pending = derived.load_daily(sample_point, start, end, factors)
+    names = tuple(DailyEmissions.__struct_fields__)
+    days = [DailyEmissions(**dict(zip(names, row))) for row in zip(*(columns[name] for name in names))]
+
+    totals = {name: nansum(to_column(columns[name])) for name in ("biogas_flared_scf",) + OUTPUT_COLUMNS}
+    report = EmissionsReport(
+        start=start, end=end, sample_point=sample_point,
+        factors_version=factors.version, days=days, totals=totals,
+    )
+    return report, pending
+
+
+def compute_report(
+    start: str,
+    end: str,
+    sample_point: str = DEFAULT_SAMPLE_POINT,
+    factors: Optional[FactorSnapshot] = None,
+) -> EmissionsReport:
+    """load_report(), saving the recomputed rows in this thread (CLI, scripts)."""
+    report, pending = load_report(start, end, sample_point, factors)
+    if pending is not None:
+        derived.save(pending)
+    return report
+
+
+def month_range(month: str) -> tuple[str, str]:
+    """'2025-09' -> ('2025-09-01', '2025-10-01')."""
+    try:
+        first = date.fromisoformat(f"{month}-01")
+    except ValueError:
+        raise ValueError(f"month must be YYYY-MM, got {month!r}") from None
+    following = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return first.isoformat(), following.isoformat()
+
+
+def compute_monthly_report(
+    month: str,
+    sample_point: str = DEFAULT_SAMPLE_POINT,
+    factors: Optional[FactorSnapshot] = None,
+) -> EmissionsReport:
+    start, end = month_range(month)
+    return compute_report(start, end, sample_point, factors)
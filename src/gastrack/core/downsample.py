@@ -0,0 +1,107 @@
+# src/gastrack/core/downsample.py
+"""
+Downsampling of long reading series for charts (GET /api/readings/series).
+
+Two methods, both bounded by the requested point count however much history exists:
+- "minmax": the range is cut into points/2 equal time buckets; each contributes its
+  minimum and maximum reading (in time order), so every spike survives.
+- "lttb" (default): Largest-Triangle-Three-Buckets on top of a min/max preselection
+  (MinMaxLTTB): SQLite first reduces the range to the extremes of MINMAX_RATIO * points
+  buckets, then LTTB picks the visually most significant points from those.
+
+The raw rows never reach Python when there are more of them than needed; the
+reduction runs as a grouped query over the clustered (sample_point, timestamp) key.
+Columns are array('q') timestamps (epoch us) and array('d') values.
+"""
+import math
+from array import array
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.gastrack.core.models import ReadingSeries
+from src.gastrack.db import crud
+
+METHODS = ("lttb", "minmax")
+# Preselection buckets per output point for LTTB (each bucket yields up to 2 candidates).
+MINMAX_RATIO = 4
+
+
+def merge_extremes(rows: List[tuple]) -> Tuple[array, array]:
+    """(bucket, min_ts, min_v, max_ts, max_v) rows -> time-ordered columns, one point when min is max."""
+    timestamps, values = array("q"), array("d")
+    for _, min_ts, min_v, max_ts, max_v in rows:
+        if min_ts == max_ts:
+            timestamps.append(min_ts)
+            values.append(min_v)
+        elif min_ts < max_ts:
+            timestamps.extend((min_ts, max_ts))
+            values.extend((min_v, max_v))
+        else:
+            timestamps.extend((max_ts, min_ts))
+            values.extend((max_v, min_v))
+    return timestamps, values
+
+
+def lttb(timestamps: array, values: array, threshold: int) -> Tuple[array, array]:
+    """Largest-Triangle-Three-Buckets (Steinarsson, 2013): keep first, last and threshold-2 points."""
+    n = len(timestamps)
+    if threshold >= n or threshold < 3:
+        return timestamps, values
+
+    out_t, out_v = array("q", [timestamps[0]]), array("d", [values[0]])
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # The next bucket's average is the third corner of the triangle.
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_t = sum(timestamps[next_start:next_end]) / span
+        avg_v = sum(values[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        at, av = timestamps[a], values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((at - avg_t) * (values[j] - av) - (at - timestamps[j]) * (avg_v - av))
+            if area > best_area:
+                best, best_area = j, area
+        out_t.append(timestamps[best])
+        out_v.append(values[best])
+        a = best
+
+    out_t.append(timestamps[n - 1])
+    out_v.append(values[n - 1])
+    return out_t, out_v
+
+
+def downsample_series(
+    sample_point: str,
+    channel: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    points: int = 1000,
+    method: str = "lttb",
+) -> ReadingSeries:
+    """At most `points` (timestamp, value) pairs of one channel in [start, end)."""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    first, last, count = crud.get_series_extent(sample_point, channel, start, end)
+
+    if count <= points:
+        timestamps, values = crud.get_series_raw(sample_point, channel, start, end)
+    else:
+        buckets = max(1, points // 2) if method == "minmax" else points * MINMAX_RATIO
+        bucket_us = math.ceil((last - first + 1) / buckets)
+        timestamps, values = merge_extremes(
+            crud.get_series_extremes(sample_point, channel, start, end, first, bucket_us)
+        )
+        if method == "lttb":
+            timestamps, values = lttb(timestamps, values, points)
+
+    return ReadingSeries(
+        sample_point=sample_point, channel=channel, method=method, raw_count=count,
+        timestamps_ms=[t // 1000 for t in timestamps], values=values.tolist(),
+        start=start, end=end,
+    )
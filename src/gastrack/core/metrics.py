@@ -0,0 +1,234 @@
+# src/gastrack/core/metrics.py
+"""
+In-process request and SQL metrics, rendered in the Prometheus text format at /api/metrics.
+
+- MetricsMiddleware (pure ASGI, added in get_app()) counts requests per route and
+  status and records a latency histogram per route.
+- db/connection.py times every SQL statement through sql_metrics and logs the
+  slow ones (GASTRACK_SLOW_QUERY_MS).
+
+Recording is a dict lookup, a bisect and a few additions under a lock, so it
+stays out of the way of the ingest path.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SLOW_QUERY_MS = float(os.environ.get("GASTRACK_SLOW_QUERY_MS", 100))
+SQL_TRACE = os.environ.get("GASTRACK_SQL_TRACE", "1") != "0"
+
+# Distinct SQL statements tracked individually; the rest are counted as "other".
+MAX_SQL_STATEMENTS = 500
+SQL_LABEL_CHARS = 160
+
+_whitespace = re.compile(r"\s+")
+
+
+class Histogram:
+    """Cumulative-on-render bucket counts, sum and count (not thread-safe; owners lock)."""
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total, out = 0, []
+        for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), self.counts):
+            total += n
+            out.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return out
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, str, int], int] = {}
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            key = (method, route, status)
+            self._counts[key] = self._counts.get(key, 0) + 1
+            hist = self._latency.get((method, route))
+            if hist is None:
+                hist = self._latency[(method, route)] = Histogram()
+            hist.observe(seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._latency.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            counts = sorted(self._counts.items())
+            latency = sorted((key, (h.cumulative(), h.sum, h.count)) for key, h in self._latency.items())
+        lines = [
+            "# HELP gastrack_http_requests_total HTTP requests by route and status code.",
+            "# TYPE gastrack_http_requests_total counter",
+        ]
+        for (method, route, status), n in counts:
+            lines.append(f'gastrack_http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {n}')
+        lines += [
+            "# HELP gastrack_http_request_duration_seconds HTTP request latency by route (until the response is complete).",
+            "# TYPE gastrack_http_request_duration_seconds histogram",
+        ]
+        for (method, route), (buckets, total, count) in latency:
+            labels = f'method="{method}",route="{_escape(route)}"'
+            lines += [f'gastrack_http_request_duration_seconds_bucket{{{labels},le="{le}"}} {n}' for le, n in buckets]
+            lines.append(f"gastrack_http_request_duration_seconds_sum{{{labels}}} {total}")
+            lines.append(f"gastrack_http_request_duration_seconds_count{{{labels}}} {count}")
+        return lines
+
+
+class SqlMetrics:
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS):
+        self.slow_query_seconds = slow_query_ms / 1000.0
+        self._lock = threading.Lock()
+        self._labels: Dict[str, str] = {}  # raw SQL text -> normalised label
+        self._stats: Dict[str, List[float]] = {}  # label -> [count, total seconds, max seconds]
+        self._latency = Histogram()
+        self.slow_count = 0
+
+    def _label(self, sql: str) -> str:
+        label = self._labels.get(sql)
+        if label is None:
+            label = _whitespace.sub(" ", sql).strip()[:SQL_LABEL_CHARS]
+            if label not in self._stats and len(self._stats) >= MAX_SQL_STATEMENTS:
+                label = "other"
+            if len(self._labels) < 4 * MAX_SQL_STATEMENTS:
+                self._labels[sql] = label
+        return label
+
+    def observe(self, sql: str, seconds: float) -> None:
+        with self._lock:
+            label = self._label(sql)
+            stats = self._stats.get(label)
+            if stats is None:
+                stats = self._stats[label] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+            self._latency.observe(seconds)
+            slow = seconds >= self.slow_query_seconds
+            if slow:
+                self.slow_count += 1
+        if slow:
+            logger.warning("Slow SQL (%.1f ms): %s", seconds * 1000, label)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._latency = Histogram()
+            self.slow_count = 0
+
+    def snapshot(self) -> Dict[str, Tuple[int, float, float]]:
+        """label -> (count, total seconds, max seconds)."""
+        with self._lock:
+            return {label: tuple(stats) for label, stats in self._stats.items()}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            stats = sorted(self._stats.items())
+            buckets, total, count = self._latency.cumulative(), self._latency.sum, self._latency.count
+            slow = self.slow_count
+        lines = [
+            "# HELP gastrack_sql_statements_total SQL statements executed, by statement.",
+            "# TYPE gastrack_sql_statements_total counter",
+        ]
+        lines += [f'gastrack_sql_statements_total{{statement="{_escape(label)}"}} {s[0]}' for label, s in stats]
+        lines += [
+            "# HELP gastrack_sql_statement_seconds_total Time spent executing and fetching, by statement.",
+            "# TYPE gastrack_sql_statement_seconds_total counter",
+        ]
+        lines += [f'gastrack_sql_statement_seconds_total{{statement="{_escape(label)}"}} {s[1]}' for label, s in stats]
+        lines += [
+            "# HELP gastrack_sql_statement_max_seconds Slowest single execution, by statement.",
+            "# TYPE gastrack_sql_statement_max_seconds gauge",
+        ]
+        lines += [f'gastrack_sql_statement_max_seconds{{statement="{_escape(label)}"}} {s[2]}' for label, s in stats]
+        lines += [
+            "# HELP gastrack_sql_duration_seconds Latency of all SQL statements.",
+            "# TYPE gastrack_sql_duration_seconds histogram",
+        ]
+        lines += [f'gastrack_sql_duration_seconds_bucket{{le="{le}"}} {n}' for le, n in buckets]
+        lines += [f"gastrack_sql_duration_seconds_sum {total}", f"gastrack_sql_duration_seconds_count {count}"]
+        lines += [
+            "# HELP gastrack_sql_slow_queries_total Statements slower than GASTRACK_SLOW_QUERY_MS.",
+            "# TYPE gastrack_sql_slow_queries_total counter",
+            f"gastrack_sql_slow_queries_total {slow}",
+        ]
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _route_label(scope, mount_type) -> str:
+    """The matched route template (bounded cardinality), never the raw path."""
+    route = scope.get("route")
+    if route is None:
+        return "<unmatched>"
+    if isinstance(route, mount_type):  # static files: one label for the whole mount
+        return (route.path or "") + "/*"
+    prefix = scope.get("root_path", "")[len(scope.get("app_root_path", "")):]
+    return prefix + route.path
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware task/queue overhead per request)."""
+
+    def __init__(self, app, metrics: "RequestMetrics" = None):
+        # Imported here so db/connection.py can use sql_metrics without pulling in Starlette.
+        from starlette.routing import Mount
+
+        self.app = app
+        self.metrics = metrics or request_metrics
+        self._mount_type = Mount
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.observe(scope["method"], _route_label(scope, self._mount_type), status, time.perf_counter() - start)
+
+
+request_metrics = RequestMetrics()
+sql_metrics = SqlMetrics()
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_prometheus() -> str:
+    return "\n".join(request_metrics.render() + sql_metrics.render()) + "\n"
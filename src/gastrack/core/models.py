@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import Optional, Literal
+from typing import Dict, Optional, Literal
 from msgspec import Struct, field
 
 # Define the valid sample points based on your spreadsheet data
@@ -31,6 +31,26 @@ class AnalyzerReading(Struct, kw_only=True):
     is_manual_override: bool = False
     override_note: Optional[str] = None
 
+# The numeric measurement channels of an AnalyzerReading.
+GAS_CHANNELS = ('o2_pct', 'co2_pct', 'h2s_ppm', 'ch4_pct', 'net_cal_val_mj_m3',
+                'gross_cal_val_mj_m3', 't_sensor_f', 'balance_n2_pct')
+
+# --- Daily Rollup Model (read side of rollup_analyzer_daily) ---
+class ChannelStats(Struct):
+    count: int
+    sum: float
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+
+class DailyRollup(Struct):
+    day: str
+    sample_point: SAMPLE_POINTS
+    reading_count: int
+    first_timestamp: Optional[datetime] = None
+    last_timestamp: Optional[datetime] = None
+    channels: Dict[str, ChannelStats] = {}
+
 # --- Daily Flow Input Model ---
 class DailyFlowInput(Struct):
     date: str # Use string for date entry (e.g., "2025-09-01") for simplicity
@@ -45,4 +65,81 @@ class DailyFlowInput(Struct):
 class Factor(Struct):
     key: str
     value: float
-    description: Optional[str] = None
\ No newline at end of file
+    description: Optional[str] = None
+
+# --- Threshold rules and exceedances (core/rules.py) ---
+class ThresholdRule(Struct, kw_only=True):
+    key: str
+    channel: str  # one of GAS_CHANNELS
+    op: Literal['above', 'below']
+    limit: float
+    window_s: float = 0.0  # > 0: compare the time-weighted average over the trailing window
+    sample_point: Optional[SAMPLE_POINTS] = None  # None: every sample point
+    description: Optional[str] = None
+
+class Exceedance(Struct):
+    id: int
+    rule: str
+    sample_point: SAMPLE_POINTS
+    channel: str
+    op: str
+    limit: float
+    window_s: float
+    start: datetime
+    peak: float
+    peak_at: datetime
+    reading_count: int
+    end: Optional[datetime] = None  # None while the exceedance is still open
+    duration_s: Optional[float] = None
+
+# --- API response models ---
+class ApiStatus(Struct):
+    status: str
+    message: str
+
+class ReadingsPage(Struct):
+    items: list[AnalyzerReading]
+    next_cursor: Optional[str] = None
+
+class RecordError(Struct):
+    record: int
+    error: str
+
+class ChunkSummary(Struct):
+    chunk: int
+    first_record: int
+    last_record: int
+    inserted: int = 0
+    rejected: int = 0
+    error: Optional[str] = None
+
+class StreamIngestResult(Struct):
+    status: str
+    message: str
+    inserted: int
+    error_count: int
+    errors: list[RecordError]
+    chunks: list[ChunkSummary]
+
+class SyncPushResult(Struct):
+    batch_id: str
+    status: str  # "applied", or "replayed" when the batch id was already committed
+    received: int
+    inserted: int
+    duplicates: int  # readings whose id was already stored
+
+class SyncChanges(Struct):
+    readings: list[AnalyzerReading]
+    cursor: int  # pass as since= to get the changes after these
+    more: bool
+
+class ReadingSeries(Struct):
+    """One channel of one sample point, downsampled for charting (columnar, epoch milliseconds)."""
+    sample_point: SAMPLE_POINTS
+    channel: str
+    method: str
+    raw_count: int
+    timestamps_ms: list[int]
+    values: list[float]
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
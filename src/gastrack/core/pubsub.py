@@ -0,0 +1,133 @@
+# src/gastrack/core/pubsub.py
+"""
+In-process pub/sub fan-out of newly committed analyzer readings.
+
+crud publishes every committed batch (from whatever thread committed it); each
+subscriber (one per open /api/readings/live connection) gets its own bounded
+queue, optionally filtered by sample_point. A slow consumer never blocks ingest
+or other subscribers: when its queue is full the oldest reading is dropped
+(live gauges only care about the newest values) and the drop is counted.
+"""
+import asyncio
+import threading
+from typing import Iterable, List, Optional, Set
+
+import msgspec
+
+from src.gastrack.core.models import AnalyzerReading
+
+DEFAULT_QUEUE_SIZE = 256
+
+_json_encoder = msgspec.json.Encoder()
+
+
+class LiveEvent(msgspec.Struct, frozen=True):
+    """One published reading, encoded once and shared by all subscribers."""
+    reading: AnalyzerReading
+    json_body: bytes
+
+
+class Subscription:
+    def __init__(self, broker: "ReadingBroker", sample_points: Optional[Set[str]], queue_size: int):
+        self._broker = broker
+        self.sample_points = sample_points
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.closed = False
+
+    def wants(self, reading: AnalyzerReading) -> bool:
+        return self.sample_points is None or reading.sample_point in self.sample_points
+
+    def offer(self, event: Optional[LiveEvent]) -> None:
+        """Called on the event loop. Drops the oldest queued event when full."""
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except asyncio.QueueFull:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except asyncio.QueueEmpty:
+                    pass
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[LiveEvent]:
+        """Next event; None when the broker closed. Raises TimeoutError after timeout."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._broker._unsubscribe(self)
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+
+class ReadingBroker:
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def start(self) -> None:
+        """Bind to the running event loop (called from the app lifespan)."""
+        self._loop = asyncio.get_running_loop()
+
+    def close(self) -> None:
+        """End every open subscription (so long-lived responses finish on shutdown)."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for sub in subscribers:
+            sub.closed = True
+            sub.offer(None)
+        self._loop = None
+
+    def subscribe(self, sample_points: Optional[Iterable[str]] = None) -> Subscription:
+        if self._loop is None:
+            self.start()
+        sub = Subscription(self, set(sample_points) if sample_points else None, self.queue_size)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def publish(self, readings: Iterable[AnalyzerReading]) -> None:
+        """Thread-safe; a no-op when nobody is listening or no loop is bound (CLI, scripts)."""
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        events = [LiveEvent(reading=r, json_body=_json_encoder.encode(r)) for r in readings]
+        if not events:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fan_out(events)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._fan_out, events)
+
+    def _fan_out(self, events: List[LiveEvent]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            for event in events:
+                if sub.wants(event.reading):
+                    sub.offer(event)
+
+
+live_readings = ReadingBroker()
@@ -0,0 +1,171 @@
+# src/gastrack/core/report_batch.py
+"""
+Multi-period, multi-scenario emissions reports (`gastrack report --year`).
+
+A batch is every (scenario, month) pair: the baseline scenario uses the stored
+factors, the others override some of them ("what if EMF_NOX_LBS_MMBTU were 0.1").
+Each pair is one job for a process pool (spawn, one process per CPU by default);
+every worker opens its own read-only connection pool on the database file and
+computes its months' totals through db/derived.py, so stale days are recomputed in
+parallel. Workers never write: the baseline's recomputed rows come back with the
+results and this process saves them (derived.save skips them if anything was
+marked meanwhile). Scenario results are never persisted.
+
+All jobs use the factor snapshot read here, once, so the scenarios of one batch
+are compared against the same baseline even if the factors change while it runs.
+"""
+import multiprocessing
+import os
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import msgspec
+from msgspec import Struct
+
+from src.gastrack.core.cache import FactorCache, FactorSnapshot
+from src.gastrack.core.calcs import DEFAULT_SAMPLE_POINT, month_range
+from src.gastrack.db import connection, crud, derived
+
+BASELINE = "baseline"
+
+
+class Scenario(Struct, frozen=True):
+    name: str
+    overrides: Dict[str, float] = {}  # factor key -> value used instead of the stored one
+
+
+class PeriodTotals(Struct):
+    scenario: str
+    month: str
+    days: int
+    totals: Dict[str, float]
+
+
+class BatchReport(Struct):
+    sample_point: str
+    factors_version: int
+    months: List[str]
+    scenarios: List[Scenario]
+    periods: List[PeriodTotals]          # by scenario, then month
+    totals: Dict[str, Dict[str, float]]  # per scenario, over all months (days + TOTAL_COLUMNS)
+
+
+def parse_scenario(spec: str) -> Scenario:
+    """'low-nox:EMF_NOX_LBS_MMBTU=0.05,EMF_CO_LBS_MMBTU=0.3' -> Scenario."""
+    name, sep, assignments = spec.partition(":")
+    name = name.strip()
+    if not sep or not name or name == BASELINE:
+        raise ValueError(f"scenario must be NAME:KEY=VALUE[,KEY=VALUE...] (NAME not {BASELINE!r}), got {spec!r}")
+    overrides = {}
+    for assignment in assignments.split(","):
+        key, sep, value = assignment.partition("=")
+        try:
+            overrides[key.strip()] = float(value)
+        except ValueError:
+            sep = ""
+        if not sep or not key.strip():
+            raise ValueError(f"scenario {name!r}: expected KEY=VALUE, got {assignment!r}")
+    return Scenario(name=name, overrides=overrides)
+
+
+def year_months(year: int) -> List[str]:
+    return [date(year, m, 1).strftime("%Y-%m") for m in range(1, 13)]
+
+
+def scenario_factors(base: FactorSnapshot, scenario: Scenario) -> FactorSnapshot:
+    """`base` with the scenario's overrides applied; ValueError for keys that are not stored factors."""
+    unknown = sorted(set(scenario.overrides) - set(base.by_key))
+    if unknown:
+        raise ValueError(f"scenario {scenario.name!r}: unknown factor(s) {', '.join(unknown)}")
+    factors = [
+        msgspec.structs.replace(f, value=scenario.overrides[f.key]) if f.key in scenario.overrides else f
+        for f in base.factors
+    ]
+    return FactorCache().store(factors, base.version)  # a private cache: only builds the snapshot
+
+
+# --- Worker processes ---
+
+_worker_factors: Dict[str, FactorSnapshot] = {}
+
+
+def _init_worker(db_path: Path, factors: Dict[str, FactorSnapshot]) -> None:
+    global _worker_factors
+    _worker_factors = factors
+    connection.open_pool(db_path, read_only=True)
+
+
+def _run_job(job: Tuple[str, str, str]) -> Tuple[str, str, Dict[str, float], Optional[derived.PendingRows]]:
+    scenario, month, sample_point = job
+    totals, pending = derived.load_monthly_totals(sample_point, {month: month_range(month)}, _worker_factors[scenario])
+    return scenario, month, totals[month], pending
+
+
+def run_batch(
+    months: List[str],
+    scenarios: List[Scenario] = (),
+    sample_point: str = DEFAULT_SAMPLE_POINT,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> BatchReport:
+    """
+    Totals per month for the baseline and each scenario, computed by `workers`
+    processes (default: one per CPU; 1 computes them in this process).
+    `progress(done, total)` is called as jobs finish.
+    """
+    for month in months:
+        month_range(month)  # ValueError before any process starts
+    names = [s.name for s in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError("scenario names must be unique")
+    scenarios = [Scenario(name=BASELINE), *scenarios]
+    base = crud.get_factor_snapshot()
+    factors = {s.name: scenario_factors(base, s) if s.overrides else base for s in scenarios}
+
+    jobs = [(s.name, month, sample_point) for s in scenarios for month in months]
+    results: Dict[Tuple[str, str], Dict[str, float]] = {}
+    pending: List[derived.PendingRows] = []
+
+    def collect(outcomes) -> None:
+        for done, (scenario, month, totals, rows) in enumerate(outcomes, 1):
+            results[scenario, month] = totals
+            if rows is not None:
+                pending.append(rows)
+            if progress is not None:
+                progress(done, len(jobs))
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        # spawn: workers open their own connections, and fork is unsafe once threads exist (server, tests).
+        ctx = multiprocessing.get_context("spawn")
+        initargs = (connection.current_db_path(), factors)
+        with ctx.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            collect(pool.imap_unordered(_run_job, jobs))
+    else:
+        _worker_factors.update(factors)
+        try:
+            collect(map(_run_job, jobs))
+        finally:
+            _worker_factors.clear()
+
+    for rows in pending:
+        derived.save(rows)
+
+    periods = [
+        PeriodTotals(
+            scenario=scenario, month=month, days=int(results[scenario, month]["days"]),
+            totals={k: v for k, v in results[scenario, month].items() if k != "days"},
+        )
+        for scenario, month, _ in jobs
+    ]
+    totals = {}
+    for period in periods:
+        summed = totals.setdefault(period.scenario, {"days": 0, **dict.fromkeys(derived.TOTAL_COLUMNS, 0.0)})
+        summed["days"] += period.days
+        for name, value in period.totals.items():
+            summed[name] += value
+    return BatchReport(
+        sample_point=sample_point, factors_version=base.version, months=list(months),
+        scenarios=scenarios, periods=periods, totals=totals,
+    )
@@ -0,0 +1,141 @@
+# src/gastrack/core/resample.py
+"""
+Time-weighted daily resampling of the irregular analyzer readings onto the daily
+grid of daily_flow_input.
+
+Each reading's value stays in effect until the next reading of the same channel,
+but for at most MAX_GAP_S (last observation carried forward, as in core/rules.py);
+time no value is in effect for is a gap. Per UTC day and channel:
+    mean     = integral of the carried value over the day / covered time
+    coverage = covered time / 24 h   (gap: coverage < 1)
+    last     = value in effect at the end of the day (None if it went stale)
+    count    = readings within the day
+
+The day integrals come from one pass over sorted array('q') / array('d') columns:
+segment lengths, areas and their running sums are whole-column operations
+(map / accumulate run in C), and the integral up to a day boundary is then a
+bisect into those running sums, so the per-reading work has no Python loop.
+"""
+import operator
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, compress, repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from msgspec import Struct
+
+from src.gastrack.core.rules import MAX_GAP_S
+from src.gastrack.db.storage import US_PER_DAY, US_PER_SECOND, day_of
+
+MAX_GAP_US = int(MAX_GAP_S * US_PER_SECOND)
+
+_NEVER = 2 ** 63 - 1  # "no next reading" for the last segment
+
+
+class ChannelDay(Struct, frozen=True):
+    mean: Optional[float]  # time-weighted over the covered part of the day
+    coverage: float        # fraction of the day with a value in effect
+    gap: bool              # some part of the day had no value in effect
+    last: Optional[float]  # LOCF value at the end of the day
+    count: int             # readings of this channel within the day
+
+
+class ResampledDay(Struct, frozen=True):
+    sample_point: str
+    day: str
+    reading_count: int
+    channels: Dict[str, ChannelDay]
+
+
+class Segments(Struct, frozen=True):
+    """Timing columns of sorted readings: reading i's value is in effect for lengths[i] us."""
+    timestamps: array
+    lengths: array
+    covered_before: array  # running sum of lengths, len(timestamps) + 1
+
+
+def segments(timestamps: array, max_gap_us: int = MAX_GAP_US) -> Segments:
+    lengths = timestamps[1:]
+    lengths.append(_NEVER)
+    lengths = array("q", map(operator.sub, lengths, timestamps))
+    # Clip the (few) segments longer than the gap instead of a min() over every one.
+    for i in compress(range(len(lengths)), map(max_gap_us.__lt__, lengths)):
+        lengths[i] = max_gap_us
+    return Segments(timestamps, lengths, array("q", accumulate(lengths, initial=0)))
+
+
+def resample_channel(
+    timestamps: array, values: array, origin_us: int, n_days: int, max_gap_us: int = MAX_GAP_US,
+    timing: Optional[Segments] = None,
+) -> List[ChannelDay]:
+    """
+    Daily ChannelDays for the n_days UTC days from origin_us, from one channel's sorted
+    readings. Readings before origin_us only contribute the value carried into the first day.
+    `timing` may pass segments(timestamps) already computed for another channel.
+    """
+    if not timestamps:
+        return [ChannelDay(mean=None, coverage=0.0, gap=True, last=None, count=0)] * n_days
+    if timing is None:
+        timing = segments(timestamps, max_gap_us)
+    lengths, covered_before = timing.lengths, timing.covered_before
+    area_before = array("d", accumulate(map(operator.mul, values, lengths), initial=0.0))
+
+    def integrals(t: int) -> Tuple[float, int]:
+        """(integral of the carried value, covered time) over (-inf, t)."""
+        k = bisect_right(timestamps, t) - 1
+        if k < 0:
+            return 0.0, 0
+        part = min(t - timestamps[k], lengths[k])
+        return area_before[k] + values[k] * part, covered_before[k] + part
+
+    days = []
+    area_lo, covered_lo = integrals(origin_us)
+    first_lo = bisect_left(timestamps, origin_us)
+    for j in range(n_days):
+        hi = origin_us + (j + 1) * US_PER_DAY
+        area_hi, covered_hi = integrals(hi)
+        first_hi = bisect_left(timestamps, hi)
+        covered = covered_hi - covered_lo
+        k = first_hi - 1  # last reading before the end of the day
+        days.append(ChannelDay(
+            mean=(area_hi - area_lo) / covered if covered else None,
+            coverage=covered / US_PER_DAY,
+            gap=covered < US_PER_DAY,
+            last=values[k] if k >= 0 and timestamps[k] + lengths[k] >= hi else None,
+            count=first_hi - first_lo,
+        ))
+        area_lo, covered_lo, first_lo = area_hi, covered_hi, first_hi
+    return days
+
+
+def resample_daily(
+    sample_point: str, timestamps: array, columns: Dict[str, Sequence], origin_us: int, n_days: int,
+    max_gap_us: int = MAX_GAP_US,
+) -> List[ResampledDay]:
+    """
+    ResampledDays for n_days UTC days from origin_us (a day start), from a sample point's
+    readings sorted by timestamp: timestamps as epoch us and one value column per channel
+    (None where a reading has no value). Pass the readings from origin_us - max_gap_us on,
+    so values carried over midnight into the first day are counted.
+    """
+    per_channel = {}
+    timings: Dict[bytes, Segments] = {}  # channels with values in the same readings share their timing
+    for channel, values in columns.items():
+        present = bytes(map(operator.is_not, values, repeat(None)))
+        timing = timings.get(present)
+        if timing is None:
+            timing = timings[present] = segments(array("q", compress(timestamps, present)), max_gap_us)
+        channel_values = array("d", compress(values, present))
+        per_channel[channel] = resample_channel(
+            timing.timestamps, channel_values, origin_us, n_days, max_gap_us, timing,
+        )
+    bounds = [bisect_left(timestamps, origin_us + j * US_PER_DAY) for j in range(n_days + 1)]
+    return [
+        ResampledDay(
+            sample_point=sample_point,
+            day=day_of(origin_us + j * US_PER_DAY),
+            reading_count=bounds[j + 1] - bounds[j],
+            channels={channel: days[j] for channel, days in per_channel.items()},
+        )
+        for j in range(n_days)
+    ]
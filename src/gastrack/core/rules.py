@@ -0,0 +1,203 @@
+# src/gastrack/core/rules.py
+"""
+Streaming threshold evaluation of analyzer readings (H2S / CH4 / O2 compliance limits).
+
+Every ingest batch is evaluated inside its own transaction (crud._insert_readings), so
+exceedances are found as readings arrive and never need a pass over history.
+Per (rule, sample_point) the engine keeps:
+- the last value, carried forward until the next reading (LOCF);
+- for windowed rules, the time-weighted average over the trailing window_s: a running
+  integral over a deque of step segments, each reading entering and leaving it once
+  (O(1) amortised per reading);
+- the open exceedance, if any: start, peak and number of readings.
+
+An exceedance opens at the first reading whose value (or window average) is past the
+limit and closes at the first one that is not. A value is not carried across a gap
+longer than MAX_GAP_S: the window restarts and an open exceedance ends at the last
+reading before the gap. Readings older than the last evaluated one (late backfill)
+are stored but not evaluated.
+
+State lives in memory but is derived from the database: whenever the evaluating
+connection has seen another connection's commit (PRAGMA data_version, e.g. another
+worker process) or a transaction failed, it is dropped and lazily re-seeded from the
+open exceedance and the readings of the trailing window.
+"""
+import os
+import threading
+from collections import deque
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.gastrack.core.models import AnalyzerReading, ThresholdRule
+from src.gastrack.db.storage import US_PER_SECOND
+
+RULE_OPS = ("above", "below")
+# Longest gap a value is carried across (LOCF) before the rolling state restarts.
+MAX_GAP_S = float(os.environ.get("GASTRACK_RULES_MAX_GAP_S", "7200"))
+
+
+class OpenExceedance:
+    """An exceedance as tracked by the engine (epoch-us timestamps); id is None until inserted."""
+    __slots__ = ("id", "rule", "sample_point", "start_us", "end_us", "peak", "peak_us", "reading_count")
+
+    def __init__(self, rule: ThresholdRule, sample_point: str, start_us: int, value: float,
+                 id: Optional[int] = None, peak_us: Optional[int] = None, reading_count: int = 1,
+                 end_us: Optional[int] = None):
+        self.id = id
+        self.rule = rule
+        self.sample_point = sample_point
+        self.start_us = start_us
+        self.end_us = end_us
+        self.peak = value
+        self.peak_us = start_us if peak_us is None else peak_us
+        self.reading_count = reading_count
+
+
+class _RuleState:
+    __slots__ = ("last_us", "last_value", "segments", "area", "event")
+
+    def __init__(self):
+        self.last_us: Optional[int] = None
+        self.last_value = 0.0
+        self.segments: deque = deque()  # [start_us, end_us, value] steps inside the window
+        self.area = 0.0  # sum of value * duration over segments
+        self.event: Optional[OpenExceedance] = None
+
+    def push(self, ts: int, value: float, window_us: int) -> float:
+        """Add a reading; returns the value the rule compares (window average, or the value itself)."""
+        if window_us and self.last_us is not None and ts > self.last_us:
+            self.segments.append([self.last_us, ts, self.last_value])
+            self.area += self.last_value * (ts - self.last_us)
+        self.last_us, self.last_value = ts, value
+        if not window_us:
+            return value
+
+        horizon = ts - window_us
+        segments = self.segments
+        while segments and segments[0][1] <= horizon:
+            start, end, v = segments.popleft()
+            self.area -= v * (end - start)
+        if not segments:
+            self.area = 0.0  # shed accumulated rounding whenever the window empties
+            return value
+        if segments[0][0] < horizon:
+            self.area -= segments[0][2] * (horizon - segments[0][0])
+            segments[0][0] = horizon
+        return self.area / (ts - segments[0][0])
+
+    def restart(self) -> None:
+        self.last_us = None
+        self.segments.clear()
+        self.area = 0.0
+
+
+# seed(rule, sample_point, before_us) -> (open exceedance or None, [(timestamp_us, value), ...] before before_us)
+SeedFn = Callable[[ThresholdRule, str, int], Tuple[Optional[OpenExceedance], List[Tuple[int, float]]]]
+
+
+class RuleEngine:
+    """Threshold rules and their per-(rule, sample point) rolling state. Not thread-safe on its own:
+    evaluate() runs under the caller's write transaction, so calls are already serialised."""
+
+    def __init__(self, max_gap_s: float = MAX_GAP_S):
+        self.max_gap_us = int(max_gap_s * US_PER_SECOND)
+        self._rules: Optional[List[ThresholdRule]] = None
+        self._states: Dict[Tuple[str, str], _RuleState] = {}
+        self._token: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    @property
+    def rules(self) -> Optional[List[ThresholdRule]]:
+        return self._rules
+
+    def sync(self, token: tuple, load_rules: Callable[[], List[ThresholdRule]]) -> None:
+        """Keep the state only while token (connection, data_version) is unchanged; (re)load rules if needed."""
+        with self._lock:
+            if self._rules is None or token != self._token:
+                self._rules = load_rules()
+                self._states.clear()
+                self._token = token
+
+    def reset(self) -> None:
+        """Forget rules and state (a transaction failed, or the rules changed)."""
+        with self._lock:
+            self._rules = None
+            self._states.clear()
+            self._token = None
+
+    def lookback_us(self, rule: ThresholdRule) -> int:
+        """How far back a seed reads to rebuild the rule's window (and see a gap before the batch)."""
+        return int(rule.window_s * US_PER_SECOND) + self.max_gap_us
+
+    def evaluate(self, readings: Sequence[AnalyzerReading], stamps: Sequence[int], seed: SeedFn) -> List[OpenExceedance]:
+        """
+        Run the readings (with their epoch-us timestamps) through every rule, in time order per
+        sample point. Returns the exceedances opened, extended or closed, to be persisted.
+        """
+        rules = self._rules or []
+        if not rules or not readings:
+            return []
+        order = sorted(range(len(readings)), key=lambda i: (readings[i].sample_point, stamps[i]))
+        ordered = [readings[i] for i in order]
+        points = [r.sample_point for r in ordered]
+        times = [stamps[i] for i in order]
+        columns: Dict[str, list] = {}  # channel -> values in evaluation order, shared by its rules
+        changed: Dict[int, OpenExceedance] = {}
+        for rule in rules:
+            above = rule.op == "above"
+            limit = rule.limit
+            window_us = int(rule.window_s * US_PER_SECOND)
+            values = columns.get(rule.channel)
+            if values is None:
+                values = columns[rule.channel] = list(map(attrgetter(rule.channel), ordered))
+            state = None
+            point = None
+            for sample_point, ts, value in zip(points, times, values):
+                if value is None or (rule.sample_point is not None and sample_point != rule.sample_point):
+                    continue
+                if sample_point != point:
+                    point = sample_point
+                    state = self._state(rule, point, ts, window_us, seed)
+                if state.last_us is not None:
+                    if ts < state.last_us:
+                        continue  # late reading
+                    if ts - state.last_us > self.max_gap_us:
+                        if state.event is not None:
+                            state.event.end_us = state.last_us
+                            changed[id(state.event)] = state.event
+                            state.event = None
+                        state.restart()
+
+                if window_us:
+                    metric = state.push(ts, value, window_us)
+                else:
+                    state.last_us = ts
+                    metric = value
+                event = state.event
+                if (metric > limit) if above else (metric < limit):
+                    if event is None:
+                        state.event = event = OpenExceedance(rule, point, ts, metric, reading_count=0)
+                    elif (metric > event.peak) if above else (metric < event.peak):
+                        event.peak, event.peak_us = metric, ts
+                    event.reading_count += 1
+                    changed[id(event)] = event
+                elif event is not None:
+                    event.end_us = ts
+                    changed[id(event)] = event
+                    state.event = None
+        return list(changed.values())
+
+    def _state(self, rule: ThresholdRule, point: str, first_us: int, window_us: int, seed: SeedFn) -> _RuleState:
+        state = self._states.get((rule.key, point))
+        if state is None:
+            state = self._states[(rule.key, point)] = _RuleState()
+            event, history = seed(rule, point, first_us)
+            for ts, value in history:
+                if state.last_us is not None and ts - state.last_us > self.max_gap_us:
+                    state.restart()
+                state.push(ts, value, window_us)
+            state.event = event
+        return state
+
+
+rule_engine = RuleEngine()
@@ -1,6 +1,8 @@
 # src/gastrack/core/server.py
 import uvicorn
 import os
+import socket
+from contextlib import asynccontextmanager
 from pathlib import Path 
 from starlette.applications import Starlette
 from starlette.routing import Route, Mount
@@ -8,12 +10,20 @@ from starlette.staticfiles import StaticFiles
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse
+from uvicorn.supervisors import Multiprocess
 
 
 # Import the API routes
 from src.gastrack.api.handlers import api_routes
-from src.gastrack.db.connection import init_db
+from src.gastrack.db.connection import init_db, open_pool, close_pool
+from src.gastrack.db.executor import start_executor, shutdown_executor
+from src.gastrack.db.write_queue import start_write_queue, stop_write_queue
+from src.gastrack.db import coherence
+from src.gastrack.db import async_crud
+from src.gastrack.core.cache import latest_readings
+from src.gastrack.core.pubsub import live_readings
 from src.gastrack.core.environment import is_production_build
+from src.gastrack.core.metrics import MetricsMiddleware
 
 # Define the directory where the built frontend files reside using Path
 SERVER_DIR = Path(__file__).resolve().parent
@@ -24,16 +34,38 @@ STATIC_DIR = PROJECT_ROOT / "frontend" / "dist"
 async def homepage(request):
     return JSONResponse({"status": "ok", "message": "GasTrack API is running"})
 
+@asynccontextmanager
+async def lifespan(app):
+    """Keep warm SQLite connections, the DB executor threads and the ingest queue for the lifetime of the app."""
+    open_pool()
+    start_executor()
+    start_write_queue()
+    # Prime the last-value cache so gauge polling never has to hit SQLite.
+    latest_readings.clear()
+    latest_readings.update(await async_crud.get_latest_readings())
+    live_readings.start()
+    if coherence.WORKERS > 1:
+        coherence.start_cache_coherence()  # see other workers' writes
+    try:
+        yield
+    finally:
+        await coherence.stop_cache_coherence()
+        live_readings.close()  # end open live streams so shutdown does not wait on them
+        await stop_write_queue()  # flush queued readings before the threads go away
+        shutdown_executor()
+        close_pool()
+
 def get_app(): # <-- no arguments needed
     """Creates and returns the Starlette application instance."""
 
-    debug = not is_producton_build()
+    debug = not is_production_build()
     
     # Explicitly initialize the database upon app creation
     init_db(conn=None) # it's this one, which was acutally hard won
 
     # Define middleware, especially for development CORS if needed
     middleware = [
+        Middleware(MetricsMiddleware),  # first, so request latency includes CORS handling
         Middleware(
             CORSMiddleware,
             allow_origins=['*'],  # Restrict this in production
@@ -51,23 +83,42 @@ def get_app(): # <-- no arguments needed
     routes.append(api_mount)
 
     # NOTE: Moving this after the API mount ensures API routes get precedence.
-    routes.append(
-        Mount("/", StaticFiles(directory=STATIC_DIR, html=True), name="static")
-    )
+    # The frontend build is optional (API-only use, tests), so only mount it when present.
+    if STATIC_DIR.is_dir():
+        routes.append(
+            Mount("/", StaticFiles(directory=STATIC_DIR, html=True), name="static")
+        )
 
     app = Starlette(
         routes=routes,
         middleware=middleware,
+        lifespan=lifespan,
         debug=debug # Set to False for production PYZ file
     )
     return app # <-- Returns the app instance
 
-# Note: Application lifecycle events (on_startup/on_shutdown) 
-# for database management are often defined here.
+# Note: nothing touches the database at import time. get_app() creates or upgrades the
+# schema with init_db() (skipped when schema_version is current), and the lifespan above
+# owns the pooled DB connections, executor threads and ingest queue while the app runs.
 
-# For now, we rely on the logic in src.gastrack.db.connection 
-# to lazily initialize the database file on first import.
+def run_server(port: int, workers: int = 1):
+    if workers <= 1:
+        app_instance = get_app()
+        uvicorn.run(app_instance, host="127.0.0.1", port=port)
+        return
 
-def run_server(port: int):
-    app_instance = get_app()
-    uvicorn.run(app_instance, host="127.0.0.1", port=port)
+    # Worker processes share the port and the database file: SQLite serialises their
+    # writes (WAL, BEGIN IMMEDIATE, busy_timeout) and db/coherence.py keeps their caches
+    # in step. The schema is created once here, before the workers race for it.
+    init_db()
+    os.environ["GASTRACK_WORKERS"] = str(workers)
+    config = uvicorn.Config("src.gastrack.core.server:get_app", factory=True, host="127.0.0.1", port=port, workers=workers)
+    sock = config.bind_socket()
+    # uvicorn binds the shared socket with proto=0, so asyncio skips TCP_NODELAY on the
+    # accepted connections and every keep-alive response waits ~40 ms on delayed ACKs.
+    # Accepted sockets inherit the option from the listener.
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except OSError:
+        pass
+    Multiprocess(config, sockets=[sock]).run()
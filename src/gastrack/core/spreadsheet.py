@@ -0,0 +1,195 @@
+# src/gastrack/core/spreadsheet.py
+"""
+Streaming row readers for CSV and XLSX files, standard library only (the .pyz ships no openpyxl).
+
+sheet_names(path) lists the tables of a file: the worksheets of a workbook, or one
+table named after the file for a CSV. iter_rows(path, sheet) yields (row_number, values)
+one row at a time, header included, so memory does not grow with the file:
+- CSV: csv.reader over the open file (a UTF-8 BOM from Excel is dropped); values are str.
+- XLSX: the worksheet XML is fed in chunks to an XMLParser whose target keeps only the
+  rows of the current chunk; values are str, float, bool or None. Only the shared-string
+  table is held in memory.
+Excel stores dates and times as serial day numbers; excel_datetime() converts them.
+"""
+import csv
+import posixpath
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import XMLParser, iterparse
+
+CSV_SUFFIXES = (".csv", ".txt")
+XLSX_SUFFIXES = (".xlsx", ".xlsm")
+SPREADSHEET_SUFFIXES = CSV_SUFFIXES + XLSX_SUFFIXES
+
+XML_CHUNK_BYTES = 1 << 16
+
+EXCEL_EPOCH = datetime(1899, 12, 30)  # serial day 0 in the 1900 date system (as Excel counts past 1900-03-01)
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def is_xlsx(path: Path) -> bool:
+    return Path(path).suffix.lower() in XLSX_SUFFIXES
+
+
+def excel_datetime(serial: float) -> datetime:
+    """Naive datetime of an Excel serial date (days since 1899-12-30, fraction = time of day)."""
+    return EXCEL_EPOCH + timedelta(microseconds=round(serial * 86_400_000_000))
+
+
+def sheet_names(path: Path) -> List[str]:
+    path = Path(path)
+    if not is_xlsx(path):
+        return [path.stem]
+    with zipfile.ZipFile(path) as zf:
+        return list(_xlsx_sheet_members(zf))
+
+
+def iter_rows(path: Path, sheet: Optional[str] = None) -> Iterator[Tuple[int, list]]:
+    """(1-based row number, cell values) of every non-empty row of the table."""
+    path = Path(path)
+    if is_xlsx(path):
+        yield from _iter_xlsx_rows(path, sheet)
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield reader.line_num, values
+
+
+# --- XLSX ---
+
+def _xlsx_sheet_members(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """Worksheet name -> zip member holding its XML, in workbook order."""
+    targets = {}
+    with zf.open("xl/_rels/workbook.xml.rels") as f:
+        for _, rel in iterparse(f):
+            if rel.tag == f"{_PKG_REL_NS}Relationship":
+                target = rel.get("Target", "")
+                targets[rel.get("Id")] = target.lstrip("/") if target.startswith("/") else posixpath.normpath(
+                    posixpath.join("xl", target)
+                )
+    members = {}
+    with zf.open("xl/workbook.xml") as f:
+        for _, elem in iterparse(f):
+            if elem.tag == f"{_MAIN_NS}sheet":
+                members[elem.get("name")] = targets[elem.get(f"{_DOC_REL_NS}id")]
+    return members
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings = []
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, elem in iterparse(f):
+            if elem.tag == f"{_MAIN_NS}si":
+                # Plain (<si><t>) or rich text (<si><r><t>...</t></r>...): the text runs joined.
+                strings.append("".join(t.text or "" for t in elem.iter(f"{_MAIN_NS}t")))
+                elem.clear()
+    return strings
+
+
+_COLUMNS: Dict[str, int] = {}
+
+
+def _column_index(ref: str) -> int:
+    """0-based column of a cell reference such as 'AB12'."""
+    letters = ref.rstrip("0123456789")
+    index = _COLUMNS.get(letters)
+    if index is None:
+        index = 0
+        for char in letters.upper():
+            index = index * 26 + ord(char) - 64
+        index = _COLUMNS[letters] = index - 1
+    return index
+
+
+_ROW, _CELL, _VALUE, _TEXT = (f"{_MAIN_NS}{tag}" for tag in ("row", "c", "v", "t"))
+
+
+class _SheetRows:
+    """
+    XMLParser target collecting the rows of a worksheet (parser callbacks, no element tree):
+    markedly faster than iterparse, and only the rows of the last fed chunk are held.
+    """
+
+    def __init__(self, shared: List[str]):
+        self.shared = shared
+        self.rows: List[Tuple[int, list]] = []
+        self.number = 0
+        self.values: list = []
+        self.ref: Optional[str] = None
+        self.kind: Optional[str] = None
+        self.text: List[str] = []
+        self.collect = False
+
+    def start(self, tag, attrib):
+        if tag == _CELL:
+            self.ref = attrib.get("r")
+            self.kind = attrib.get("t")
+            self.text = []
+        elif tag == _VALUE or tag == _TEXT:
+            self.collect = True  # not <f>: formulas are skipped, their cached result is in <v>
+        elif tag == _ROW:
+            self.number = int(attrib.get("r") or self.number + 1)
+            self.values = []
+
+    def data(self, text):
+        if self.collect:
+            self.text.append(text)
+
+    def end(self, tag):
+        if tag == _CELL:
+            values = self.values
+            if self.ref is not None:
+                column = _column_index(self.ref)
+                if column > len(values):
+                    values.extend([None] * (column - len(values)))
+            values.append(self._value("".join(self.text)))
+        elif tag == _VALUE or tag == _TEXT:
+            self.collect = False
+        elif tag == _ROW:
+            if any(value is not None and value != "" for value in self.values):
+                self.rows.append((self.number, self.values))
+
+    def close(self):
+        pass
+
+    def _value(self, text: str):
+        kind = self.kind
+        if kind is None or kind == "n":
+            return float(text) if text else None
+        if kind == "s":
+            return self.shared[int(text)] if text else None
+        if kind == "b":
+            return text == "1"
+        if kind == "e":
+            return None  # #N/A, #DIV/0! ...
+        return text  # inlineStr, 'str' (formula result), 'd' (ISO 8601 date)
+
+
+def _iter_xlsx_rows(path: Path, sheet: Optional[str]) -> Iterator[Tuple[int, list]]:
+    with zipfile.ZipFile(path) as zf:
+        members = _xlsx_sheet_members(zf)
+        if sheet is None:
+            sheet = next(iter(members))
+        if sheet not in members:
+            raise KeyError(f"{path.name} has no worksheet {sheet!r}.")
+        target = _SheetRows(_shared_strings(zf))
+        parser = XMLParser(target=target)
+        with zf.open(members[sheet]) as f:
+            while True:
+                chunk = f.read(XML_CHUNK_BYTES)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+                yield from target.rows
+                target.rows.clear()
+        parser.close()
+        yield from target.rows
@@ -0,0 +1,81 @@
+# src/gastrack/core/startup.py
+"""
+Start-up profiling for `gastrack --profile-startup`.
+
+Times named phases (CLI imports, DB init, app creation) and, while active, every
+module import made through the import statement. Import time is reported as
+self time (excluding the modules it imported in turn), summed per top-level
+package, except for GasTrack's own modules, which are listed individually.
+"""
+import builtins
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+
+class StartupProfile:
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: Dict[str, float] = {}
+        self._stack: List[float] = []  # children time of each import in progress
+        self._original_import = None
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def start_import_timing(self) -> None:
+        if self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            self._stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                key = name if name.startswith("src.") else name.partition(".")[0]
+                self.imports[key] = self.imports.get(key, 0.0) + elapsed - children
+
+        builtins.__import__ = timed_import
+
+    def stop_import_timing(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def print_report(self, console, top: int = 15) -> None:
+        from rich.table import Table
+
+        self.stop_import_timing()
+        phases = Table(title="Start-up phases")
+        phases.add_column("phase")
+        phases.add_column("ms", justify="right")
+        for name, seconds in self.phases:
+            phases.add_row(name, f"{seconds * 1000:,.1f}")
+        phases.add_row("total", f"{sum(s for _, s in self.phases) * 1000:,.1f}", style="bold")
+        console.print(phases)
+
+        if self.imports:
+            imports = Table(title=f"Slowest imports (self time, top {top})")
+            imports.add_column("module")
+            imports.add_column("ms", justify="right")
+            for name, seconds in sorted(self.imports.items(), key=lambda item: -item[1])[:top]:
+                imports.add_row(name, f"{seconds * 1000:,.1f}")
+            imports.add_row("all imports", f"{sum(self.imports.values()) * 1000:,.1f}", style="bold")
+            console.print(imports)
@@ -0,0 +1,246 @@
+# src/gastrack/db/archive.py
+"""
+Tiered retention for ts_analyzer_reading (`gastrack db-archive`).
+
+Closed months are moved out of the hot database into one SQLite file per month
+(ARCHIVE_DIR/gastrack-YYYY-MM.db, same table layout) and recorded in archive_month.
+Rollups stay hot, so reports never open an archive, and inserts, the primary key
+and backups of the hot file only cover recent data.
+
+Moving a month is safe to interrupt and to re-run:
+1. the month's hot rows are copied into its archive file (INSERT OR IGNORE), committed there;
+2. one hot transaction deletes the rows now present in the archive and upserts the catalog row.
+Late readings for an archived month land in the hot table as usual; reads see both,
+and the next run moves them too. The unique reading-id index covers the hot table only.
+
+Reads go through reading_sources(): the plain hot table when no archived month overlaps
+the range, otherwise a UNION ALL of the hot table and the ATTACHed month files, with the
+caller's range filter pushed into every branch. A connection can attach at most
+SQLITE_LIMIT_ATTACHED (10) databases, so longer ranges are read in consecutive time chunks.
+"""
+import sqlite3
+import time
+from contextlib import suppress
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from src.gastrack.db.connection import DB_PATH, _begin_immediate, _connect, init_db
+from src.gastrack.db.paths import ARCHIVE_DIR
+from src.gastrack.db.storage import US_PER_SECOND, day_of, day_start_us
+
+HOT_TABLE = "ts_analyzer_reading"
+DEFAULT_KEEP_MONTHS = 3
+# Archives attached per read chunk; None uses the connection's SQLITE_LIMIT_ATTACHED.
+MAX_ATTACHED: Optional[int] = None
+
+# (lo, hi, from_clause): read the rows of from_clause with lo <= timestamp < hi (None: unbounded).
+Source = Tuple[Optional[int], Optional[int], str]
+
+
+def month_of(us: int) -> str:
+    return day_of(us)[:7]
+
+
+def month_start_us(month: str) -> int:
+    return day_start_us(f"{month}-01")
+
+
+def next_month(month: str) -> str:
+    year, mon = map(int, month.split("-"))
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def cutoff_month(keep_months: int = DEFAULT_KEEP_MONTHS, today: Optional[date] = None) -> str:
+    """The oldest month kept hot: the current UTC month and the keep_months - 1 before it stay."""
+    if keep_months < 1:
+        raise ValueError("keep_months must be at least 1 (the current month is never archived).")
+    today = today or datetime.now(timezone.utc).date()
+    index = today.year * 12 + today.month - 1 - (keep_months - 1)
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def archive_path(month: str, archive_dir: Optional[Path] = None) -> Path:
+    return Path(archive_dir or ARCHIVE_DIR) / f"gastrack-{month}.db"
+
+
+def _schema_name(month: str) -> str:
+    return "arch_" + month.replace("-", "_")
+
+
+# --- Moving months out of the hot database ---
+
+def _hot_sample_points(conn) -> List[str]:
+    """Distinct sample points of the hot table, one primary-key seek each."""
+    points = []
+    row = conn.execute(f"SELECT MIN(sample_point) FROM {HOT_TABLE}").fetchone()
+    while row[0] is not None:
+        points.append(row[0])
+        row = conn.execute(f"SELECT MIN(sample_point) FROM {HOT_TABLE} WHERE sample_point > ?", (row[0],)).fetchone()
+    return points
+
+
+def _hot_months(conn, points: List[str], before_us: int) -> List[str]:
+    """Months before before_us that still have hot readings, oldest first (seeks, no scan)."""
+    sql = f"SELECT MIN(timestamp) FROM {HOT_TABLE} WHERE sample_point = ? AND timestamp >= ? AND timestamp < ?"
+    months = set()
+    for point in points:
+        ts = conn.execute(sql, (point, -(2 ** 63), before_us)).fetchone()[0]
+        while ts is not None:
+            month = month_of(ts)
+            months.add(month)
+            ts = conn.execute(sql, (point, month_start_us(next_month(month)), before_us)).fetchone()[0]
+    return sorted(months)
+
+
+def _archive_month(conn, month: str, points: List[str], path: Path) -> int:
+    """Move one month of hot readings into path. Returns the number of hot rows removed."""
+    lo, hi = month_start_us(month), month_start_us(next_month(month))
+    ddl = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (HOT_TABLE,)).fetchone()[0]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn.execute("ATTACH DATABASE ? AS archive_target", (str(path),))
+    try:
+        # A self-contained file per month: no -wal/-shm next to it.
+        conn.execute("PRAGMA archive_target.journal_mode = DELETE")
+        conn.execute(ddl.replace(f"CREATE TABLE {HOT_TABLE}", f"CREATE TABLE IF NOT EXISTS archive_target.{HOT_TABLE}", 1))
+        with conn:
+            for point in points:
+                conn.execute(
+                    f"INSERT OR IGNORE INTO archive_target.{HOT_TABLE} SELECT * FROM main.{HOT_TABLE} "
+                    "WHERE sample_point = ? AND timestamp >= ? AND timestamp < ?",
+                    (point, lo, hi),
+                )
+
+        _begin_immediate(conn)
+        try:
+            moved = 0
+            for point in points:
+                # Only rows proven to be in the archive: readings ingested since step 1 stay hot.
+                moved += conn.execute(
+                    f"DELETE FROM main.{HOT_TABLE} WHERE sample_point = ? AND timestamp >= ? AND timestamp < ? "
+                    f"AND (timestamp, id) IN (SELECT timestamp, id FROM archive_target.{HOT_TABLE} "
+                    "WHERE sample_point = ? AND timestamp >= ? AND timestamp < ?)",
+                    (point, lo, hi, point, lo, hi),
+                ).rowcount
+            first, last, count = conn.execute(
+                f"SELECT MIN(timestamp), MAX(timestamp), COUNT(*) FROM archive_target.{HOT_TABLE}"
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT INTO main.archive_month (month, path, first_timestamp, last_timestamp, reading_count, archived_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (month) DO UPDATE SET
+                    path = excluded.path, first_timestamp = excluded.first_timestamp,
+                    last_timestamp = excluded.last_timestamp, reading_count = excluded.reading_count,
+                    archived_at = excluded.archived_at
+                """,
+                (month, str(path), first, last, count, int(time.time() * US_PER_SECOND)),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    except BaseException:
+        # Best effort: a failing DETACH must not replace the error that got us here
+        # (archive_months closes the connection anyway).
+        with suppress(sqlite3.Error):
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute("DETACH DATABASE archive_target")
+        raise
+    conn.execute("DETACH DATABASE archive_target")  # both transactions have committed
+    return moved
+
+
+def archive_months(
+    before: str,
+    db_path: Path = DB_PATH,
+    archive_dir: Optional[Path] = None,
+    vacuum: bool = True,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+) -> List[Tuple[str, int]]:
+    """
+    Move the hot readings of every month before `before` ('YYYY-MM') into per-month archive
+    files. Returns (month, readings moved) per month touched; progress(month, done, total)
+    is called after each one. Can run next to the server (writes wait for the lock).
+    """
+    conn = _connect(db_path)
+    try:
+        init_db(conn)
+        points = _hot_sample_points(conn)
+        months = _hot_months(conn, points, month_start_us(before))
+        moved = []
+        for i, month in enumerate(months, 1):
+            moved.append((month, _archive_month(conn, month, points, archive_path(month, archive_dir))))
+            if progress is not None:
+                progress(month, i, len(months))
+        if moved:
+            with conn:
+                # Sync change entries of archived readings (GET /api/sync/pull skips them anyway).
+                conn.execute(
+                    f"DELETE FROM reading_change WHERE NOT EXISTS "
+                    f"(SELECT 1 FROM {HOT_TABLE} r WHERE r.id = reading_change.reading_id)"
+                )
+        if vacuum and moved:
+            conn.execute("VACUUM main")
+        return moved
+    finally:
+        conn.close()
+
+
+# --- Reading across hot and archived data ---
+
+def _archived(conn, start_us: Optional[int], end_us: Optional[int]) -> List[Tuple[str, str]]:
+    """(month, path) of the archives holding readings in [start_us, end_us), oldest first."""
+    clauses, params = [], []
+    if start_us is not None:
+        clauses.append("last_timestamp >= ?")
+        params.append(start_us)
+    if end_us is not None:
+        clauses.append("first_timestamp < ?")
+        params.append(end_us)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return [tuple(row) for row in conn.execute(f"SELECT month, path FROM archive_month {where} ORDER BY month", params)]
+
+
+def _max_attached(conn) -> int:
+    return MAX_ATTACHED or conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+
+
+def _attach(conn, months: List[Tuple[str, str]]) -> None:
+    """Make these archives attached (outside any transaction), detaching others if over the limit."""
+    attached = {row[1] for row in conn.execute("PRAGMA database_list") if row[1].startswith("arch_")}
+    wanted = {_schema_name(month): (month, path) for month, path in months}
+    if len(attached | wanted.keys()) > _max_attached(conn):
+        for name in attached - wanted.keys():
+            conn.execute(f"DETACH DATABASE {name}")
+    for name, (month, path) in wanted.items():
+        if name not in attached:
+            if not Path(path).exists():
+                raise FileNotFoundError(f"Archive for {month} is missing: {path}")
+            conn.execute(f"ATTACH DATABASE ? AS {name}", (path,))
+
+
+def reading_sources(
+    conn, start_us: Optional[int] = None, end_us: Optional[int] = None, newest_first: bool = False,
+) -> Iterator[Source]:
+    """
+    (lo, hi, from_clause) chunks that together cover the readings in [start_us, end_us),
+    in time order (or newest first). The caller must filter each chunk on lo <= timestamp < hi
+    and consume its rows before advancing: the next chunk may detach this one's archives.
+    """
+    months = _archived(conn, start_us, end_us)
+    if not months:
+        yield start_us, end_us, HOT_TABLE
+        return
+
+    per_chunk = _max_attached(conn)
+    chunks = [months[i:i + per_chunk] for i in range(0, len(months), per_chunk)]
+    bounds = [start_us] + [month_start_us(chunk[0][0]) for chunk in chunks[1:]] + [end_us]
+    order = range(len(chunks) - 1, -1, -1) if newest_first else range(len(chunks))
+    for i in order:
+        _attach(conn, chunks[i])
+        branches = [f"SELECT * FROM main.{HOT_TABLE}"] + [
+            f"SELECT * FROM {_schema_name(month)}.{HOT_TABLE}" for month, _ in chunks[i]
+        ]
+        yield bounds[i], bounds[i + 1], f"({' UNION ALL '.join(branches)})"
@@ -0,0 +1,112 @@
+# src/gastrack/db/async_crud.py
+"""
+Awaitable versions of the crud functions, for use from the async Starlette handlers.
+Writes run on the DB executor's single writer thread, reads on its reader pool.
+"""
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from src.gastrack.db import crud
+from src.gastrack.db.executor import get_executor
+from src.gastrack.core.models import (
+    AnalyzerReading, DailyFlowInput, DailyRollup, Exceedance, Factor, SyncChanges, SyncPushResult, ThresholdRule,
+)
+from src.gastrack.core.cache import factor_cache, FactorSnapshot
+
+
+async def ingest_analyzer_readings(readings: List[AnalyzerReading]) -> int:
+    return await get_executor().run_write(crud.ingest_analyzer_readings, readings)
+
+
+async def get_readings_page(
+    sample_point: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after: Optional[Tuple[int, bytes]] = None,
+    limit: int = 500,
+) -> List[AnalyzerReading]:
+    return await get_executor().run_read(crud.get_readings_page, sample_point, start, end, after, limit)
+
+
+async def iter_reading_rows(
+    sample_points: Optional[List[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_rows: int = 5000,
+) -> AsyncIterator[list]:
+    # One reader-pool hop per batch; the generator holds no connection in between.
+    async for rows in _iter_reads(crud.iter_reading_rows(sample_points, start, end, batch_rows)):
+        yield rows
+
+
+async def get_latest_readings() -> List[AnalyzerReading]:
+    return await get_executor().run_read(crud.get_latest_readings)
+
+
+async def get_daily_rollup(
+    sample_point: str, start_day: Optional[str] = None, end_day: Optional[str] = None
+) -> List[DailyRollup]:
+    return await get_executor().run_read(crud.get_daily_rollup, sample_point, start_day, end_day)
+
+
+async def ingest_daily_flow_inputs(flows: List[DailyFlowInput]) -> int:
+    return await get_executor().run_write(crud.ingest_daily_flow_inputs, flows)
+
+
+async def iter_flow_rows(
+    start_date: Optional[str] = None, end_date: Optional[str] = None, batch_rows: int = 5000,
+) -> AsyncIterator[list]:
+    async for rows in _iter_reads(crud.iter_flow_rows(start_date, end_date, batch_rows)):
+        yield rows
+
+
+async def _iter_reads(batches) -> AsyncIterator[list]:
+    executor = get_executor()
+    while True:
+        rows = await executor.run_read(next, batches, None)
+        if rows is None:
+            return
+        yield rows
+
+
+async def get_all_factors() -> List[Factor]:
+    return await get_executor().run_read(crud.get_all_factors)
+
+
+async def get_factor_snapshot() -> FactorSnapshot:
+    # Cache hit: no thread hop at all.
+    snapshot = factor_cache.snapshot()
+    if snapshot is not None:
+        return snapshot
+    return await get_executor().run_read(crud.get_factor_snapshot)
+
+
+async def upsert_factors(factors: List[Factor]) -> int:
+    return await get_executor().run_write(crud.upsert_factors, factors)
+
+
+async def get_exceedances(
+    sample_point: Optional[str] = None,
+    rule: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    open_only: bool = False,
+    limit: int = 1000,
+) -> List[Exceedance]:
+    return await get_executor().run_read(crud.get_exceedances, sample_point, rule, start, end, open_only, limit)
+
+
+async def get_threshold_rules() -> List[ThresholdRule]:
+    return await get_executor().run_read(crud.get_threshold_rules)
+
+
+async def upsert_threshold_rules(rules: List[ThresholdRule]) -> int:
+    return await get_executor().run_write(crud.upsert_threshold_rules, rules)
+
+
+async def sync_push(batch_id: str, readings: List[AnalyzerReading], device_id: Optional[str] = None) -> SyncPushResult:
+    return await get_executor().run_write(crud.sync_push, batch_id, readings, device_id)
+
+
+async def get_changes_since(since: int, limit: int = 5000, sample_points: Optional[List[str]] = None) -> SyncChanges:
+    return await get_executor().run_read(crud.get_changes_since, since, limit, sample_points)
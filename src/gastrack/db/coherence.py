@@ -0,0 +1,131 @@
+# src/gastrack/db/coherence.py
+"""
+Cache coherence between worker processes (`gastrack start --workers N`).
+
+Every worker has its own last-value cache, factor cache and live-stream broker,
+and only sees the writes it made itself. When running with several workers, a
+background task polls PRAGMA data_version on a dedicated connection. That is a
+shared-memory check, and its value changes whenever any other connection commits.
+When it moves, the task re-reads the newest reading per sample point and the
+factors table, then:
+- newer readings go into the last-value cache and out to this worker's live subscribers;
+- changed factors invalidate the factor cache;
+- cached downsampled series and resampled days are dropped (the poll cannot tell which ranges changed).
+
+Other workers' writes therefore show up here within one poll interval. The live
+stream carries the newest value per point from other workers, not every reading.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.gastrack.core.cache import factor_cache, latest_readings, resample_cache, series_cache
+from src.gastrack.core.models import AnalyzerReading, Factor
+from src.gastrack.core.pubsub import live_readings
+from src.gastrack.db import crud
+from src.gastrack.db.connection import DB_PATH, _connect
+from src.gastrack.db.executor import get_executor
+from src.gastrack.db.storage import to_epoch_us
+
+logger = logging.getLogger(__name__)
+
+# Set by `gastrack start --workers N` for the worker processes it spawns.
+WORKERS = int(os.environ.get("GASTRACK_WORKERS", "1"))
+DEFAULT_POLL_MS = float(os.environ.get("GASTRACK_COHERENCE_POLL_MS", "250"))
+
+
+class CacheCoherence:
+    def __init__(self, db_path: Path = DB_PATH, poll_ms: float = DEFAULT_POLL_MS):
+        self.db_path = Path(db_path)
+        self.interval = poll_ms / 1000.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _load_if_changed(self) -> Optional[Tuple[List[AnalyzerReading], List[Factor]]]:
+        """On a reader thread: None if nothing was committed since the last poll."""
+        if self._conn is None:
+            self._conn = _connect(self.db_path)
+            self._conn.execute("PRAGMA query_only = ON")
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return None
+        self._data_version = version
+        return crud.get_latest_readings(), crud.get_all_factors()
+
+    def apply(self, latest: List[AnalyzerReading], factors: List[Factor]) -> None:
+        """On the event loop: fold what the database holds into this worker's caches."""
+        series_cache.clear()
+        resample_cache.clear()
+        fresh = []
+        for reading in latest:
+            cached = latest_readings.get(reading.sample_point)
+            if cached is None or (
+                reading.id != cached.id and to_epoch_us(reading.timestamp) >= to_epoch_us(cached.timestamp)
+            ):
+                fresh.append(reading)
+        if fresh:
+            latest_readings.update(fresh)
+            live_readings.publish(fresh)
+
+        snapshot = factor_cache.snapshot()
+        if snapshot is not None and list(snapshot.factors) != factors:
+            factor_cache.invalidate()
+
+    async def poll_once(self) -> bool:
+        """True if another connection had committed and the caches were refreshed."""
+        loaded = await get_executor().run_read(self._load_if_changed)
+        if loaded is None:
+            return False
+        self.apply(*loaded)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception("Cache coherence poll failed")
+
+    def start(self) -> "CacheCoherence":
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_coherence: Optional[CacheCoherence] = None
+
+
+def start_cache_coherence(**kwargs) -> CacheCoherence:
+    """Start polling for other workers' writes. Called from the app lifespan when WORKERS > 1."""
+    global _coherence
+    if _coherence is None or not _coherence.is_running:
+        _coherence = CacheCoherence(**kwargs).start()
+    return _coherence
+
+
+async def stop_cache_coherence() -> None:
+    global _coherence
+    if _coherence is not None:
+        await _coherence.stop()
+        _coherence = None
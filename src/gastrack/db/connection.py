@@ -1,12 +1,20 @@
 # --- src/gastrack/db/connection.py ---
+import os
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
 
-# Define the paths relative to the current file
-BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
-DB_PATH = BASE_DIR / "gastrack.db"
-SQL_SCHEMA_PATH = BASE_DIR / "src" / "gastrack" / "db" / "init_schema.sql"
+from src.gastrack.core.cache import factor_cache
+from src.gastrack.core.metrics import SQL_TRACE, sql_metrics
+from src.gastrack.db.paths import DB_PATH, SQL_SCHEMA_PATH
+from src.gastrack.db.executor import DBBusyError
+
+# How long a write waits for another connection (or worker process) to release the
+# write lock before giving up with DBBusyError. SQLite's busy handler retries with backoff.
+BUSY_TIMEOUT_MS = int(os.environ.get("GASTRACK_DB_BUSY_TIMEOUT_MS", "5000"))
+
 
 '''
 @contextmanager
@@ -25,14 +33,206 @@ def get_conn():
         conn.close()
 '''
 
-@contextmanager
-def get_db_connection():
-    """Public function – used everywhere in your code."""
-    conn = sqlite3.connect(DB_PATH)
+class TracedCursor(sqlite3.Cursor):
+    """
+    Attributes execute and fetch time to the SQL statement (core/metrics.sql_metrics).
+    sqlite3's trace callback only reports when a statement starts, so timing is done here.
+    """
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        self._sql = sql
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            sql_metrics.observe(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._sql = sql
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            sql_metrics.observe(sql, time.perf_counter() - start)
+
+    def _timed_fetch(self, fetch, *args):
+        start = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            if self._sql is not None:
+                sql_metrics.observe(self._sql, time.perf_counter() - start)
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+
+class TracedConnection(sqlite3.Connection):
+    # Connection.execute() does not go through Cursor.execute(), so route it explicitly.
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    """Open a connection and apply the per-connection PRAGMAs exactly once."""
+    # check_same_thread=False: pooled connections are handed between the event
+    # loop and worker threads, access is serialised by the pool itself.
+    conn = sqlite3.connect(
+        db_path, check_same_thread=False, factory=TracedConnection if SQL_TRACE else sqlite3.Connection,
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
     conn.execute("PRAGMA foreign_keys = ON")
     conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def _begin_immediate(conn: sqlite3.Connection) -> None:
+    """
+    Take the write lock when the transaction starts. A deferred transaction that
+    upgrades from reading to writing fails at once with SQLITE_BUSY when another
+    process holds the lock; BEGIN IMMEDIATE waits for it (busy_timeout) instead.
+    """
+    if conn.in_transaction:
+        return
     try:
+        conn.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError as e:
+        if "locked" in str(e) or "busy" in str(e):
+            raise DBBusyError(f"Database write lock not available within {BUSY_TIMEOUT_MS} ms.") from e
+        raise
+
+
+class ConnectionPool:
+    """
+    Long-lived SQLite connections for the lifetime of the app.
+
+    - One dedicated writer connection, serialised by a lock (SQLite allows a single writer anyway).
+    - One warm reader connection per thread, created on first use.
+
+    Opened and closed by the Starlette lifespan in core/server.get_app().
+    A read_only pool has no writer (report worker processes, core/report_batch.py).
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, read_only: bool = False):
+        self.db_path = Path(db_path)
+        self.read_only = read_only
+        self._open = False
+        self._writer: sqlite3.Connection | None = None
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def open(self) -> "ConnectionPool":
+        if self._writer is None and not self.read_only:
+            self._writer = _connect(self.db_path)
+        self._open = True
+        return self
+
+    def close(self) -> None:
+        self._open = False
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self._local = threading.local()
+
+    @contextmanager
+    def writer(self):
+        """Yield the shared writer connection; commit on success, roll back on error."""
+        with self._write_lock:
+            conn = self._writer
+            if conn is None:
+                raise RuntimeError("ConnectionPool is read-only." if self._open else "ConnectionPool is closed.")
+            _begin_immediate(conn)
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    @contextmanager
+    def reader(self):
+        """Yield this thread's reader connection (query_only, never commits)."""
+        if not self._open:
+            raise RuntimeError("ConnectionPool is closed.")
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.db_path)
+            conn.execute("PRAGMA query_only = ON")
+            with self._readers_lock:
+                self._readers.append(conn)
+            self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            # End any implicit read transaction so the WAL can be checkpointed.
+            if conn.in_transaction:
+                conn.rollback()
+
+
+_pool: ConnectionPool | None = None
+
+
+def open_pool(db_path: Path = DB_PATH, read_only: bool = False) -> ConnectionPool:
+    """Open the process-wide pool. Called from the app lifespan on startup."""
+    global _pool
+    if _pool is None or not _pool.is_open:
+        _pool = ConnectionPool(db_path, read_only).open()
+    return _pool
+
+
+def close_pool() -> None:
+    """Close the process-wide pool. Called from the app lifespan on shutdown."""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def get_pool() -> ConnectionPool | None:
+    return _pool
+
+
+@contextmanager
+def get_db_connection():
+    """
+    Public function – used everywhere in your code.
+    Yields the pooled writer connection while the app is running,
+    otherwise (CLI, scripts) a short-lived connection.
+    """
+    pool = _pool
+    if pool is not None and pool.is_open:
+        with pool.writer() as conn:
+            yield conn
+        return
+
+    conn = _connect(DB_PATH)
+    try:
+        _begin_immediate(conn)
         yield conn
         conn.commit()
     except Exception:
@@ -42,30 +242,86 @@ def get_db_connection():
         conn.close()
 
 
-def init_db(conn=None):
-    """Public function – called from cli.py, server.py, tests, etc."""
-    close_when_done = conn is None
+@contextmanager
+def get_read_connection():
+    """Like get_db_connection(), but for SELECTs: uses this thread's pooled reader."""
+    pool = _pool
+    if pool is not None and pool.is_open:
+        with pool.reader() as conn:
+            yield conn
+        return
+
+    # No write lock here: a plain query_only connection, which (unlike one inside
+    # BEGIN IMMEDIATE) can also ATTACH archive files (db/archive.py).
+    conn = _connect(DB_PATH)
+    try:
+        conn.execute("PRAGMA query_only = ON")
+        yield conn
+    finally:
+        conn.close()
+
+
+def current_db_path() -> Path:
+    """The database file in use: the pool's while the app is running, else DB_PATH."""
+    pool = _pool
+    if pool is not None and pool.is_open:
+        return pool.db_path
+    return DB_PATH
+
+
+# Bump whenever init_schema.sql changes. init_db() only runs the schema script when
+# the database's PRAGMA user_version is older, so app start-up does not pay for it.
+SCHEMA_VERSION = 6
+
+
+def schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def init_db(conn=None, force: bool = False) -> bool:
+    """
+    Public function – called from cli.py, server.py, tests, etc.
+    Creates the database / schema if needed; a database already at SCHEMA_VERSION is
+    left alone unless force=True. Returns True if the schema script ran.
+    """
     if conn is None:
         with get_db_connection() as conn:
-            _run_schema(conn)
-            return  # early return – connection auto-closes
+            return _ensure_schema(conn, force)
+    return _ensure_schema(conn, force)
+
 
+def _ensure_schema(conn, force: bool) -> bool:
+    if not force and schema_version(conn) >= SCHEMA_VERSION:
+        return False
     _run_schema(conn)
-    if close_when_done:
-        conn.close()
+    return True
+
+
+class LegacyStorageError(RuntimeError):
+    """The database still uses the old text-UUID / ISO-timestamp reading layout."""
+
+
+def has_legacy_reading_table(conn) -> bool:
+    """True if ts_analyzer_reading predates the compact WITHOUT ROWID layout (db/storage.py)."""
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'ts_analyzer_reading'"
+    ).fetchone()
+    return row is not None and "WITHOUT ROWID" not in row[0].upper()
+
 
 def _run_schema(conn):
+    if has_legacy_reading_table(conn):
+        raise LegacyStorageError(
+            "gastrack.db uses the old reading storage format. "
+            "Run `gastrack db-migrate-storage` to convert it in place."
+        )
     print("Initializing SQLite schema...")
     schema_sql = SQL_SCHEMA_PATH.read_text()
     conn.executescript(schema_sql)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    factor_cache.invalidate()  # the schema seeds default factors
     print("SQLite schema initialized successfully.")
 
-
-# Auto-create DB + init on first import
-if not DB_PATH.exists():
-    print(f"Database not found at {DB_PATH}. Creating and initializing...")
-    init_db()
-
 '''
 # Auto-create DB + run schema on first import (exactly like your old DuckDB code)
 if not DB_PATH.exists():
@@ -1,11 +1,25 @@
 # src/gastrack/db/crud.py
+import math
+from array import array
 import uuid
-from typing import List
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, get_args
 from msgspec import msgpack
-from datetime import datetime
+from datetime import datetime, timezone
 
-from src.gastrack.db.connection import get_db_connection
-from src.gastrack.core.models import AnalyzerReading, DailyFlowInput, Factor
+from src.gastrack.db import archive
+from src.gastrack.db.connection import _begin_immediate, _connect, current_db_path, get_db_connection, get_read_connection
+from src.gastrack.core.models import (
+    AnalyzerReading, DailyFlowInput, Factor, SAMPLE_POINTS, GAS_CHANNELS, ChannelStats, DailyRollup,
+    Exceedance, ThresholdRule, SyncChanges, SyncPushResult,
+)
+from src.gastrack.core.cache import latest_readings, factor_cache, series_cache, resample_cache, FactorSnapshot
+from src.gastrack.core import calcgraph, resample
+from src.gastrack.core.pubsub import live_readings
+from src.gastrack.core.rules import RULE_OPS, OpenExceedance, rule_engine
+from src.gastrack.db.storage import (
+    US_PER_DAY, US_PER_SECOND, to_epoch_us, from_epoch_us, day_of, day_start_us, blob_to_uuid,
+)
 
 
 ''' # duckdb-style suppression
@@ -102,11 +116,7 @@ def get_all_factors() -> List[Factor]:
 
 '''
 
-def ingest_analyzer_readings(readings: List[AnalyzerReading]) -> int:
-    if not readings:
-        return 0
-
-    sql = """
+INSERT_READING_SQL = """
     INSERT INTO ts_analyzer_reading (
         id, timestamp, sample_point, o2_pct, co2_pct, h2s_ppm, ch4_pct,
         net_cal_val_mj_m3, gross_cal_val_mj_m3, t_sensor_f, balance_n2_pct,
@@ -114,32 +124,511 @@ def ingest_analyzer_readings(readings: List[AnalyzerReading]) -> int:
     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
 
-    data = [
+
+def _reading_rows(readings: List[AnalyzerReading], stamps: List[int]) -> List[tuple]:
+    return [
         (
-            str(r.id), r.timestamp.isoformat(), r.sample_point,
+            r.id.bytes, ts, r.sample_point,
             r.o2_pct, r.co2_pct, r.h2s_ppm, r.ch4_pct,
             r.net_cal_val_mj_m3, r.gross_cal_val_mj_m3, r.t_sensor_f,
             r.balance_n2_pct, int(r.is_manual_override), r.override_note
         )
-        for r in readings
+        for r, ts in zip(readings, stamps)
     ]
 
-    with get_db_connection() as conn:
-        conn.executemany(sql, data)
-        return conn.rowcount
 
+INSERT_CHANGE_SQL = "INSERT INTO reading_change (reading_id) VALUES (?)"
 
-def ingest_daily_flow_inputs(flows: List[DailyFlowInput]) -> int:
-    if not flows:
+
+def _insert_readings(conn, readings: List[AnalyzerReading]) -> int:
+    """Insert readings on an open connection, inside the caller's transaction."""
+    stamps = [to_epoch_us(r.timestamp) for r in readings]
+    rows = _reading_rows(readings, stamps)
+    cur = conn.executemany(INSERT_READING_SQL, rows)
+    conn.executemany(INSERT_CHANGE_SQL, [(row[0],) for row in rows])
+    conn.executemany(UPSERT_ROLLUP_SQL, _rollup_rows(readings, stamps))
+    _evaluate_rules(conn, readings, stamps)
+    _mark_derived_readings(conn, _time_ranges(readings, stamps))
+    return cur.rowcount
+
+
+# --- Dirty marks for the persisted calculation graph (db/derived.py) ---
+
+MARK_DERIVED_DAYS_SQL = "UPDATE derived_daily SET dirty = dirty | ? WHERE sample_point = ? AND date >= ? AND date <= ?"
+MARK_DERIVED_MONTHS_SQL = "UPDATE derived_monthly SET dirty = 1 WHERE sample_point = ? AND month >= ? AND month <= ?"
+BUMP_DERIVED_SQL = "UPDATE derived_state SET generation = generation + 1"
+
+
+def _mark_derived_readings(conn, ranges: Dict[str, Tuple[int, int]]) -> None:
+    """Readings in ranges (sample_point -> first, last epoch us) change the composition of their days and the days they carry into."""
+    mask = calcgraph.readings_mask()
+    for point, (first, last) in ranges.items():
+        first_day, last_day = day_of(first), day_of(last + resample.MAX_GAP_US)
+        conn.execute(MARK_DERIVED_DAYS_SQL, (mask, point, first_day, last_day))
+        conn.execute(MARK_DERIVED_MONTHS_SQL, (point, first_day[:7], last_day[:7]))
+    conn.execute(BUMP_DERIVED_SQL)
+
+
+def _mark_derived_flows(conn, dates: List[str]) -> None:
+    """New flows for `dates`: the nodes reading them, at every sample point."""
+    mask = calcgraph.flow_mask()
+    conn.executemany("UPDATE derived_daily SET dirty = dirty | ? WHERE date = ?", [(mask, d) for d in dates])
+    conn.executemany("UPDATE derived_monthly SET dirty = 1 WHERE month = ?", [(m,) for m in {d[:7] for d in dates}])
+    conn.execute(BUMP_DERIVED_SQL)
+
+
+def _mark_derived_factors(conn, keys: List[str]) -> None:
+    """Changed factor values: the nodes reading them, everywhere."""
+    mask = calcgraph.factor_mask(keys)
+    if mask:
+        conn.execute("UPDATE derived_daily SET dirty = dirty | ?", (mask,))
+        conn.execute("UPDATE derived_monthly SET dirty = 1")
+    conn.execute(BUMP_DERIVED_SQL)
+
+
+# --- Daily rollup (rollup_analyzer_daily) ---
+
+_ROLLUP_STATS = ("count", "sum", "min", "max", "mean")
+_ROLLUP_COLUMNS = ["day", "sample_point", "reading_count", "first_timestamp", "last_timestamp"] + [
+    f"{ch}_{stat}" for ch in GAS_CHANNELS for stat in _ROLLUP_STATS
+]
+
+
+def _rollup_merge(ch: str) -> str:
+    """ON CONFLICT assignments that fold a batch's stats into the stored ones."""
+    return (
+        f"{ch}_count = {ch}_count + excluded.{ch}_count, "
+        f"{ch}_sum = {ch}_sum + excluded.{ch}_sum, "
+        # scalar min()/max() return NULL if either side is NULL, hence the COALESCE fallbacks
+        f"{ch}_min = COALESCE(min({ch}_min, excluded.{ch}_min), {ch}_min, excluded.{ch}_min), "
+        f"{ch}_max = COALESCE(max({ch}_max, excluded.{ch}_max), {ch}_max, excluded.{ch}_max), "
+        f"{ch}_mean = ({ch}_sum + excluded.{ch}_sum) / NULLIF({ch}_count + excluded.{ch}_count, 0)"
+    )
+
+
+UPSERT_ROLLUP_SQL = f"""
+    INSERT INTO rollup_analyzer_daily ({", ".join(_ROLLUP_COLUMNS)})
+    VALUES ({", ".join("?" for _ in _ROLLUP_COLUMNS)})
+    ON CONFLICT (sample_point, day) DO UPDATE SET
+        reading_count = reading_count + excluded.reading_count,
+        first_timestamp = min(first_timestamp, excluded.first_timestamp),
+        last_timestamp = max(last_timestamp, excluded.last_timestamp),
+        {", ".join(_rollup_merge(ch) for ch in GAS_CHANNELS)}
+    """
+
+def _rebuild_rollup_sql(target: str = "rollup_analyzer_daily", source: str = "ts_analyzer_reading", where: str = "") -> str:
+    return f"""
+    INSERT INTO {target} ({", ".join(_ROLLUP_COLUMNS)})
+    SELECT date(timestamp / {US_PER_SECOND}, 'unixepoch'), sample_point, COUNT(*), MIN(timestamp), MAX(timestamp),
+        {", ".join(f"COUNT({ch}), TOTAL({ch}), MIN({ch}), MAX({ch}), AVG({ch})" for ch in GAS_CHANNELS)}
+    FROM {source} {where}
+    GROUP BY sample_point, timestamp / {US_PER_DAY}
+    """
+
+
+REBUILD_ROLLUP_SQL = _rebuild_rollup_sql()
+
+
+def _rollup_rows(readings: List[AnalyzerReading], stamps: List[int]) -> List[tuple]:
+    """Aggregate a batch per (UTC day, sample_point), ready for UPSERT_ROLLUP_SQL."""
+    groups: Dict[Tuple[int, str], Tuple[List[AnalyzerReading], List[int]]] = {}
+    for r, ts in zip(readings, stamps):
+        group = groups.setdefault((ts // US_PER_DAY, r.sample_point), ([], []))
+        group[0].append(r)
+        group[1].append(ts)
+
+    rows = []
+    for (_, point), (group, group_stamps) in groups.items():
+        row = [day_of(group_stamps[0]), point, len(group), min(group_stamps), max(group_stamps)]
+        for ch in GAS_CHANNELS:
+            values = [v for v in map(attrgetter(ch), group) if v is not None]
+            if values:
+                total = math.fsum(values)
+                row += [len(values), total, min(values), max(values), total / len(values)]
+            else:
+                row += [0, 0.0, None, None, None]
+        rows.append(tuple(row))
+    return rows
+
+
+def rebuild_daily_rollup() -> int:
+    """Recompute rollup_analyzer_daily from the raw readings, hot and archived. Returns the number of rollup rows."""
+    # A connection of its own: archives can only be ATTACHed outside a transaction, so the
+    # chunks are aggregated into a temp table first and swapped in with one write transaction.
+    conn = _connect(current_db_path())
+    try:
+        conn.execute("CREATE TEMP TABLE rollup_rebuild AS SELECT * FROM main.rollup_analyzer_daily WHERE 0")
+        for lo, hi, source in archive.reading_sources(conn):
+            where, params = _time_range_where([], [], lo, hi)
+            conn.execute(_rebuild_rollup_sql("temp.rollup_rebuild", source, where), params)
+            conn.commit()  # ends the implicit transaction so the next chunk can ATTACH
+        _begin_immediate(conn)
+        try:
+            conn.execute("DELETE FROM main.rollup_analyzer_daily")
+            conn.execute("INSERT INTO main.rollup_analyzer_daily SELECT * FROM temp.rollup_rebuild")
+            count = conn.execute("SELECT COUNT(*) FROM main.rollup_analyzer_daily").fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return count
+    finally:
+        conn.close()
+
+
+def _optional_ts(us: Optional[int]) -> Optional[datetime]:
+    return None if us is None else from_epoch_us(us)
+
+
+def _row_to_rollup(row) -> DailyRollup:
+    return DailyRollup(
+        day=row["day"], sample_point=row["sample_point"], reading_count=row["reading_count"],
+        first_timestamp=_optional_ts(row["first_timestamp"]), last_timestamp=_optional_ts(row["last_timestamp"]),
+        channels={
+            ch: ChannelStats(**{stat: row[f"{ch}_{stat}"] for stat in _ROLLUP_STATS})
+            for ch in GAS_CHANNELS
+        },
+    )
+
+
+def get_daily_rollup(sample_point: str, start_day: Optional[str] = None, end_day: Optional[str] = None) -> List[DailyRollup]:
+    """Daily stats for a sample point over [start_day, end_day), one row per day."""
+    clauses = ["sample_point = ?"]
+    params: list = [sample_point]
+    if start_day is not None:
+        clauses.append("day >= ?")
+        params.append(start_day)
+    if end_day is not None:
+        clauses.append("day < ?")
+        params.append(end_day)
+    sql = f"SELECT * FROM rollup_analyzer_daily WHERE {' AND '.join(clauses)} ORDER BY day"
+    with get_read_connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [_row_to_rollup(row) for row in rows]
+
+
+def ingest_analyzer_readings(readings: List[AnalyzerReading]) -> int:
+    if not readings:
         return 0
 
-    sql = """
+    try:
+        with get_db_connection() as conn:
+            count = _insert_readings(conn, readings)
+    except Exception:
+        rule_engine.reset()  # it may have advanced on rows that were rolled back
+        raise
+    _after_commit(readings)
+    return count
+
+
+def _after_commit(readings: Iterable[AnalyzerReading]) -> None:
+    """Fan committed readings out to the in-process consumers (never before the commit succeeded)."""
+    readings = list(readings)
+    if readings:
+        latest_readings.update(readings)
+        live_readings.publish(readings)
+        ranges = _time_ranges(readings)
+        series_cache.note_ingest(ranges)
+        resample_cache.note_ingest({point: _resampled_days_touched(first, last) for point, (first, last) in ranges.items()})
+
+
+def _time_ranges(readings: List[AnalyzerReading], stamps: Optional[List[int]] = None) -> Dict[str, Tuple[int, int]]:
+    """sample_point -> (first, last) epoch-us timestamp among readings (stamps: their timestamps, if already converted)."""
+    if stamps is None:
+        stamps = [to_epoch_us(r.timestamp) for r in readings]
+    ranges: Dict[str, Tuple[int, int]] = {}
+    for r, ts in zip(readings, stamps):
+        first, last = ranges.get(r.sample_point, (ts, ts))
+        ranges[r.sample_point] = (min(first, ts), max(last, ts))
+    return ranges
+
+
+def _resampled_days_touched(first_us: int, last_us: int) -> List[str]:
+    """Days whose time-weighted values readings in [first_us, last_us] can change: a value is carried up to MAX_GAP_US."""
+    start = first_us - first_us % US_PER_DAY
+    return [day_of(day_us) for day_us in range(start, last_us + resample.MAX_GAP_US + 1, US_PER_DAY)]
+
+
+def ingest_analyzer_reading_batches(batches: List[List[AnalyzerReading]]) -> List[Union[int, Exception]]:
+    """
+    Group commit: insert several callers' batches in ONE transaction (one fsync).
+    Each batch runs in its own SAVEPOINT, so a bad batch is rolled back on its own
+    and reported back as its exception while the other batches still commit.
+    """
+    results: List[Union[int, Exception]] = []
+    try:
+        with get_db_connection() as conn:
+            # The savepoints must be nested in an open transaction: releasing an outermost
+            # SAVEPOINT commits, which would make every batch its own transaction again.
+            _begin_immediate(conn)
+            for i, readings in enumerate(batches):
+                if not readings:
+                    results.append(0)
+                    continue
+                savepoint = f"batch_{i}"
+                conn.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    results.append(_insert_readings(conn, readings))
+                except Exception as e:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    rule_engine.reset()  # re-seeded from this transaction's view by the next batch
+                    results.append(e)
+                conn.execute(f"RELEASE {savepoint}")
+    except Exception:
+        rule_engine.reset()
+        raise
+    _after_commit(
+        r for readings, result in zip(batches, results) if not isinstance(result, Exception) for r in readings
+    )
+    return results
+
+
+READING_COLUMNS = (
+    "id, timestamp, sample_point, o2_pct, co2_pct, h2s_ppm, ch4_pct, "
+    "net_cal_val_mj_m3, gross_cal_val_mj_m3, t_sensor_f, balance_n2_pct, "
+    "is_manual_override, override_note"
+)
+
+
+def _row_to_reading(row) -> AnalyzerReading:
+    return AnalyzerReading(
+        id=blob_to_uuid(row["id"]),
+        timestamp=from_epoch_us(row["timestamp"]),
+        sample_point=row["sample_point"],
+        o2_pct=row["o2_pct"], co2_pct=row["co2_pct"], h2s_ppm=row["h2s_ppm"], ch4_pct=row["ch4_pct"],
+        net_cal_val_mj_m3=row["net_cal_val_mj_m3"], gross_cal_val_mj_m3=row["gross_cal_val_mj_m3"],
+        t_sensor_f=row["t_sensor_f"], balance_n2_pct=row["balance_n2_pct"],
+        is_manual_override=bool(row["is_manual_override"]), override_note=row["override_note"],
+    )
+
+
+def get_readings_page(
+    sample_point: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after: Optional[Tuple[int, bytes]] = None,
+    limit: int = 500,
+) -> List[AnalyzerReading]:
+    """
+    One keyset page of readings for a sample point in [start, end), ordered by (timestamp, id).
+    `after` is the stored (epoch-us timestamp, id bytes) of the last row of the previous page.
+    Every page is a seek into the clustered primary key, so page N costs the same as page 1.
+    """
+    start_us = None if start is None else to_epoch_us(start)
+    end_us = None if end is None else to_epoch_us(end)
+    return [_row_to_reading(row) for row in _reading_rows_page(sample_point, start_us, end_us, after, limit)]
+
+
+def _reading_rows_page(
+    sample_point: str, start_us: Optional[int], end_us: Optional[int], after: Optional[Tuple[int, bytes]], limit: int,
+) -> list:
+    """get_readings_page() as stored rows (READING_COLUMNS)."""
+    if after is not None and (start_us is None or after[0] > start_us):
+        start_us = after[0]  # archived months before the cursor need not be attached
+    rows = []
+    with get_read_connection() as conn:
+        for lo, hi, source in archive.reading_sources(conn, start_us, end_us):
+            clauses = ["sample_point = ?"]
+            params: list = [sample_point]
+            if after is not None:
+                clauses.append("(timestamp, id) > (?, ?)")
+                params.extend(after)
+            where, params = _time_range_where(clauses, params, lo, hi)
+            sql = f"SELECT {READING_COLUMNS} FROM {source} {where} ORDER BY timestamp, id LIMIT ?"
+            rows += conn.execute(sql, [*params, limit - len(rows)]).fetchall()
+            if len(rows) >= limit:
+                break
+    return rows
+
+
+def iter_reading_rows(
+    sample_points: Optional[List[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_rows: int = 5000,
+) -> Iterator[list]:
+    """
+    Stored rows (READING_COLUMNS) of the readings in [start, end), batch_rows at a time:
+    sample point by sample point (all by default), each in (timestamp, id) order.
+    Every batch is its own keyset query, so memory stays flat and no read transaction
+    is held between batches (the generator may be advanced from any thread).
+    """
+    start_us = None if start is None else to_epoch_us(start)
+    end_us = None if end is None else to_epoch_us(end)
+    for point in sample_points or get_args(SAMPLE_POINTS):
+        after = None
+        while True:
+            rows = _reading_rows_page(point, start_us, end_us, after, batch_rows)
+            if rows:
+                yield rows
+            if len(rows) < batch_rows:
+                break
+            after = (rows[-1]["timestamp"], rows[-1]["id"])
+
+
+def get_latest_readings() -> List[AnalyzerReading]:
+    """
+    The newest reading per sample point (one index seek each), used to prime the last-value cache.
+    Archives are only searched, newest first, for points with no reading in the newest chunk.
+    """
+    latest = {}
+    with get_read_connection() as conn:
+        for lo, hi, source in archive.reading_sources(conn, newest_first=True):
+            where, params = _time_range_where(["sample_point = ?"], [], lo, hi)
+            sql = f"SELECT {READING_COLUMNS} FROM {source} {where} ORDER BY timestamp DESC, id DESC LIMIT 1"
+            for point in get_args(SAMPLE_POINTS):
+                if point not in latest:
+                    row = conn.execute(sql, (point, *params)).fetchone()
+                    if row is not None:
+                        latest[point] = _row_to_reading(row)
+            if len(latest) == len(get_args(SAMPLE_POINTS)):
+                break
+    return [latest[point] for point in get_args(SAMPLE_POINTS) if point in latest]
+
+
+def _time_range_where(clauses: list, params: list, lo: Optional[int], hi: Optional[int]) -> Tuple[str, list]:
+    """WHERE clause for clauses plus lo <= timestamp < hi (None: unbounded), and its params."""
+    clauses, params = list(clauses), list(params)
+    if lo is not None:
+        clauses.append("timestamp >= ?")
+        params.append(lo)
+    if hi is not None:
+        clauses.append("timestamp < ?")
+        params.append(hi)
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+
+def _series_sources(conn, sample_point: str, channel: str, start: Optional[datetime], end: Optional[datetime]):
+    """(from_clause, WHERE clause, params) per hot/archive chunk for one channel's non-null values."""
+    if channel not in GAS_CHANNELS:
+        raise ValueError(f"channel must be one of {GAS_CHANNELS}, got {channel!r}")
+    start_us = None if start is None else to_epoch_us(start)
+    end_us = None if end is None else to_epoch_us(end)
+    for lo, hi, source in archive.reading_sources(conn, start_us, end_us):
+        where, params = _time_range_where(["sample_point = ?", f"{channel} IS NOT NULL"], [sample_point], lo, hi)
+        yield source, where, params
+
+
+def get_series_extent(
+    sample_point: str, channel: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+) -> Tuple[Optional[int], Optional[int], int]:
+    """(first, last epoch-us timestamp, count) of the non-null values of a channel in [start, end)."""
+    first = last = None
+    count = 0
+    with get_read_connection() as conn:
+        for source, where, params in _series_sources(conn, sample_point, channel, start, end):
+            lo, hi, n = conn.execute(f"SELECT MIN(timestamp), MAX(timestamp), COUNT(*) FROM {source} {where}", params).fetchone()
+            if n:
+                first = lo if first is None else min(first, lo)
+                last = hi if last is None else max(last, hi)
+                count += n
+    return first, last, count
+
+
+def get_series_raw(
+    sample_point: str, channel: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+) -> Tuple[array, array]:
+    """Every non-null (epoch-us timestamp, value) of a channel in [start, end), as columns."""
+    timestamps, values = array("q"), array("d")
+    with get_read_connection() as conn:
+        for source, where, params in _series_sources(conn, sample_point, channel, start, end):
+            rows = conn.execute(f"SELECT timestamp, {channel} FROM {source} {where} ORDER BY timestamp", params).fetchall()
+            if rows:
+                chunk_timestamps, chunk_values = zip(*rows)
+                timestamps.extend(chunk_timestamps)
+                values.extend(chunk_values)
+    return timestamps, values
+
+
+def get_series_extremes(
+    sample_point: str, channel: str, start: Optional[datetime], end: Optional[datetime],
+    origin_us: int, bucket_us: int,
+) -> List[tuple]:
+    """
+    Per time bucket of bucket_us starting at origin_us: (bucket, min timestamp, min value,
+    max timestamp, max value). SQLite reports the row holding the MIN/MAX for the bare
+    timestamp column, so the whole reduction happens in one pass in C.
+    A bucket straddling two hot/archive chunks is merged from both.
+    """
+    buckets: Dict[int, tuple] = {}
+    with get_read_connection() as conn:
+        for source, where, params in _series_sources(conn, sample_point, channel, start, end):
+            sql = f"""
+            WITH r AS (
+                SELECT (timestamp - ?) / ? AS bucket, timestamp, {channel} AS v
+                FROM {source} {where}
+            )
+            SELECT lo.bucket, lo.timestamp, lo.v, hi.timestamp, hi.v
+            FROM (SELECT bucket, timestamp, MIN(v) AS v FROM r GROUP BY bucket) lo
+            JOIN (SELECT bucket, timestamp, MAX(v) AS v FROM r GROUP BY bucket) hi USING (bucket)
+            ORDER BY lo.bucket
+            """
+            for row in conn.execute(sql, [origin_us, bucket_us, *params]).fetchall():
+                bucket, min_ts, min_v, max_ts, max_v = row
+                seen = buckets.get(bucket)
+                if seen is not None:
+                    if seen[2] <= min_v:
+                        min_ts, min_v = seen[1], seen[2]
+                    if seen[4] >= max_v:
+                        max_ts, max_v = seen[3], seen[4]
+                buckets[bucket] = (bucket, min_ts, min_v, max_ts, max_v)
+    return list(buckets.values())
+
+
+def get_reading_columns(sample_point: str, start_us: int, end_us: int) -> Tuple[array, Dict[str, tuple]]:
+    """A sample point's readings in [start_us, end_us) as columns: epoch-us timestamps and one tuple per gas channel."""
+    timestamps, rows = array("q"), []
+    with get_read_connection() as conn:
+        for lo, hi, source in archive.reading_sources(conn, start_us, end_us):
+            where, params = _time_range_where(["sample_point = ?"], [sample_point], lo, hi)
+            sql = f"SELECT timestamp, {', '.join(GAS_CHANNELS)} FROM {source} {where} ORDER BY timestamp"
+            rows += conn.execute(sql, params).fetchall()
+    if not rows:
+        return timestamps, {channel: () for channel in GAS_CHANNELS}
+    columns = list(zip(*rows))
+    timestamps.extend(columns[0])
+    return timestamps, dict(zip(GAS_CHANNELS, columns[1:]))
+
+
+RESAMPLE_CHUNK_DAYS = 31
+
+
+def get_resampled_days(sample_point: str, start_day: str, end_day: str, cached: bool = True) -> List[resample.ResampledDay]:
+    """
+    Time-weighted daily values (core/resample.py) for the days in [start_day, end_day).
+    Days are served from resample_cache; the span of the missing ones is computed in
+    one pass per RESAMPLE_CHUNK_DAYS over its readings (plus MAX_GAP_US before each
+    chunk, for the carried-in value).
+    cached=False reads the readings as committed now, without using or filling the cache
+    (whose invalidation trails the commit, and which other worker processes do not see).
+    """
+    origin_us = day_start_us(start_day)
+    n_days = max(0, (day_start_us(end_day) - origin_us) // US_PER_DAY)
+    days = [resample_cache.get(sample_point, day_of(origin_us + j * US_PER_DAY)) if cached else None for j in range(n_days)]
+    missing = [j for j, day in enumerate(days) if day is None]
+    if missing:
+        generation = resample_cache.generation(sample_point)
+        for lo in range(missing[0], missing[-1] + 1, RESAMPLE_CHUNK_DAYS):  # bounded memory for long spans
+            hi = min(lo + RESAMPLE_CHUNK_DAYS, missing[-1] + 1)
+            lo_us = origin_us + lo * US_PER_DAY
+            timestamps, columns = get_reading_columns(sample_point, lo_us - resample.MAX_GAP_US, origin_us + hi * US_PER_DAY)
+            computed = resample.resample_daily(sample_point, timestamps, columns, lo_us, hi - lo)
+            if cached:
+                resample_cache.store(sample_point, generation, computed)
+            days[lo:hi] = computed
+    return days
+
+
+INSERT_FLOW_SQL = """
     INSERT OR REPLACE INTO daily_flow_input (
         date, blower_1_scf_day, blower_2a_scf_day, blower_2b_scf_day,
         blower_2c_scf_day, biorem_ambient_air_scf_day, biogas_flared_scf_day
     ) VALUES (?, ?, ?, ?, ?, ?, ?)
     """
 
+
+def _insert_flows(conn, flows: List[DailyFlowInput]) -> int:
+    """Insert (or replace, per date) daily flow inputs on an open connection, inside the caller's transaction."""
     data = [
         (
             f.date.isoformat() if hasattr(f.date, "isoformat") else f.date,
@@ -149,13 +638,316 @@ def ingest_daily_flow_inputs(flows: List[DailyFlowInput]) -> int:
         )
         for f in flows
     ]
+    count = conn.executemany(INSERT_FLOW_SQL, data).rowcount
+    _mark_derived_flows(conn, [row[0] for row in data])
+    return count
+
 
+def ingest_daily_flow_inputs(flows: List[DailyFlowInput]) -> int:
+    if not flows:
+        return 0
     with get_db_connection() as conn:
-        conn.executemany(sql, data)
-        return conn.rowcount
+        return _insert_flows(conn, flows)
+
+
+FLOW_COLUMNS = (
+    "date, blower_1_scf_day, blower_2a_scf_day, blower_2b_scf_day, "
+    "blower_2c_scf_day, biorem_ambient_air_scf_day, biogas_flared_scf_day"
+)
+
+
+def iter_flow_rows(
+    start_date: Optional[str] = None, end_date: Optional[str] = None, batch_rows: int = 5000,
+) -> Iterator[list]:
+    """Stored daily_flow_input rows (FLOW_COLUMNS) with start_date <= date < end_date, by date, in batches."""
+    after = None
+    while True:
+        clauses, params = [], []
+        for clause, value in (("date > ?", after), ("date >= ?", start_date), ("date < ?", end_date)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with get_read_connection() as conn:
+            rows = conn.execute(
+                f"SELECT {FLOW_COLUMNS} FROM daily_flow_input {where} ORDER BY date LIMIT ?", [*params, batch_rows]
+            ).fetchall()
+        if rows:
+            yield rows
+        if len(rows) < batch_rows:
+            break
+        after = rows[-1]["date"]
 
 
 def get_all_factors() -> List[Factor]:
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         rows = conn.execute("SELECT key, value, description FROM factors").fetchall()
-    return [Factor(key=row["key"], value=row["value"], description=row["description"]) for row in rows]
\ No newline at end of file
+    return [Factor(key=row["key"], value=row["value"], description=row["description"]) for row in rows]
+
+
+def get_factor_snapshot() -> FactorSnapshot:
+    """Cached factors (as Structs, by key, and pre-encoded JSON); hits the DB only after an invalidation."""
+    snapshot = factor_cache.snapshot()
+    if snapshot is not None:
+        return snapshot
+    version = factor_cache.version
+    return factor_cache.store(get_all_factors(), version)
+
+
+def upsert_factors(factors: List[Factor]) -> int:
+    if not factors:
+        return 0
+
+    sql = "INSERT OR REPLACE INTO factors (key, value, description) VALUES (?, ?, ?)"
+    try:
+        with get_db_connection() as conn:
+            keys = [f.key for f in factors]
+            old = dict(conn.execute(f"SELECT key, value FROM factors WHERE key IN ({', '.join('?' * len(keys))})", keys))
+            cur = conn.executemany(sql, [(f.key, f.value, f.description) for f in factors])
+            changed = [f.key for f in factors if old.get(f.key) != f.value]
+            if changed:
+                _mark_derived_factors(conn, changed)
+            return cur.rowcount
+    finally:
+        factor_cache.invalidate()
+
+
+# --- Threshold rules and exceedances (core/rules.py) ---
+
+def _row_to_rule(row) -> ThresholdRule:
+    return ThresholdRule(
+        key=row["key"], channel=row["channel"], op=row["op"], limit=row["limit_value"],
+        window_s=row["window_s"], sample_point=row["sample_point"], description=row["description"],
+    )
+
+
+def _load_rules(conn) -> List[ThresholdRule]:
+    rows = conn.execute("SELECT * FROM threshold_rule ORDER BY key").fetchall()
+    return [_row_to_rule(row) for row in rows]
+
+
+def _rule_seed(conn, rule: ThresholdRule, sample_point: str, before_us: int):
+    """The open exceedance and the readings of the trailing window, to rebuild a rule's state."""
+    row = conn.execute(
+        "SELECT id, start_timestamp, peak_value, peak_timestamp, reading_count FROM exceedance_event "
+        "WHERE rule_key = ? AND sample_point = ? AND end_timestamp IS NULL ORDER BY start_timestamp DESC LIMIT 1",
+        (rule.key, sample_point),
+    ).fetchone()
+    event = None if row is None else OpenExceedance(
+        rule, sample_point, row[1], row[2], id=row[0], peak_us=row[3], reading_count=row[4],
+    )
+    sql = (
+        f"SELECT timestamp, {rule.channel} FROM ts_analyzer_reading "
+        f"WHERE sample_point = ? AND timestamp >= ? AND timestamp < ? AND {rule.channel} IS NOT NULL ORDER BY timestamp"
+    )
+    history = conn.execute(sql, (sample_point, before_us - rule_engine.lookback_us(rule), before_us)).fetchall()
+    if event is not None and not history:
+        # Where the open exceedance's readings stopped, so a long gap still closes it.
+        history = conn.execute(
+            sql.replace("ORDER BY timestamp", "ORDER BY timestamp DESC LIMIT 1"), (sample_point, event.start_us, before_us)
+        ).fetchall()
+    return event, [tuple(h) for h in history]
+
+
+def _evaluate_rules(conn, readings: List[AnalyzerReading], stamps: List[int]) -> None:
+    """Run a batch through the threshold rules and persist the exceedances it opened, extended or closed."""
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    rule_engine.sync((conn, data_version), lambda: _load_rules(conn))
+    changed = rule_engine.evaluate(readings, stamps, lambda rule, point, before: _rule_seed(conn, rule, point, before))
+    for event in changed:
+        if event.id is None:
+            rule = event.rule
+            event.id = conn.execute(
+                """
+                INSERT INTO exceedance_event (
+                    rule_key, sample_point, channel, op, limit_value, window_s,
+                    start_timestamp, end_timestamp, peak_value, peak_timestamp, reading_count
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (rule.key, event.sample_point, rule.channel, rule.op, rule.limit, rule.window_s,
+                 event.start_us, event.end_us, event.peak, event.peak_us, event.reading_count),
+            ).lastrowid
+        else:
+            conn.execute(
+                "UPDATE exceedance_event SET end_timestamp = ?, peak_value = ?, peak_timestamp = ?, reading_count = ? "
+                "WHERE id = ?",
+                (event.end_us, event.peak, event.peak_us, event.reading_count, event.id),
+            )
+
+
+def _row_to_exceedance(row) -> Exceedance:
+    end = row["end_timestamp"]
+    return Exceedance(
+        id=row["id"], rule=row["rule_key"], sample_point=row["sample_point"], channel=row["channel"],
+        op=row["op"], limit=row["limit_value"], window_s=row["window_s"],
+        start=from_epoch_us(row["start_timestamp"]), peak=row["peak_value"],
+        peak_at=from_epoch_us(row["peak_timestamp"]), reading_count=row["reading_count"],
+        end=_optional_ts(end),
+        duration_s=None if end is None else (end - row["start_timestamp"]) / US_PER_SECOND,
+    )
+
+
+def get_exceedances(
+    sample_point: Optional[str] = None,
+    rule: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    open_only: bool = False,
+    limit: int = 1000,
+) -> List[Exceedance]:
+    """Exceedances overlapping [start, end), newest first; open_only keeps the ones still in progress."""
+    clauses, params = [], []
+    if sample_point is not None:
+        clauses.append("sample_point = ?")
+        params.append(sample_point)
+    if rule is not None:
+        clauses.append("rule_key = ?")
+        params.append(rule)
+    if end is not None:
+        clauses.append("start_timestamp < ?")
+        params.append(to_epoch_us(end))
+    if start is not None:
+        clauses.append("(end_timestamp IS NULL OR end_timestamp >= ?)")
+        params.append(to_epoch_us(start))
+    if open_only:
+        clauses.append("end_timestamp IS NULL")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"SELECT * FROM exceedance_event {where} ORDER BY start_timestamp DESC, id DESC LIMIT ?"
+    with get_read_connection() as conn:
+        rows = conn.execute(sql, [*params, limit]).fetchall()
+    return [_row_to_exceedance(row) for row in rows]
+
+
+def get_threshold_rules() -> List[ThresholdRule]:
+    with get_read_connection() as conn:
+        return _load_rules(conn)
+
+
+def upsert_threshold_rules(rules: List[ThresholdRule]) -> int:
+    """Add or replace threshold rules; they apply from the next ingested batch on."""
+    for rule in rules:
+        if rule.channel not in GAS_CHANNELS:
+            raise ValueError(f"Rule {rule.key!r}: channel must be one of {GAS_CHANNELS}, got {rule.channel!r}")
+        if rule.op not in RULE_OPS:
+            raise ValueError(f"Rule {rule.key!r}: op must be one of {RULE_OPS}, got {rule.op!r}")
+        if rule.window_s < 0:
+            raise ValueError(f"Rule {rule.key!r}: window_s must not be negative.")
+    if not rules:
+        return 0
+
+    sql = (
+        "INSERT OR REPLACE INTO threshold_rule (key, channel, op, limit_value, window_s, sample_point, description) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)"
+    )
+    try:
+        with get_db_connection() as conn:
+            cur = conn.executemany(
+                sql, [(r.key, r.channel, r.op, r.limit, r.window_s, r.sample_point, r.description) for r in rules]
+            )
+            return cur.rowcount
+    finally:
+        rule_engine.reset()
+
+
+# --- Delta sync (api/handlers sync_push / sync_pull) ---
+
+def _stored_ids(conn, ids: List[bytes]) -> set:
+    """The subset of reading ids already in the hot table (unique id index seeks)."""
+    found = set()
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        sql = f"SELECT id FROM ts_analyzer_reading WHERE id IN ({', '.join('?' for _ in chunk)})"
+        found.update(row[0] for row in conn.execute(sql, chunk))
+    return found
+
+
+def _archived_ids(readings: List[AnalyzerReading]) -> set:
+    """
+    The subset of these readings' ids already moved to a month archive. Archives have no id
+    index and are only ATTACHed outside a transaction, so this reads before the write
+    transaction, per sample point over the batch's time span (the archive primary key).
+    """
+    if not readings:
+        return set()
+    stamps = [to_epoch_us(r.timestamp) for r in readings]
+    points = sorted({r.sample_point for r in readings})
+    ids = [r.id.bytes for r in readings]
+    found = set()
+    with get_read_connection() as conn:
+        for lo, hi, source in archive.reading_sources(conn, min(stamps), max(stamps) + 1):
+            if source == archive.HOT_TABLE:
+                continue  # no archived month overlaps: _stored_ids covers the hot table
+            for point in points:
+                where, params = _time_range_where(["sample_point = ?"], [point], lo, hi)
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    sql = f"SELECT id FROM {source} {where} AND id IN ({', '.join('?' for _ in chunk)})"
+                    found.update(row[0] for row in conn.execute(sql, params + chunk))
+    return found
+
+
+def sync_push(batch_id: str, readings: List[AnalyzerReading], device_id: Optional[str] = None) -> SyncPushResult:
+    """
+    Apply a device's batch exactly once. A batch id that was already committed returns its
+    original counts with status "replayed"; readings whose id is already stored, hot or
+    archived (sent before under another batch id, or twice in one batch), are skipped and
+    counted as duplicates.
+    """
+    fresh: List[AnalyzerReading] = []
+    # Before the write transaction: a reading archived meanwhile was still hot here (the
+    # archiver deletes hot rows only once they are in the archive), so it is caught either way.
+    archived = _archived_ids(readings)
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute(
+                "SELECT received, inserted, duplicates FROM sync_batch WHERE batch_id = ?", (batch_id,)
+            ).fetchone()
+            if row is not None:
+                return SyncPushResult(batch_id=batch_id, status="replayed", received=row[0], inserted=row[1], duplicates=row[2])
+
+            seen = archived | _stored_ids(conn, [r.id.bytes for r in readings])
+            for r in readings:
+                if r.id.bytes not in seen:
+                    seen.add(r.id.bytes)
+                    fresh.append(r)
+            inserted = _insert_readings(conn, fresh) if fresh else 0
+            result = SyncPushResult(
+                batch_id=batch_id, status="applied", received=len(readings),
+                inserted=inserted, duplicates=len(readings) - len(fresh),
+            )
+            conn.execute(
+                "INSERT INTO sync_batch (batch_id, device_id, received_at, received, inserted, duplicates) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (batch_id, device_id, to_epoch_us(datetime.now(timezone.utc)), result.received,
+                 result.inserted, result.duplicates),
+            )
+    except Exception:
+        rule_engine.reset()
+        raise
+    _after_commit(fresh)
+    return result
+
+
+_CHANGE_READING_COLUMNS = ", ".join(f"r.{column}" for column in READING_COLUMNS.split(", "))
+
+
+def get_changes_since(since: int, limit: int = 5000, sample_points: Optional[List[str]] = None) -> SyncChanges:
+    """
+    Readings inserted after change sequence `since`, in commit order: at most `limit` changes
+    are examined per call. Changes for other sample points, or for readings archived out of
+    the hot table since, are skipped but still advance the returned cursor.
+    """
+    sql = f"""
+    SELECT c.seq, {_CHANGE_READING_COLUMNS}
+    FROM (SELECT seq, reading_id FROM reading_change WHERE seq > ? ORDER BY seq LIMIT ?) c
+    LEFT JOIN ts_analyzer_reading r ON r.id = c.reading_id
+    ORDER BY c.seq
+    """
+    with get_read_connection() as conn:
+        rows = conn.execute(sql, (since, limit)).fetchall()
+    wanted = None if sample_points is None else set(sample_points)
+    readings = [
+        _row_to_reading(row) for row in rows
+        if row["id"] is not None and (wanted is None or row["sample_point"] in wanted)
+    ]
+    return SyncChanges(readings=readings, cursor=rows[-1]["seq"] if rows else since, more=len(rows) == limit)
@@ -0,0 +1,237 @@
+# src/gastrack/db/derived.py
+"""
+Persisted results of the calculation graph (core/calcgraph.py), recomputed incrementally.
+
+derived_daily holds, per (sample_point, date), the graph's inputs and every derived
+column, plus a bitmask of what is stale (calcgraph.DIRTY_BITS). Writes mark only what
+they affect, in their own transaction (crud._mark_derived_*):
+- readings: the reading inputs and their dependents, at the readings' sample point, for
+  the days they fall in or carry into (core/resample.py MAX_GAP_US);
+- flows: the nodes reading biogas_flared_scf, for those dates, at every sample point;
+- factors: the nodes reading a key whose value changed, and their dependents, everywhere.
+derived_monthly holds monthly totals, dirty whenever one of the month's days is marked.
+
+Nothing is recomputed at write time. load_daily() recomputes the dirty (or never computed)
+days of a range, only the dirty nodes, and only resamples readings for days whose reading
+inputs are dirty; save() writes them back. Every marking transaction also bumps
+derived_state.generation, and save() skips rows read at an older generation: results
+computed from inputs that changed meanwhile are returned, but never persisted. Saving is
+best-effort (a busy write lock leaves the rows dirty, to be recomputed on the next read).
+"""
+import logging
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from msgspec import Struct
+
+from src.gastrack.core.cache import FactorSnapshot
+from src.gastrack.core.calcgraph import (
+    ALL_DIRTY, DIRTY_BITS, FLOW_INPUTS, OUTPUT_COLUMNS, READING_INPUTS, READINGS, evaluate, nan_to_none, nansum,
+    to_column,
+)
+from src.gastrack.db import crud
+from src.gastrack.db.connection import get_db_connection, get_read_connection
+from src.gastrack.db.executor import DBBusyError
+from src.gastrack.db.storage import US_PER_DAY, day_of, day_start_us
+
+logger = logging.getLogger(__name__)
+
+DAILY_COLUMNS = FLOW_INPUTS + READING_INPUTS + OUTPUT_COLUMNS
+TOTAL_COLUMNS = ("biogas_flared_scf",) + OUTPUT_COLUMNS
+
+SELECT_DAILY_SQL = f"""
+    SELECT date, {", ".join(DAILY_COLUMNS)}, dirty FROM derived_daily
+    WHERE sample_point = ? AND date >= ? AND date < ?
+    """
+UPSERT_DAILY_SQL = f"""
+    INSERT INTO derived_daily (sample_point, date, {", ".join(DAILY_COLUMNS)}, dirty)
+    VALUES (?, ?, {", ".join("?" for _ in DAILY_COLUMNS)}, 0)
+    ON CONFLICT (sample_point, date) DO UPDATE SET
+        {", ".join(f"{name} = excluded.{name}" for name in DAILY_COLUMNS)}, dirty = 0
+    """
+UPSERT_MONTHLY_SQL = f"""
+    INSERT INTO derived_monthly (sample_point, month, days, {", ".join(TOTAL_COLUMNS)}, dirty)
+    VALUES (?, ?, ?, {", ".join("?" for _ in TOTAL_COLUMNS)}, 0)
+    ON CONFLICT (sample_point, month) DO UPDATE SET
+        days = excluded.days, {", ".join(f"{name} = excluded.{name}" for name in TOTAL_COLUMNS)}, dirty = 0
+    """
+
+
+class PendingRows(Struct):
+    """Recomputed rows to write back, and the derived_state generation they were read at."""
+    generation: int
+    daily: List[tuple]
+    monthly: List[tuple]
+
+
+def _generation(conn) -> int:
+    return conn.execute("SELECT generation FROM derived_state").fetchone()[0]
+
+
+def _current_factors(factors: Optional[FactorSnapshot]) -> Tuple[FactorSnapshot, bool]:
+    """(factors to use, whether results computed with them may be persisted: they are the stored ones)."""
+    stored = crud.get_factor_snapshot()
+    if factors is None:
+        return stored, True
+    return factors, factors.by_key == stored.by_key
+
+
+def _day_runs(dates: List[str]) -> List[Tuple[str, str]]:
+    """Consecutive runs of sorted dates, as [first, following day) pairs."""
+    runs = []
+    for d in dates:
+        if runs and runs[-1][1] == d:
+            runs[-1][1] = day_of(day_start_us(d) + US_PER_DAY)
+        else:
+            runs.append([d, day_of(day_start_us(d) + US_PER_DAY)])
+    return [tuple(run) for run in runs]
+
+
+def load_daily(
+    sample_point: str, start: str, end: str, factors: Optional[FactorSnapshot] = None,
+) -> Tuple[Dict[str, list], Optional[PendingRows]]:
+    """
+    Derived daily columns ("date" + DAILY_COLUMNS) for the daily_flow_input dates in
+    [start, end), recomputing what is stale; and the recomputed rows for save()
+    (None if there are none, or if `factors` are not the stored ones).
+    """
+    factors, persist = _current_factors(factors)
+    with get_read_connection() as conn:
+        generation = _generation(conn)  # before anything it covers is read
+        stored = {row[0]: row for row in conn.execute(SELECT_DAILY_SQL, (sample_point, start, end)).fetchall()}
+        flows = conn.execute(
+            "SELECT date, biogas_flared_scf_day FROM daily_flow_input WHERE date >= ? AND date < ? ORDER BY date",
+            (start, end),
+        ).fetchall()
+
+    dates = [flow_date for flow_date, _ in flows]
+    columns: Dict[str, list] = {name: [] for name in DAILY_COLUMNS}
+    masks = []
+    for flow_date in dates:
+        row = stored.get(flow_date) if persist else None
+        masks.append(ALL_DIRTY if row is None else row[-1])
+        for i, name in enumerate(DAILY_COLUMNS, 1):
+            columns[name].append(None if row is None else row[i])
+    columns["biogas_flared_scf"] = [flared for _, flared in flows]
+
+    todo = [i for i, mask in enumerate(masks) if mask]
+    pending = None
+    if todo:
+        _recompute(sample_point, dates, columns, masks, todo, factors)
+        if persist:
+            daily = [(sample_point, dates[i], *(columns[name][i] for name in DAILY_COLUMNS)) for i in todo]
+            pending = PendingRows(generation=generation, daily=daily, monthly=[])
+    return {"date": dates, **columns}, pending
+
+
+def _recompute(
+    sample_point: str, dates: List[str], columns: Dict[str, list], masks: List[int], todo: List[int],
+    factors: FactorSnapshot,
+) -> None:
+    """Recompute, in place, the stale inputs and nodes of the rows at indexes `todo`."""
+    union = 0
+    for i in todo:
+        union |= masks[i]
+
+    resample_dates = [dates[i] for i in todo if masks[i] & DIRTY_BITS[READINGS]]
+    if resample_dates:
+        resampled = {}
+        for first, following in _day_runs(resample_dates):
+            for day in crud.get_resampled_days(sample_point, first, following, cached=False):
+                resampled[day.day] = day
+        for i in todo:
+            day = resampled.get(dates[i])
+            if day is not None:
+                ch4, h2s = day.channels["ch4_pct"], day.channels["h2s_ppm"]
+                for name, value in (
+                    ("ch4_pct", ch4.mean), ("h2s_ppm", h2s.mean), ("ch4_coverage", ch4.coverage),
+                    ("h2s_coverage", h2s.coverage), ("reading_count", day.reading_count),
+                ):
+                    columns[name][i] = value
+
+    nodes = [name for name in OUTPUT_COLUMNS if union & DIRTY_BITS[name]]
+    if nodes:
+        inputs = {name: to_column(columns[name][i] for i in todo) for name in DAILY_COLUMNS}
+        results = evaluate(inputs, factors, nodes)
+        for name in nodes:
+            for i, value in zip(todo, nan_to_none(results[name])):
+                columns[name][i] = value
+
+
+def get_daily(sample_point: str, start: str, end: str, factors: Optional[FactorSnapshot] = None) -> Dict[str, list]:
+    """load_daily(), writing the recomputed rows back."""
+    columns, pending = load_daily(sample_point, start, end, factors)
+    if pending is not None:
+        save(pending)
+    return columns
+
+
+def load_monthly_totals(
+    sample_point: str, months: Dict[str, Tuple[str, str]], factors: Optional[FactorSnapshot] = None,
+) -> Tuple[Dict[str, Dict[str, float]], Optional[PendingRows]]:
+    """
+    Totals (days + TOTAL_COLUMNS) per month, for months given as 'YYYY-MM' -> [start, end)
+    dates; stale months are summed from load_daily(). Also the rows for save().
+    """
+    factors, persist = _current_factors(factors)
+    placeholders = ", ".join("?" for _ in months)
+    with get_read_connection() as conn:
+        generation = _generation(conn)
+        stored = {
+            row[0]: row for row in conn.execute(
+                f"SELECT month, days, {', '.join(TOTAL_COLUMNS)}, dirty FROM derived_monthly "
+                f"WHERE sample_point = ? AND month IN ({placeholders})",
+                (sample_point, *months),
+            ).fetchall()
+        } if persist and months else {}
+
+    totals: Dict[str, Dict[str, float]] = {}
+    pending = PendingRows(generation=generation, daily=[], monthly=[]) if persist else None
+    for month, (start, end) in months.items():
+        row = stored.get(month)
+        if row is not None and not row[-1]:
+            totals[month] = dict(zip(("days",) + TOTAL_COLUMNS, row[1:-1]))
+            continue
+        columns, daily_pending = load_daily(sample_point, start, end, factors)
+        totals[month] = {"days": len(columns["date"])}
+        totals[month].update({name: nansum(to_column(columns[name])) for name in TOTAL_COLUMNS})
+        if pending is not None:
+            if daily_pending is not None:
+                pending.daily += daily_pending.daily
+            pending.monthly.append((sample_point, month, *totals[month].values()))
+    if pending is not None and not (pending.daily or pending.monthly):
+        pending = None
+    return totals, pending
+
+
+def get_monthly_totals(
+    sample_point: str, months: Dict[str, Tuple[str, str]], factors: Optional[FactorSnapshot] = None,
+) -> Dict[str, Dict[str, float]]:
+    """load_monthly_totals(), writing the recomputed rows back."""
+    totals, pending = load_monthly_totals(sample_point, months, factors)
+    if pending is not None:
+        save(pending)
+    return totals
+
+
+def save(pending: PendingRows) -> bool:
+    """Write recomputed rows back, unless anything was marked since they were read. True if written."""
+    try:
+        with get_db_connection() as conn:
+            if _generation(conn) != pending.generation:
+                return False
+            conn.executemany(UPSERT_DAILY_SQL, pending.daily)
+            conn.executemany(UPSERT_MONTHLY_SQL, pending.monthly)
+        return True
+    except (DBBusyError, sqlite3.OperationalError) as e:
+        logger.warning("Derived values not saved (they stay dirty): %s", e)
+        return False
+
+
+def mark_all_dirty() -> int:
+    """Make every derived row stale (e.g. after changing GASTRACK_RULES_MAX_GAP_S). Returns the number of daily rows."""
+    with get_db_connection() as conn:
+        count = conn.execute("UPDATE derived_daily SET dirty = ?", (ALL_DIRTY,)).rowcount
+        conn.execute("UPDATE derived_monthly SET dirty = 1")
+        conn.execute("UPDATE derived_state SET generation = generation + 1")
+    return count
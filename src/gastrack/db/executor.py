@@ -0,0 +1,134 @@
+# src/gastrack/db/executor.py
+"""
+Bounded DB executor for the async handlers.
+
+SQLite calls are blocking, so the Starlette handlers must never run them on the
+event loop. Writes go to a single writer thread (SQLite has one writer anyway),
+reads go to a small reader pool that uses the per-thread pooled reader connections.
+
+Each side has its own admission limit, so an ingest burst queues up behind the
+writer thread without starving the readers.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+DEFAULT_READER_THREADS = int(os.environ.get("GASTRACK_DB_READER_THREADS", "4"))
+DEFAULT_MAX_PENDING_WRITES = int(os.environ.get("GASTRACK_DB_MAX_PENDING_WRITES", "32"))
+DEFAULT_MAX_PENDING_READS = int(os.environ.get("GASTRACK_DB_MAX_PENDING_READS", "128"))
+# Seconds a caller may wait for a free slot before being told the DB is busy.
+DEFAULT_ADMIT_TIMEOUT = float(os.environ.get("GASTRACK_DB_ADMIT_TIMEOUT", "5.0"))
+# Seconds a single DB call may take before the caller gives up waiting on it.
+DEFAULT_CALL_TIMEOUT = float(os.environ.get("GASTRACK_DB_CALL_TIMEOUT", "30.0"))
+
+
+class DBBusyError(RuntimeError):
+    """Raised when the executor queue is full for longer than the admit timeout."""
+
+
+class DBTimeoutError(TimeoutError):
+    """Raised when a DB call does not finish within the call timeout."""
+
+
+class DBExecutor:
+    def __init__(
+        self,
+        reader_threads: int = DEFAULT_READER_THREADS,
+        max_pending_writes: int = DEFAULT_MAX_PENDING_WRITES,
+        max_pending_reads: int = DEFAULT_MAX_PENDING_READS,
+        admit_timeout: float = DEFAULT_ADMIT_TIMEOUT,
+        call_timeout: float = DEFAULT_CALL_TIMEOUT,
+    ):
+        self.reader_threads = reader_threads
+        self.max_pending_writes = max_pending_writes
+        self.max_pending_reads = max_pending_reads
+        self.admit_timeout = admit_timeout
+        self.call_timeout = call_timeout
+        self._writer: ThreadPoolExecutor | None = None
+        self._readers: ThreadPoolExecutor | None = None
+        # Semaphores are created lazily so they bind to the running event loop.
+        self._write_slots: asyncio.Semaphore | None = None
+        self._read_slots: asyncio.Semaphore | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._writer is not None
+
+    def start(self) -> "DBExecutor":
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gastrack-db-writer")
+            self._readers = ThreadPoolExecutor(
+                max_workers=self.reader_threads, thread_name_prefix="gastrack-db-reader"
+            )
+        return self
+
+    def shutdown(self) -> None:
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._readers.shutdown(wait=True)
+            self._writer = None
+            self._readers = None
+            self._write_slots = None
+            self._read_slots = None
+
+    async def run_write(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn on the single writer thread."""
+        if self._write_slots is None:
+            self._write_slots = asyncio.Semaphore(self.max_pending_writes)
+        return await self._submit(self._writer, self._write_slots, fn, *args, **kwargs)
+
+    async def run_read(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn on the reader pool."""
+        if self._read_slots is None:
+            self._read_slots = asyncio.Semaphore(self.max_pending_reads)
+        return await self._submit(self._readers, self._read_slots, fn, *args, **kwargs)
+
+    async def _submit(self, pool: ThreadPoolExecutor | None, slots: asyncio.Semaphore, fn, *args, **kwargs):
+        if pool is None:
+            raise RuntimeError("DBExecutor is not running.")
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.admit_timeout)
+        except asyncio.TimeoutError:
+            raise DBBusyError("Database is busy, try again later.") from None
+        try:
+            future = asyncio.get_running_loop().run_in_executor(pool, lambda: fn(*args, **kwargs))
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the call itself finishes, not until its caller stops
+        # waiting: a timed-out call still occupies its thread, so it still counts.
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            # shield: on timeout the call keeps running on its thread (it cannot be
+            # interrupted); only the waiting caller is released.
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.call_timeout)
+        except asyncio.TimeoutError:
+            raise DBTimeoutError(f"Database call {getattr(fn, '__name__', fn)} timed out.") from None
+
+
+_executor: DBExecutor | None = None
+
+
+def start_executor(**kwargs) -> DBExecutor:
+    """Start the process-wide executor. Called from the app lifespan on startup."""
+    global _executor
+    if _executor is None or not _executor.is_running:
+        _executor = DBExecutor(**kwargs).start()
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the process-wide executor. Called from the app lifespan on shutdown."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+def get_executor() -> DBExecutor:
+    """Return the running executor, starting one on demand (e.g. app used without lifespan)."""
+    if _executor is None or not _executor.is_running:
+        return start_executor()
+    return _executor
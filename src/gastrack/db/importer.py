@@ -0,0 +1,454 @@
+# src/gastrack/db/importer.py
+"""
+Bulk import of historical analyzer sheets and daily flow logs (`gastrack import`).
+
+Every table in the given files (a CSV file, or one worksheet of an .xlsx workbook such as
+biogasCalcsV2.xlsx) is a unit of work:
+- parser processes (one per CPU by default) stream their tables row by row
+  (core/spreadsheet.py), map the header onto AnalyzerReading / DailyFlowInput fields,
+  validate each row and pass batches of valid rows, msgpack-encoded, through a bounded queue;
+- this process is the only writer. Batches go in with executemany through the regular
+  insert path (crud._insert_readings: rollups, sync change log and threshold rules stay
+  current), many batches per transaction.
+
+A table's position (data rows consumed, imported or rejected) is written to import_progress
+in the same transaction as its rows. Running the command again after an interruption skips
+the rows already committed and the tables already finished. A file that changed since its
+import started is not resumed (--restart imports it again from the first row).
+
+A table holds readings if its header names a gas channel, flows if it has a date and a flow
+column; other sheets (calculations, factors) are skipped. Headers are matched loosely
+('O2 %' -> o2_pct, 'H2S (ppm)' -> h2s_ppm). The sample point comes from a sample_point
+column, else the caller's default, else the sheet (or CSV file) name. Timestamps without a
+UTC offset are taken as UTC, as everywhere else (db/storage.py).
+"""
+import multiprocessing
+import os
+import queue
+import re
+import time
+import uuid
+from datetime import datetime, time as dt_time, timedelta
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, get_args
+
+import msgspec
+from msgspec import Struct, msgpack
+
+from src.gastrack.core.models import GAS_CHANNELS, SAMPLE_POINTS, AnalyzerReading, DailyFlowInput
+from src.gastrack.core.rules import rule_engine
+from src.gastrack.core.spreadsheet import SPREADSHEET_SUFFIXES, excel_datetime, iter_rows, sheet_names
+from src.gastrack.db.connection import DB_PATH, _begin_immediate, _connect, init_db
+from src.gastrack.db.crud import _insert_flows, _insert_readings
+from src.gastrack.db.storage import US_PER_SECOND
+
+IMPORT_BATCH_ROWS = 5000     # rows per parsed batch (one queue message)
+IMPORT_TXN_ROWS = 50_000     # rows per write transaction
+QUEUE_BATCHES_PER_WORKER = 4  # parsed batches waiting per parser before it blocks
+MAX_ERRORS_REPORTED = 20     # rejected-row messages kept per table
+
+FLOW_COLUMNS = tuple(field for field in DailyFlowInput.__struct_fields__ if field != "date")
+KINDS = {"readings": AnalyzerReading, "flows": DailyFlowInput}
+
+_ALIASES = {
+    "datetime": "timestamp", "date_time": "timestamp", "time_stamp": "timestamp", "timestamp_utc": "timestamp",
+    "point": "sample_point", "location": "sample_point", "sample_location": "sample_point",
+    "o2": "o2_pct", "co2": "co2_pct", "h2s": "h2s_ppm", "ch4": "ch4_pct",
+    "balance_n2": "balance_n2_pct", "n2": "balance_n2_pct", "n2_pct": "balance_n2_pct",
+    "t_sensor": "t_sensor_f", "sensor_temp_f": "t_sensor_f",
+    "net_cal_val": "net_cal_val_mj_m3", "gross_cal_val": "gross_cal_val_mj_m3",
+    "manual_override": "is_manual_override", "override": "is_manual_override", "note": "override_note",
+    "blower_1": "blower_1_scf_day", "blower_2a": "blower_2a_scf_day", "blower_2b": "blower_2b_scf_day",
+    "blower_2c": "blower_2c_scf_day", "biorem_ambient_air": "biorem_ambient_air_scf_day",
+    "biogas_flared": "biogas_flared_scf_day",
+}
+_BLANKS = {"", "-", "na", "n/a", "#n/a", "null", "none", "nan"}
+# Besides ISO 8601: what US-locale Excel writes when saving as CSV.
+_DATETIME_FORMATS = ("%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %I:%M %p", "%m/%d/%Y")
+
+
+class ImportTable(Struct):
+    """Outcome of one source table."""
+    source: str
+    sheet: str
+    status: str  # imported | already imported | skipped | changed | failed
+    kind: Optional[str] = None
+    imported: int = 0
+    rejected: int = 0
+    errors: List[str] = []
+    note: Optional[str] = None
+
+
+class ImportSummary(Struct):
+    tables: List[ImportTable]
+    imported: int
+    rejected: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return (self.imported + self.rejected) / self.seconds if self.seconds > 0 else 0.0
+
+
+# --- Parsing (runs in the parser processes) ---
+
+def _normalise(name) -> str:
+    key = re.sub(r"[^0-9a-z]+", "_", str(name or "").lower()).strip("_")
+    key = re.sub(r"_(percent|pct)$", "_pct", key)
+    return _ALIASES.get(key, key)
+
+
+def _is_blank(value) -> bool:
+    return value is None or (value.__class__ is str and value.strip().lower() in _BLANKS)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)  # XLSX numbers and plain numeric text
+    except ValueError:
+        pass
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        raise ValueError(f"not a number: {value!r}")
+
+
+def _to_datetime(value) -> datetime:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return excel_datetime(value)
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"not a date/time: {value!r}")
+
+
+def _to_time_of_day(value) -> timedelta:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return timedelta(microseconds=round((value % 1) * 86_400_000_000))
+    text = str(value).strip()
+    for parse in (dt_time.fromisoformat, lambda t: datetime.strptime(t, "%I:%M:%S %p").time(),
+                  lambda t: datetime.strptime(t, "%I:%M %p").time()):
+        try:
+            t = parse(text)
+            return timedelta(hours=t.hour, minutes=t.minute, seconds=t.second, microseconds=t.microsecond)
+        except ValueError:
+            continue
+    raise ValueError(f"not a time of day: {value!r}")
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y", "x")
+    return bool(value)
+
+
+_CONVERTERS: Dict[str, Callable] = {
+    **{name: _to_float for name in GAS_CHANNELS + FLOW_COLUMNS},
+    "timestamp": _to_datetime,
+    "date": lambda value: _to_datetime(value).date().isoformat(),
+    "time": _to_time_of_day,
+    "sample_point": lambda value: str(value).strip(),
+    "override_note": str,
+    "is_manual_override": _to_bool,
+    "id": lambda value: uuid.UUID(str(value).strip()),
+}
+
+
+class _TableMapper:
+    """Header -> field mapping of one table, and the row -> Struct conversion."""
+
+    def __init__(self, header: list, default_point: Optional[str]):
+        names = [_normalise(name) for name in header]
+        present = set(names)
+        if present & set(GAS_CHANNELS) and present & {"timestamp", "date"}:
+            self.kind = "readings"
+            if "timestamp" not in present:
+                # Separate Date and Time columns (or a date-only column).
+                names = ["timestamp" if name == "date" else name for name in names]
+            else:
+                names = [None if name == "time" else name for name in names]
+            wanted = set(AnalyzerReading.__struct_fields__) | {"time"}
+        elif "date" in present and present & set(FLOW_COLUMNS):
+            self.kind = "flows"
+            wanted = set(DailyFlowInput.__struct_fields__)
+        else:
+            self.kind = None
+            return
+        self.columns = [(i, name, _CONVERTERS[name]) for i, name in enumerate(names) if name in wanted]
+        self.default_point = default_point
+        self.type = KINDS[self.kind]
+
+    def convert(self, values: list):
+        record = {}
+        width = len(values)
+        for i, name, to_field in self.columns:
+            if i >= width:
+                continue
+            value = values[i]
+            if _is_blank(value):
+                continue
+            try:
+                record[name] = to_field(value)
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}")
+        if self.kind == "readings":
+            offset = record.pop("time", None)
+            if offset is not None and "timestamp" in record:
+                record["timestamp"] = datetime.combine(record["timestamp"].date(), dt_time()) + offset
+            if "sample_point" not in record:
+                if self.default_point is None:
+                    raise ValueError("no sample point (add a sample_point column or pass --sample-point)")
+                record["sample_point"] = self.default_point
+        try:
+            return msgspec.convert(record, self.type)
+        except msgspec.ValidationError as e:
+            raise ValueError(str(e))
+
+
+def _point_key(name: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "", name.lower())
+
+
+_POINTS_BY_KEY = {_point_key(point): point for point in get_args(SAMPLE_POINTS)}
+
+
+def _default_point(sheet: str, default: Optional[str]) -> Optional[str]:
+    """The caller's default, else the sample point the sheet / file is named after ('sheet1' -> 'Sheet 1')."""
+    return default if default is not None else _POINTS_BY_KEY.get(_point_key(sheet))
+
+
+# Messages from a parser to the writer:
+#   ("batch", key, kind, rows_consumed_so_far, msgpack payload, valid rows, rejected rows, error messages)
+#   ("done", key, kind, rows_consumed, note)
+#   ("failed", key, message)
+Task = Tuple[str, str, int, int, Optional[str]]  # source, sheet, rows to skip, batch rows, default sample point
+
+
+def _parse_table(task: Task) -> Iterator[tuple]:
+    source, sheet, skip, batch_rows, default = task
+    key = (source, sheet)
+    try:
+        rows = iter_rows(Path(source), sheet)
+        first = next(rows, None)
+        mapper = _TableMapper(first[1] if first else [], _default_point(sheet, default))
+        if mapper.kind is None:
+            yield ("done", key, None, 0, "no analyzer or flow columns")
+            return
+        consumed = 0
+        batch, rejected, errors = [], 0, []
+        for number, values in rows:
+            consumed += 1
+            if consumed <= skip:
+                continue  # committed by an earlier run
+            try:
+                batch.append(mapper.convert(values))
+            except ValueError as e:
+                rejected += 1
+                if len(errors) < MAX_ERRORS_REPORTED:
+                    errors.append(f"row {number}: {e}")
+            if len(batch) + rejected >= batch_rows:
+                yield ("batch", key, mapper.kind, consumed, msgpack.encode(batch), len(batch), rejected, errors)
+                batch, rejected, errors = [], 0, []
+        if batch or rejected:
+            yield ("batch", key, mapper.kind, consumed, msgpack.encode(batch), len(batch), rejected, errors)
+        yield ("done", key, mapper.kind, max(consumed, skip), None)
+    except Exception as e:  # unreadable file, broken workbook...
+        yield ("failed", key, f"{type(e).__name__}: {e}")
+
+
+_worker_queue = None
+
+
+def _init_worker(q) -> None:
+    global _worker_queue
+    _worker_queue = q
+
+
+def _parse_table_to_queue(task: Task) -> None:
+    for message in _parse_table(task):
+        _worker_queue.put(message)
+
+
+def _pool_messages(tasks: List[Task], workers: int) -> Iterator[tuple]:
+    # spawn: parsers need nothing from this process, and fork is unsafe once threads exist (server, tests).
+    ctx = multiprocessing.get_context("spawn")
+    q = ctx.Queue(maxsize=workers * QUEUE_BATCHES_PER_WORKER)
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(q,)) as pool:
+        result = pool.map_async(_parse_table_to_queue, tasks, chunksize=1)
+        finished = 0
+        while finished < len(tasks):
+            try:
+                message = q.get(timeout=1.0)
+            except queue.Empty:
+                if result.ready():
+                    result.get()  # a parser died outside _parse_table: re-raise its error
+                    raise RuntimeError("Parser processes exited before finishing their tables.")
+                continue
+            if message[0] != "batch":
+                finished += 1
+            yield message
+
+
+# --- Writing (this process) ---
+
+def expand_paths(paths: Iterable[Path]) -> List[Path]:
+    """Files to import: the given files, and the spreadsheets found under given directories."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in SPREADSHEET_SUFFIXES))
+        elif path.exists():
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    return files
+
+
+def _fingerprint(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def import_files(
+    paths: Iterable[Path],
+    db_path: Path = DB_PATH,
+    workers: Optional[int] = None,
+    sample_point: Optional[str] = None,
+    restart: bool = False,
+    batch_rows: int = IMPORT_BATCH_ROWS,
+    txn_rows: int = IMPORT_TXN_ROWS,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> ImportSummary:
+    """
+    Import every table of the given files (directories are searched for .csv/.xlsx).
+    workers: parser processes (default: one per CPU, at most one per table; 1 parses in this
+    process). progress(imported, rejected) is called after each committed transaction.
+    Can run next to the server (writes wait for the lock).
+    """
+    started = time.perf_counter()
+    files = expand_paths(paths)
+    conn = _connect(db_path)
+    try:
+        init_db(conn)
+        outcomes: Dict[Tuple[str, str], ImportTable] = {}
+        fingerprints: Dict[Tuple[str, str], str] = {}
+        tasks: List[Task] = []
+        for path in files:
+            source = str(path.resolve())
+            fingerprint = _fingerprint(path)
+            try:
+                sheets = sheet_names(path)
+            except Exception as e:
+                outcomes[(source, "")] = ImportTable(source, "", "failed", note=f"{type(e).__name__}: {e}")
+                continue
+            for sheet in sheets:
+                key = (source, sheet)
+                if restart:
+                    with conn:
+                        conn.execute("DELETE FROM import_progress WHERE source = ? AND sheet = ?", key)
+                row = conn.execute(
+                    "SELECT fingerprint, kind, rows_done, imported, rejected, completed_at FROM import_progress "
+                    "WHERE source = ? AND sheet = ?", key,
+                ).fetchone()
+                outcome = outcomes[key] = ImportTable(source, sheet, "imported")
+                fingerprints[key] = fingerprint
+                skip = 0
+                if row is not None:
+                    if row["fingerprint"] != fingerprint:
+                        outcome.status = "changed"
+                        outcome.note = "file changed since its import started; use --restart to import it again"
+                        continue
+                    if row["completed_at"] is not None:
+                        outcome.status = "already imported" if row["kind"] else "skipped"
+                        outcome.kind = row["kind"]
+                        continue
+                    skip = row["rows_done"]
+                    outcome.note = f"resumed after {skip} rows"
+                tasks.append((source, sheet, skip, batch_rows, sample_point))
+
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        if workers > 1:
+            messages = _pool_messages(tasks, workers)
+        else:
+            messages = chain.from_iterable(map(_parse_table, tasks))
+
+        decoders = {kind: msgpack.Decoder(List[struct]) for kind, struct in KINDS.items()}
+        totals = {"imported": 0, "rejected": 0}
+        pending: List[tuple] = []
+        pending_rows = 0
+
+        def commit_pending() -> None:
+            now_us = int(time.time() * US_PER_SECOND)
+            counts: List[Tuple[ImportTable, int, int]] = []
+            _begin_immediate(conn)
+            try:
+                for message in pending:
+                    if message[0] == "batch":
+                        _, key, kind, consumed, payload, _rows, rejected, _errors = message
+                        records = decoders[kind].decode(payload)
+                        if records:
+                            (_insert_readings if kind == "readings" else _insert_flows)(conn, records)
+                        _save_progress(conn, key, fingerprints[key], kind, consumed, len(records), rejected, None)
+                        counts.append((outcomes[key], len(records), rejected))
+                    else:
+                        _, key, kind, consumed, _note = message
+                        _save_progress(conn, key, fingerprints[key], kind, consumed, 0, 0, now_us)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                rule_engine.reset()
+                raise
+            for outcome, imported, rejected in counts:
+                outcome.imported += imported
+                outcome.rejected += rejected
+                totals["imported"] += imported
+                totals["rejected"] += rejected
+            pending.clear()
+            if progress is not None:
+                progress(totals["imported"], totals["rejected"])
+
+        for message in messages:
+            key = message[1]
+            outcome = outcomes[key]
+            if message[0] == "failed":
+                outcome.status, outcome.note = "failed", message[2]
+                continue
+            outcome.kind = message[2]
+            if message[0] == "batch":
+                outcome.errors.extend(message[7][:MAX_ERRORS_REPORTED - len(outcome.errors)])
+                pending_rows += message[5]
+            elif message[2] is None:
+                outcome.status, outcome.note = "skipped", message[4]
+            pending.append(message)
+            if pending_rows >= txn_rows:
+                commit_pending()
+                pending_rows = 0
+        if pending:
+            commit_pending()
+        return ImportSummary(
+            list(outcomes.values()), totals["imported"], totals["rejected"], time.perf_counter() - started,
+        )
+    finally:
+        conn.close()
+
+
+def _save_progress(conn, key, fingerprint, kind, consumed, imported, rejected, completed_at) -> None:
+    conn.execute(
+        """
+        INSERT INTO import_progress (source, sheet, fingerprint, kind, rows_done, imported, rejected, completed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (source, sheet) DO UPDATE SET
+            kind = excluded.kind, rows_done = MAX(rows_done, excluded.rows_done),
+            imported = imported + excluded.imported, rejected = rejected + excluded.rejected,
+            completed_at = excluded.completed_at
+        """,
+        (*key, fingerprint, kind, consumed, imported, rejected, completed_at),
+    )
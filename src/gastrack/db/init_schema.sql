@@ -2,10 +2,12 @@
 
 -- 1. Raw Time-Series Readings (ts_analyzer_reading)
 -- For irregular data from analyzer logs (O2, H2S, CH4, BTUs).
+-- Compact layout (see db/storage.py): clustered on (sample_point, timestamp, id) WITHOUT ROWID,
+-- so range queries read contiguous pages and there is no separate rowid/index copy of the rows.
 CREATE TABLE IF NOT EXISTS ts_analyzer_reading (
-    id UUID PRIMARY KEY,
-    timestamp TIMESTAMP,
-    sample_point VARCHAR, -- e.g., 'Sheet 1', 'Sheet 6', 'Inlet', 'Outlet'
+    sample_point VARCHAR NOT NULL, -- e.g., 'Sheet 1', 'Sheet 6', 'Inlet', 'Outlet'
+    timestamp INTEGER NOT NULL,    -- microseconds since the Unix epoch, UTC
+    id BLOB NOT NULL,              -- 16-byte UUID
     o2_pct DOUBLE,
     co2_pct DOUBLE,
     h2s_ppm DOUBLE,
@@ -16,7 +18,113 @@ CREATE TABLE IF NOT EXISTS ts_analyzer_reading (
     balance_n2_pct DOUBLE,
     -- Audit fields for data fudging (Q5)
     is_manual_override BOOLEAN DEFAULT FALSE,
-    override_note VARCHAR
+    override_note VARCHAR,
+    PRIMARY KEY (sample_point, timestamp, id)
+) WITHOUT ROWID;
+
+-- Reading ids stay globally unique (re-posting the same reading is rejected).
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ts_analyzer_reading_id ON ts_analyzer_reading (id);
+
+-- Change sequence for delta sync (GET /api/sync/pull?since=): one row per inserted reading,
+-- in commit order. Existing readings are backfilled once, oldest first.
+CREATE TABLE IF NOT EXISTS reading_change (
+    seq INTEGER PRIMARY KEY,
+    reading_id BLOB NOT NULL
+);
+INSERT INTO reading_change (reading_id)
+SELECT id FROM ts_analyzer_reading
+WHERE NOT EXISTS (SELECT 1 FROM reading_change)
+ORDER BY timestamp;
+
+-- Batches committed by POST /api/sync/push, so a device replaying a batch gets the
+-- original result instead of inserting it twice.
+CREATE TABLE IF NOT EXISTS sync_batch (
+    batch_id VARCHAR PRIMARY KEY,
+    device_id VARCHAR,
+    received_at INTEGER NOT NULL,  -- epoch microseconds, UTC
+    received INTEGER NOT NULL,
+    inserted INTEGER NOT NULL,
+    duplicates INTEGER NOT NULL
+);
+
+-- Position reached by `gastrack import` (db/importer.py) in each source table (a CSV file or
+-- one worksheet), committed with the rows it covers, so an interrupted import resumes there.
+CREATE TABLE IF NOT EXISTS import_progress (
+    source VARCHAR NOT NULL,        -- absolute path of the file
+    sheet VARCHAR NOT NULL,         -- worksheet name (the file stem for a CSV)
+    fingerprint VARCHAR NOT NULL,   -- 'size:mtime_ns' of the file when its import started
+    kind VARCHAR,                   -- 'readings' | 'flows' | NULL (no data columns, skipped)
+    rows_done INTEGER NOT NULL,     -- data rows consumed, imported or rejected
+    imported INTEGER NOT NULL,
+    rejected INTEGER NOT NULL,
+    completed_at INTEGER,           -- epoch microseconds, UTC; NULL while partial
+    PRIMARY KEY (source, sheet)
+);
+
+-- 1a. Archived months of ts_analyzer_reading (`gastrack db-archive`, db/archive.py).
+-- Each closed month lives in its own SQLite file with the same ts_analyzer_reading table;
+-- reads ATTACH the files whose [first_timestamp, last_timestamp] overlaps the queried range.
+-- Rollups of archived months stay in rollup_analyzer_daily below.
+CREATE TABLE IF NOT EXISTS archive_month (
+    month VARCHAR PRIMARY KEY,         -- 'YYYY-MM' (UTC)
+    path VARCHAR NOT NULL,             -- archive database file
+    first_timestamp INTEGER NOT NULL,  -- epoch microseconds, UTC
+    last_timestamp INTEGER NOT NULL,
+    reading_count INTEGER NOT NULL,
+    archived_at INTEGER NOT NULL       -- epoch microseconds, UTC
+);
+
+-- 1b. Daily rollup of ts_analyzer_reading, one row per (UTC day, sample_point).
+-- Maintained incrementally in the same transaction as each ingest (crud._insert_readings);
+-- rebuild from scratch with `gastrack db-rebuild-rollup`.
+-- Per gas channel: count of non-null values, sum, min, max, mean.
+CREATE TABLE IF NOT EXISTS rollup_analyzer_daily (
+    day DATE NOT NULL,
+    sample_point VARCHAR NOT NULL,
+    reading_count INTEGER NOT NULL,
+    first_timestamp INTEGER,  -- epoch microseconds, UTC
+    last_timestamp INTEGER,
+    o2_pct_count INTEGER NOT NULL DEFAULT 0,
+    o2_pct_sum DOUBLE NOT NULL DEFAULT 0,
+    o2_pct_min DOUBLE,
+    o2_pct_max DOUBLE,
+    o2_pct_mean DOUBLE,
+    co2_pct_count INTEGER NOT NULL DEFAULT 0,
+    co2_pct_sum DOUBLE NOT NULL DEFAULT 0,
+    co2_pct_min DOUBLE,
+    co2_pct_max DOUBLE,
+    co2_pct_mean DOUBLE,
+    h2s_ppm_count INTEGER NOT NULL DEFAULT 0,
+    h2s_ppm_sum DOUBLE NOT NULL DEFAULT 0,
+    h2s_ppm_min DOUBLE,
+    h2s_ppm_max DOUBLE,
+    h2s_ppm_mean DOUBLE,
+    ch4_pct_count INTEGER NOT NULL DEFAULT 0,
+    ch4_pct_sum DOUBLE NOT NULL DEFAULT 0,
+    ch4_pct_min DOUBLE,
+    ch4_pct_max DOUBLE,
+    ch4_pct_mean DOUBLE,
+    net_cal_val_mj_m3_count INTEGER NOT NULL DEFAULT 0,
+    net_cal_val_mj_m3_sum DOUBLE NOT NULL DEFAULT 0,
+    net_cal_val_mj_m3_min DOUBLE,
+    net_cal_val_mj_m3_max DOUBLE,
+    net_cal_val_mj_m3_mean DOUBLE,
+    gross_cal_val_mj_m3_count INTEGER NOT NULL DEFAULT 0,
+    gross_cal_val_mj_m3_sum DOUBLE NOT NULL DEFAULT 0,
+    gross_cal_val_mj_m3_min DOUBLE,
+    gross_cal_val_mj_m3_max DOUBLE,
+    gross_cal_val_mj_m3_mean DOUBLE,
+    t_sensor_f_count INTEGER NOT NULL DEFAULT 0,
+    t_sensor_f_sum DOUBLE NOT NULL DEFAULT 0,
+    t_sensor_f_min DOUBLE,
+    t_sensor_f_max DOUBLE,
+    t_sensor_f_mean DOUBLE,
+    balance_n2_pct_count INTEGER NOT NULL DEFAULT 0,
+    balance_n2_pct_sum DOUBLE NOT NULL DEFAULT 0,
+    balance_n2_pct_min DOUBLE,
+    balance_n2_pct_max DOUBLE,
+    balance_n2_pct_mean DOUBLE,
+    PRIMARY KEY (sample_point, day)
 );
 
 -- 2. Daily Raw Flow Inputs (daily_flow_input)
@@ -31,6 +139,54 @@ CREATE TABLE IF NOT EXISTS daily_flow_input (
     biogas_flared_scf_day DOUBLE
 );
 
+-- 2a. Persisted results of the calculation graph (core/calcgraph.py, db/derived.py).
+-- derived_daily: per (sample_point, date) the graph's inputs and derived columns; dirty is a
+-- bitmask (calcgraph.DIRTY_BITS) of what ingests of readings, flows or factors have made stale.
+-- Rows are (re)computed lazily when a report reads them.
+CREATE TABLE IF NOT EXISTS derived_daily (
+    sample_point VARCHAR NOT NULL,
+    date DATE NOT NULL,
+    biogas_flared_scf DOUBLE,
+    ch4_pct DOUBLE,
+    h2s_ppm DOUBLE,
+    ch4_coverage DOUBLE,
+    h2s_coverage DOUBLE,
+    reading_count INTEGER,
+    btu DOUBLE,
+    mmbtu DOUBLE,
+    nox_lbs DOUBLE,
+    co_lbs DOUBLE,
+    voc_lbs DOUBLE,
+    so2_lbs DOUBLE,
+    dirty INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sample_point, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_derived_daily_date ON derived_daily (date);
+
+-- Monthly totals of derived_daily; dirty (0/1) whenever one of the month's days is marked.
+CREATE TABLE IF NOT EXISTS derived_monthly (
+    sample_point VARCHAR NOT NULL,
+    month VARCHAR NOT NULL,            -- 'YYYY-MM'
+    days INTEGER NOT NULL,
+    biogas_flared_scf DOUBLE,
+    btu DOUBLE,
+    mmbtu DOUBLE,
+    nox_lbs DOUBLE,
+    co_lbs DOUBLE,
+    voc_lbs DOUBLE,
+    so2_lbs DOUBLE,
+    dirty INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sample_point, month)
+) WITHOUT ROWID;
+
+-- Bumped by every transaction that marks derived rows dirty; a recomputation is only
+-- written back if it has not moved since the rows were read.
+CREATE TABLE IF NOT EXISTS derived_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    generation INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO derived_state (id, generation) VALUES (1, 0);
+
 -- 3. Constant Emission & Conversion Factors (factors)
 -- This holds the EmFactors! constants.
 CREATE TABLE IF NOT EXISTS factors (
@@ -39,6 +195,42 @@ CREATE TABLE IF NOT EXISTS factors (
     description VARCHAR
 );
 
+-- 3b. Threshold rules evaluated on every ingest (core/rules.py), and the exceedances they found.
+-- window_s > 0 compares the time-weighted average over the trailing window instead of each value.
+CREATE TABLE IF NOT EXISTS threshold_rule (
+    key VARCHAR PRIMARY KEY,
+    channel VARCHAR NOT NULL,      -- a ts_analyzer_reading gas channel, e.g. 'h2s_ppm'
+    op VARCHAR NOT NULL,           -- 'above' | 'below'
+    limit_value DOUBLE NOT NULL,
+    window_s DOUBLE NOT NULL DEFAULT 0,
+    sample_point VARCHAR,          -- NULL: every sample point
+    description VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS exceedance_event (
+    id INTEGER PRIMARY KEY,
+    rule_key VARCHAR NOT NULL,
+    sample_point VARCHAR NOT NULL,
+    channel VARCHAR NOT NULL,
+    op VARCHAR NOT NULL,
+    limit_value DOUBLE NOT NULL,
+    window_s DOUBLE NOT NULL,
+    start_timestamp INTEGER NOT NULL,  -- epoch microseconds, UTC
+    end_timestamp INTEGER,             -- NULL while open
+    peak_value DOUBLE NOT NULL,
+    peak_timestamp INTEGER NOT NULL,
+    reading_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_exceedance_event_point_start ON exceedance_event (sample_point, start_timestamp);
+CREATE INDEX IF NOT EXISTS idx_exceedance_event_open ON exceedance_event (rule_key, sample_point) WHERE end_timestamp IS NULL;
+
+-- Placeholder limits, to be confirmed against the permit (edit with POST /api/thresholds).
+INSERT OR IGNORE INTO threshold_rule (key, channel, op, limit_value, window_s, sample_point, description) VALUES
+('H2S_PPM_MAX', 'h2s_ppm', 'above', 1000, 0, NULL, 'Placeholder instantaneous H2S limit (ppm).'),
+('H2S_PPM_1H_AVG', 'h2s_ppm', 'above', 500, 3600, NULL, 'Placeholder 1-hour time-weighted average H2S limit (ppm).'),
+('CH4_PCT_MIN', 'ch4_pct', 'below', 45, 0, NULL, 'Placeholder minimum CH4 for stable flaring (%).'),
+('O2_PCT_MAX', 'o2_pct', 'above', 2, 0, NULL, 'Placeholder maximum O2 (air ingress) (%).');
+
 -- Insert initial compliance constants (based on Q4/BG Calcs) (idempotent)
 INSERT OR IGNORE INTO factors (key, value, description) VALUES
 ('HHV_PER_CH4_PCT', 10.4, 'HHV [BTU/scf]/100% CH4 - used for BTU calculation.'),
@@ -0,0 +1,96 @@
+# src/gastrack/db/migrate.py
+"""
+In-place migration of ts_analyzer_reading to the compact storage layout (db/storage.py):
+text UUID -> 16-byte BLOB, ISO text timestamp -> epoch microseconds (UTC), rowid table ->
+WITHOUT ROWID clustered on (sample_point, timestamp, id).
+
+Rows are copied in batches, one transaction per batch, with the progress (last copied
+legacy rowid) committed alongside each batch. An interrupted migration resumes where it
+stopped when the command is run again.
+"""
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.gastrack.db.connection import DB_PATH, _connect, _run_schema, has_legacy_reading_table
+from src.gastrack.db.crud import INSERT_READING_SQL, REBUILD_ROLLUP_SQL
+from src.gastrack.db.storage import to_epoch_us
+
+LEGACY_TABLE = "ts_analyzer_reading_legacy"
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def _legacy_row(row) -> tuple:
+    return (
+        uuid.UUID(row["id"]).bytes, to_epoch_us(datetime.fromisoformat(row["timestamp"])), row["sample_point"],
+        row["o2_pct"], row["co2_pct"], row["h2s_ppm"], row["ch4_pct"],
+        row["net_cal_val_mj_m3"], row["gross_cal_val_mj_m3"], row["t_sensor_f"],
+        row["balance_n2_pct"], int(bool(row["is_manual_override"])), row["override_note"],
+    )
+
+
+def _table_exists(conn, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def migrate_storage(
+    db_path: Path = DB_PATH,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    vacuum: bool = True,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """
+    Convert the database at db_path. Returns the number of readings copied by this run
+    (0 if it was already migrated). progress(copied_so_far, total) is called after each batch.
+    Run with the server stopped.
+    """
+    conn = _connect(db_path)
+    try:
+        if has_legacy_reading_table(conn):
+            with conn:
+                conn.execute(f"ALTER TABLE ts_analyzer_reading RENAME TO {LEGACY_TABLE}")
+                conn.execute("DROP INDEX IF EXISTS idx_ts_analyzer_reading_point_time")
+                conn.execute("CREATE TABLE IF NOT EXISTS storage_migration (last_rowid INTEGER NOT NULL)")
+                conn.execute("DELETE FROM storage_migration")
+                conn.execute("INSERT INTO storage_migration (last_rowid) VALUES (0)")
+        if not _table_exists(conn, LEGACY_TABLE):
+            return 0
+
+        with conn:
+            _run_schema(conn)  # creates the compact ts_analyzer_reading
+
+        total = conn.execute(f"SELECT COUNT(*) FROM {LEGACY_TABLE}").fetchone()[0]
+        last_rowid = conn.execute("SELECT last_rowid FROM storage_migration").fetchone()[0]
+        done = conn.execute(f"SELECT COUNT(*) FROM {LEGACY_TABLE} WHERE rowid <= ?", (last_rowid,)).fetchone()[0]
+        copied = 0
+        while True:
+            rows = conn.execute(
+                f"SELECT rowid, * FROM {LEGACY_TABLE} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1]["rowid"]
+            with conn:
+                conn.executemany(INSERT_READING_SQL, [_legacy_row(row) for row in rows])
+                conn.execute("UPDATE storage_migration SET last_rowid = ?", (last_rowid,))
+            copied += len(rows)
+            if progress is not None:
+                progress(done + copied, total)
+
+        with conn:
+            # Day buckets are now UTC days of the integer timestamps.
+            conn.execute("DELETE FROM rollup_analyzer_daily")
+            conn.execute(REBUILD_ROLLUP_SQL)
+            # A resumed run's _run_schema already backfilled the rows copied before the
+            # interruption (reading_change was still empty then): one change per reading.
+            conn.execute("DELETE FROM reading_change")
+            conn.execute("INSERT INTO reading_change (reading_id) SELECT id FROM ts_analyzer_reading ORDER BY timestamp")
+            conn.execute(f"DROP TABLE {LEGACY_TABLE}")
+            conn.execute("DROP TABLE storage_migration")
+        if vacuum:
+            conn.execute("VACUUM")
+        return copied
+    finally:
+        conn.close()
@@ -0,0 +1,12 @@
+# --- src/gastrack/db/paths.py ---
+# Database file locations, importable without loading sqlite3 or the app (CLI start-up).
+import os
+from pathlib import Path
+
+# Define the paths relative to the current file
+BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
+# GASTRACK_DB_PATH points the app (and benchmark runs) at another database file.
+DB_PATH = Path(os.environ.get("GASTRACK_DB_PATH", BASE_DIR / "gastrack.db"))
+SQL_SCHEMA_PATH = BASE_DIR / "src" / "gastrack" / "db" / "init_schema.sql"
+# Closed months of readings moved out of the hot database (`gastrack db-archive`, db/archive.py).
+ARCHIVE_DIR = Path(os.environ.get("GASTRACK_ARCHIVE_DIR", DB_PATH.parent / "gastrack-archive"))
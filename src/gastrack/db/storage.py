@@ -0,0 +1,43 @@
+# src/gastrack/db/storage.py
+"""
+On-disk encodings for ts_analyzer_reading.
+
+- id:        16-byte BLOB (uuid.UUID.bytes) instead of 36-char text.
+- timestamp: INTEGER microseconds since the Unix epoch, UTC, instead of ISO text.
+             Naive datetimes are taken as UTC. Values read back are UTC-aware.
+- day:       'YYYY-MM-DD' of the UTC timestamp (rollup bucketing).
+"""
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+US_PER_SECOND = 1_000_000
+US_PER_DAY = 86_400 * US_PER_SECOND
+
+
+def to_epoch_us(ts: datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    delta = ts - EPOCH
+    return (delta.days * 86_400 + delta.seconds) * US_PER_SECOND + delta.microseconds
+
+
+def from_epoch_us(us: int) -> datetime:
+    return EPOCH + timedelta(microseconds=us)
+
+
+def day_of(us: int) -> str:
+    return date.fromordinal(EPOCH_ORDINAL + us // US_PER_DAY).isoformat()
+
+
+def day_start_us(day: str) -> int:
+    return (date.fromisoformat(day).toordinal() - EPOCH_ORDINAL) * US_PER_DAY
+
+
+def uuid_to_blob(value: uuid.UUID) -> bytes:
+    return value.bytes
+
+
+def blob_to_uuid(value: bytes) -> uuid.UUID:
+    return uuid.UUID(bytes=value)
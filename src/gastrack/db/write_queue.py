@@ -0,0 +1,151 @@
+# src/gastrack/db/write_queue.py
+"""
+Group-commit (write-behind) queue for analyzer ingestion.
+
+Concurrent POSTs to /api/readings/ingest are gathered and committed together,
+either once max_batch_rows rows are waiting or max_delay_ms after the first one
+arrived, so many small posts share one transaction (and one fsync).
+
+Durability modes (GASTRACK_INGEST_DURABILITY):
+- "commit"  : submit() returns once the caller's rows are committed (default).
+- "enqueue" : submit() returns as soon as the rows are queued. Lower latency,
+              but rows still in the queue are lost if the process dies.
+"""
+import asyncio
+import logging
+import os
+from typing import Callable, List, Literal
+
+from src.gastrack.db import crud
+from src.gastrack.db.executor import get_executor
+from src.gastrack.core.models import AnalyzerReading
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("commit", "enqueue")
+Durability = Literal["commit", "enqueue"]
+
+DEFAULT_MAX_BATCH_ROWS = int(os.environ.get("GASTRACK_INGEST_BATCH_ROWS", "5000"))
+DEFAULT_MAX_DELAY_MS = float(os.environ.get("GASTRACK_INGEST_BATCH_MS", "10"))
+DEFAULT_DURABILITY = os.environ.get("GASTRACK_INGEST_DURABILITY", "commit")
+DEFAULT_MAX_QUEUED = int(os.environ.get("GASTRACK_INGEST_MAX_QUEUED", "1000"))
+
+
+class ReadingWriteQueue:
+    def __init__(
+        self,
+        max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS,
+        max_delay_ms: float = DEFAULT_MAX_DELAY_MS,
+        durability: Durability = DEFAULT_DURABILITY,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        write_fn: Callable[[List[List[AnalyzerReading]]], list] = crud.ingest_analyzer_reading_batches,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}, got {durability!r}")
+        self.max_batch_rows = max_batch_rows
+        self.max_delay = max_delay_ms / 1000
+        self.durability = durability
+        self._max_queued = max_queued
+        self._write_fn = write_fn
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> "ReadingWriteQueue":
+        """Start the flusher task on the running event loop."""
+        if not self.is_running:
+            self._queue = asyncio.Queue(maxsize=self._max_queued)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self) -> None:
+        """Flush whatever is still queued, then stop the flusher task."""
+        if self.is_running:
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+
+    async def submit(self, readings: List[AnalyzerReading]) -> int:
+        """
+        Queue one caller's readings. Returns the number of rows inserted
+        ("commit") or queued ("enqueue"); raises the caller's own insert error
+        in "commit" mode.
+        """
+        if not readings:
+            return 0
+        if not self.is_running:
+            raise RuntimeError("ReadingWriteQueue is not running.")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((readings, future))  # waits when the queue is full (backpressure)
+        if self.durability == "enqueue":
+            return len(readings)
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            rows = len(item[0])
+            deadline = loop.time() + self.max_delay
+            while rows < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            await self._flush(batch)
+
+    async def _flush(self, batch: list) -> None:
+        try:
+            results = await get_executor().run_write(self._write_fn, [readings for readings, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (readings, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                if self.durability == "enqueue":
+                    logger.error("Queued ingest of %d readings failed: %s", len(readings), result)
+                elif not future.done():
+                    future.set_exception(result)
+            elif not future.done():
+                future.set_result(result)
+
+
+_write_queue: ReadingWriteQueue | None = None
+
+
+def start_write_queue(**kwargs) -> ReadingWriteQueue:
+    """Start the process-wide write queue. Called from the app lifespan on startup."""
+    global _write_queue
+    if _write_queue is None or not _write_queue.is_running:
+        _write_queue = ReadingWriteQueue(**kwargs).start()
+    return _write_queue
+
+
+async def stop_write_queue() -> None:
+    """Flush and stop the process-wide write queue. Called from the app lifespan on shutdown."""
+    global _write_queue
+    if _write_queue is not None:
+        await _write_queue.stop()
+        _write_queue = None
+
+
+def get_write_queue() -> ReadingWriteQueue:
+    """Return the running write queue, starting one on demand (e.g. app used without lifespan)."""
+    if _write_queue is None or not _write_queue.is_running:
+        return start_write_queue()
+    return _write_queue
@@ -4,9 +4,11 @@ import httpx
 from starlette.testclient import TestClient
 
 # Ensure the database is initialized before any tests run
+from src.gastrack.db import connection
 from src.gastrack.db.connection import DB_PATH
 from src.gastrack.core.server import get_app
-import src.gastrack.db.crud # Needed to trigger init_db
+from src.gastrack.core.cache import latest_readings, resample_cache
+import src.gastrack.db.crud  # the schema itself is created by get_app() / wipe_db() via init_db()
 
 
 @pytest.fixture(scope="session")
@@ -25,3 +27,20 @@ def client(app):
         # We yield the actual HTTPX client object managed by TestClient
         # This allows us to use it in async tests
         yield test_client
+
+
+def wipe_db():
+    """
+    Delete and re-initialize the database file.
+    Pooled connections (opened by the app lifespan) are closed first and re-opened
+    afterwards, so no connection keeps pointing at the deleted file or its WAL.
+    """
+    pool_was_open = connection.get_pool() is not None
+    connection.close_pool()
+    for suffix in ("", "-wal", "-shm"):
+        DB_PATH.with_name(DB_PATH.name + suffix).unlink(missing_ok=True)
+    connection.init_db()
+    latest_readings.clear()
+    resample_cache.clear()
+    if pool_was_open:
+        connection.open_pool()
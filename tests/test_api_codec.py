@@ -0,0 +1,47 @@
+# --- tests/test_api_codec.py ---
+import pytest
+from msgspec import json, msgpack
+
+from conftest import wipe_db
+
+MSGPACK = "application/msgpack"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def test_json_request_body_is_accepted(client):
+    body = json.encode([{"timestamp": "2025-05-01T00:00:00Z", "sample_point": "Inlet", "ch4_pct": 59.0}])
+    response = client.post("/api/readings/ingest", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 201
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json()["status"] == "success"
+
+
+def test_msgpack_response_when_preferred(client):
+    response = client.get("/api/analyzer/latest", params={"point": "Inlet"}, headers={"Accept": MSGPACK})
+    assert response.headers["content-type"] == MSGPACK
+    assert msgpack.decode(response.content)["ch4_pct"] == 59.0
+
+    factors = client.get("/api/factors", headers={"Accept": f"application/json;q=0.5, {MSGPACK}"})
+    assert factors.headers["content-type"] == MSGPACK
+    assert any(f["key"] == "HHV_PER_CH4_PCT" for f in msgpack.decode(factors.content))
+    assert factors.headers["etag"] != client.get("/api/factors").headers["etag"]  # one ETag per representation
+
+    page = client.get("/api/readings", params={"sample_point": "Inlet"}, headers={"Accept": MSGPACK})
+    assert len(msgpack.decode(page.content)["items"]) == 1
+
+
+def test_json_is_the_default_response(client):
+    response = client.get("/api/readings", params={"sample_point": "Inlet"}, headers={"Accept": "*/*"})
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json()["next_cursor"] is None
+
+
+def test_unsupported_request_content_type(client):
+    response = client.post("/api/flows/ingest", content=b"date,flow", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 415
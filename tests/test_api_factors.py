@@ -1,35 +1,22 @@
 # --- tests/test_api_factors.py ---
 import pytest
-import importlib
-import sys
 
-from src.gastrack.db.connection import DB_PATH
-import src.gastrack.db.connection
+from conftest import wipe_db
 
 
 # Ensure the database is clean before running tests that touch the DB
 @pytest.fixture(scope="module", autouse=True)
-def setup_db_for_test():
+def setup_db_for_test(client):
     """Wipes and re-initializes the database for a clean test run."""
-    if DB_PATH.exists():
-        DB_PATH.unlink()
-
-    module_name = 'src.gastrack.db.connection'
-    if module_name in sys.modules:
-        importlib.reload(sys.modules[module_name])
-    else:
-        # Fallback for the first run, though the top-level import should cover this
-        import src.gastrack.db.connection
-    
-    # The first import of crud or connection will trigger re-initialization
-    import src.gastrack.db.crud
+    # The app (and its connection pool) is already running via the session client,
+    # so reset through the pool instead of reloading the connection module.
+    wipe_db()
     
     # We yield control back to the test runner
     yield
     
     # Cleanup: wipe the test DB after the module runs
-    if DB_PATH.exists():
-        DB_PATH.unlink()
+    wipe_db()
 
 @pytest.mark.asyncio
 async def test_get_factors_success(client):
@@ -43,4 +30,24 @@ async def test_get_factors_success(client):
     # We still rely on the database cleanup happening in conftest.py
     assert isinstance(data, list)
     assert len(data) >= 4 # Check for the four factors inserted in init_schema.sql
-    assert any(item["key"] == "EMF_NOX_LBS_MMBTU" for item in data)
\ No newline at end of file
+    assert any(item["key"] == "EMF_NOX_LBS_MMBTU" for item in data)
+
+def test_get_factors_etag_and_invalidation(client):
+    from msgspec import msgpack
+    from src.gastrack.core.models import Factor
+
+    first = client.get("/api/factors")
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+
+    not_modified = client.get("/api/factors", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    update = [Factor(key="HHV_PER_CH4_PCT", value=10.5, description="updated")]
+    assert client.post("/api/factors", content=msgpack.encode(update)).status_code == 201
+
+    changed = client.get("/api/factors", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert next(f for f in changed.json() if f["key"] == "HHV_PER_CH4_PCT")["value"] == 10.5
@@ -0,0 +1,175 @@
+# --- tests/test_api_readings.py ---
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from msgspec import msgpack
+
+from conftest import wipe_db
+from src.gastrack.core.models import AnalyzerReading
+from src.gastrack.db import async_crud
+from src.gastrack.db.connection import get_read_connection
+from src.gastrack.db.executor import DBBusyError, DBTimeoutError
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def _reading(**kwargs):
+    kwargs.setdefault("timestamp", datetime(2025, 9, 1, 8, 0, tzinfo=timezone.utc))
+    kwargs.setdefault("sample_point", "Inlet")
+    return AnalyzerReading(**kwargs)
+
+
+def test_ingest_readings(client):
+    readings = [_reading(ch4_pct=61.5), _reading(sample_point="Outlet", h2s_ppm=12.0)]
+    response = client.post("/api/readings/ingest", content=msgpack.encode(readings))
+
+    assert response.status_code == 201
+    with get_read_connection() as conn:
+        count = conn.execute("SELECT COUNT(*) FROM ts_analyzer_reading").fetchone()[0]
+    assert count == 2
+
+
+def test_ingest_readings_duplicate_id_fails_alone(client):
+    reading = _reading(id=uuid.uuid4())
+    assert client.post("/api/readings/ingest", content=msgpack.encode([reading])).status_code == 201
+
+    response = client.post("/api/readings/ingest", content=msgpack.encode([reading]))
+    assert response.status_code == 500
+
+
+def test_ingest_readings_validation_error(client):
+    response = client.post("/api/readings/ingest", content=msgpack.encode([{"sample_point": "Nowhere"}]))
+    assert response.status_code == 400
+
+
+def _count_readings():
+    with get_read_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM ts_analyzer_reading").fetchone()[0]
+
+
+def test_ingest_stream_ndjson_reports_bad_records(client):
+    from msgspec import json
+
+    lines = [json.encode(_reading(ch4_pct=float(i))) for i in range(3)]
+    lines.insert(1, b'{"sample_point": "Inlet"}')  # missing timestamp
+    before = _count_readings()
+
+    response = client.post(
+        "/api/readings/ingest/stream?chunk_size=2",
+        content=b"\n".join(lines) + b"\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 207
+    body = response.json()
+    assert body["inserted"] == 3
+    assert body["error_count"] == 1 and body["errors"][0]["record"] == 1
+    assert [c["inserted"] for c in body["chunks"]] == [1, 2]
+    assert _count_readings() == before + 3
+
+
+def test_ingest_stream_length_prefixed_msgpack(client):
+    from src.gastrack.api.streaming import frame_length_prefixed
+
+    payload = b"".join(frame_length_prefixed(msgpack.encode(_reading())) for _ in range(5))
+    before = _count_readings()
+
+    response = client.post(
+        "/api/readings/ingest/stream?chunk_size=2",
+        content=payload,
+        headers={"Content-Type": "application/msgpack"},
+    )
+
+    assert response.status_code == 201
+    assert len(response.json()["chunks"]) == 3
+    assert _count_readings() == before + 5
+
+
+def test_ingest_stream_truncated_frame(client):
+    from src.gastrack.api.streaming import frame_length_prefixed
+
+    payload = frame_length_prefixed(msgpack.encode(_reading()))
+    response = client.post(
+        "/api/readings/ingest/stream",
+        content=payload + payload[:-3],
+        headers={"Content-Type": "application/msgpack"},
+    )
+
+    assert response.status_code == 207
+    assert response.json()["inserted"] == 1
+
+
+def test_ingest_stream_unsupported_media_type(client):
+    response = client.post("/api/readings/ingest/stream", content=b"[]", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 415
+
+
+def test_list_readings_keyset_pages(client):
+    from datetime import timedelta
+
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    readings = [_reading(sample_point="Sheet 3", timestamp=base + timedelta(minutes=i), ch4_pct=float(i))
+                for i in range(7)]
+    readings.append(_reading(sample_point="Sheet 4", timestamp=base))
+    assert client.post("/api/readings/ingest", content=msgpack.encode(readings)).status_code == 201
+
+    params = {"sample_point": "Sheet 3", "start": base.isoformat(),
+              "end": (base + timedelta(minutes=6)).isoformat(), "limit": 4}
+    first = client.get("/api/readings", params=params).json()
+    assert [r["ch4_pct"] for r in first["items"]] == [0.0, 1.0, 2.0, 3.0]
+    assert first["next_cursor"]
+
+    second = client.get("/api/readings", params={**params, "cursor": first["next_cursor"]}).json()
+    assert [r["ch4_pct"] for r in second["items"]] == [4.0, 5.0]  # end is exclusive
+    assert second["next_cursor"] is None
+
+
+def test_list_readings_rejects_bad_params(client):
+    assert client.get("/api/readings", params={"sample_point": "Nowhere"}).status_code == 400
+    assert client.get("/api/readings", params={"sample_point": "Inlet", "cursor": "###"}).status_code == 400
+    assert client.get("/api/readings", params={"sample_point": "Inlet", "start": "yesterday"}).status_code == 400
+
+
+@pytest.mark.parametrize("error, status", [(DBBusyError, 503), (DBTimeoutError, 504), (RuntimeError, 500)])
+@pytest.mark.parametrize("accept", ["application/json", "application/msgpack"])
+def test_list_readings_database_errors_get_a_status(client, monkeypatch, error, status, accept):
+    async def failing(*args):
+        raise error("nope")
+
+    monkeypatch.setattr(async_crud, "get_readings_page", failing)
+    response = client.get("/api/readings", params={"sample_point": "Inlet"}, headers={"Accept": accept})
+    assert response.status_code == status  # not a truncated 200
+
+
+def test_latest_reading_follows_ingest(client):
+    from datetime import timedelta
+
+    newer = _reading(sample_point="Sheet 6", timestamp=datetime(2030, 1, 2, tzinfo=timezone.utc), ch4_pct=63.0)
+    older = _reading(sample_point="Sheet 6", timestamp=newer.timestamp - timedelta(days=1), ch4_pct=10.0)
+    assert client.post("/api/readings/ingest", content=msgpack.encode([newer, older])).status_code == 201
+
+    response = client.get("/api/analyzer/latest", params={"point": "Sheet 6"})
+    assert response.status_code == 200
+    assert response.json()["ch4_pct"] == 63.0  # the backfilled, older reading does not win
+
+
+def test_latest_reading_cache_is_primed_from_db(client):
+    from src.gastrack.core.cache import latest_readings
+    from src.gastrack.db import crud
+
+    latest_readings.clear()
+    assert client.get("/api/analyzer/latest", params={"point": "Sheet 6"}).status_code == 404
+
+    latest_readings.update(crud.get_latest_readings())
+    assert client.get("/api/analyzer/latest", params={"point": "Sheet 6"}).json()["ch4_pct"] == 63.0
+
+
+def test_live_stream_rejects_unknown_sample_point(client):
+    response = client.get("/api/readings/live?point=Inlet,Nowhere")
+    assert response.status_code == 400
@@ -0,0 +1,129 @@
+# --- tests/test_archive.py ---
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conftest import wipe_db
+from src.gastrack.core.models import AnalyzerReading
+from src.gastrack.db import archive, crud
+from src.gastrack.db.connection import DB_PATH, get_read_connection, init_db
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _count_hot(month: str) -> int:
+    lo, hi = archive.month_start_us(month), archive.month_start_us(archive.next_month(month))
+    with get_read_connection() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM ts_analyzer_reading WHERE timestamp >= ? AND timestamp < ?", (lo, hi)
+        ).fetchone()[0]
+
+
+def _snapshot():
+    series_args = ("Inlet", "ch4_pct", START + timedelta(days=20), START + timedelta(days=70))
+    first, _, _ = crud.get_series_extent(*series_args)
+    return {
+        "page": crud.get_readings_page("Inlet", limit=10_000),
+        "extent": crud.get_series_extent(*series_args),
+        "raw": crud.get_series_raw(*series_args),
+        "extremes": crud.get_series_extremes(*series_args, first, 7 * 86_400_000_000),
+        "latest": crud.get_latest_readings(),
+        "rollup": crud.get_daily_rollup("Inlet"),
+    }
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+@pytest.fixture(scope="module")
+def archived(tmp_path_factory):
+    """Jan-Mar 2025 of Inlet readings (and one Outlet reading in January), Jan + Feb archived."""
+    # Distinct values: which of several equal extremes a bucket reports depends on scan order.
+    readings = [
+        AnalyzerReading(timestamp=START + timedelta(hours=6 * i), sample_point="Inlet", ch4_pct=50.0 + i * 37 % 360 / 10)
+        for i in range(4 * 90)
+    ]
+    readings.append(AnalyzerReading(timestamp=START + timedelta(days=3), sample_point="Outlet", h2s_ppm=12.0))
+    crud.ingest_analyzer_readings(readings)
+    crud.rebuild_daily_rollup()  # compare SQL-summed rollups with SQL-summed rollups
+    before = _snapshot()
+
+    archive_dir = tmp_path_factory.mktemp("archive")
+    moved = archive.archive_months("2025-03", DB_PATH, archive_dir=archive_dir, vacuum=False)
+    return before, moved, archive_dir
+
+
+def test_archive_moves_closed_months_out_of_the_hot_table(archived):
+    _, moved, archive_dir = archived
+    assert moved == [("2025-01", 4 * 31 + 1), ("2025-02", 4 * 28)]
+    assert sorted(p.name for p in archive_dir.iterdir()) == ["gastrack-2025-01.db", "gastrack-2025-02.db"]
+    assert _count_hot("2025-01") == _count_hot("2025-02") == 0
+    assert _count_hot("2025-03") == 4 * 31
+
+
+@pytest.mark.parametrize("max_attached", [None, 1])
+def test_reads_span_hot_and_archived_months(archived, monkeypatch, max_attached):
+    before, _, _ = archived
+    monkeypatch.setattr(archive, "MAX_ATTACHED", max_attached)  # 1: one archive per chunk
+    assert _snapshot() == before
+    assert crud.rebuild_daily_rollup() == 90 + 1
+    assert crud.get_daily_rollup("Inlet") == before["rollup"]
+
+
+def test_keyset_pages_cross_into_the_hot_table(client, archived):
+    params = {"sample_point": "Inlet", "start": "2025-02-28T00:00:00Z", "end": "2025-03-02T00:00:00Z", "limit": 3}
+    stamps = []
+    while True:
+        response = client.get("/api/readings", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        stamps += [r["timestamp"] for r in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+        params["cursor"] = cursor
+    assert len(stamps) == 8 and stamps[0] == "2025-02-28T00:00:00Z" and stamps[-1] == "2025-03-01T18:00:00Z"
+
+
+def test_late_readings_for_an_archived_month_are_read_and_moved_on_rerun(archived):
+    _, _, archive_dir = archived
+    late = AnalyzerReading(timestamp=START + timedelta(days=10, minutes=1), sample_point="Inlet", ch4_pct=99.0)
+    crud.ingest_analyzer_readings([late])
+    assert crud.get_series_extent("Inlet", "ch4_pct", START, START + timedelta(days=31))[2] == 4 * 31 + 1
+
+    assert archive.archive_months("2025-03", DB_PATH, archive_dir=archive_dir, vacuum=False) == [("2025-01", 1)]
+    assert archive.archive_months("2025-03", DB_PATH, archive_dir=archive_dir, vacuum=False) == []
+    assert _count_hot("2025-01") == 0
+    assert crud.get_series_extent("Inlet", "ch4_pct", START, START + timedelta(days=31))[2] == 4 * 31 + 1
+
+
+def test_cutoff_month_keeps_the_current_month_hot():
+    today = datetime(2026, 1, 15).date()
+    assert archive.cutoff_month(1, today) == "2026-01"
+    assert archive.cutoff_month(3, today) == "2025-11"
+    with pytest.raises(ValueError):
+        archive.cutoff_month(0, today)
+
+
+class _FailingConnection(sqlite3.Connection):
+    """Fails the hot-row delete of an archive run, and the DETACH after it."""
+    def execute(self, sql, *args):
+        if sql.lstrip().startswith(("DELETE FROM main.", "DETACH")):
+            raise sqlite3.OperationalError(f"failed: {sql.split()[0]}")
+        return super().execute(sql, *args)
+
+
+def test_failed_detach_does_not_hide_the_archive_error(tmp_path):
+    conn = sqlite3.connect(tmp_path / "hot.db", factory=_FailingConnection)
+    try:
+        init_db(conn)
+        with pytest.raises(sqlite3.OperationalError, match="failed: DELETE"):
+            archive._archive_month(conn, "2024-01", ["Inlet"], tmp_path / "gastrack-2024-01.db")
+        assert not conn.in_transaction
+    finally:
+        conn.close()
@@ -0,0 +1,37 @@
+# --- tests/test_benchmarks.py ---
+"""Small-scale run of benchmarks/suite.py, so the suite keeps working between real benchmark runs."""
+import msgspec
+import pytest
+
+from conftest import wipe_db
+from benchmarks import suite
+from benchmarks.synthetic import ALL_SAMPLE_POINTS, iter_reading_batches, reading_count
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def test_synthetic_readings_cover_every_point_and_are_deterministic():
+    first = [r for batch in iter_reading_batches(days=1, interval_minutes=60, batch_size=50) for r in batch]
+    again = [r for batch in iter_reading_batches(days=1, interval_minutes=60, batch_size=50) for r in batch]
+
+    assert len(first) == reading_count(1, 60) == 24 * 8
+    assert {r.sample_point for r in first} == set(ALL_SAMPLE_POINTS)
+    assert [r.ch4_pct for r in first] == [r.ch4_pct for r in again]
+
+
+def test_suite_smoke(client, tmp_path):
+    results = suite.run(days=2, interval_minutes=60, api_days=1, repeat=3, client=client)
+
+    assert results["ingest"]["crud"]["rows"] == reading_count(2, 60)
+    assert results["ingest"]["api"]["rows"] == reading_count(1, 60)
+    assert results["queries"]["api_readings_one_day"]["n"] == 3
+    assert results["resources"]["db_bytes"] > 0
+
+    path = suite.write_results(results, tmp_path / "bench.json")
+    reloaded = msgspec.json.decode(path.read_bytes())
+    assert all(ratio == 1.0 for _, _, _, ratio in suite.compare(reloaded, results) if ratio is not None)
@@ -0,0 +1,91 @@
+# --- tests/test_calcs.py ---
+import math
+from array import array
+from datetime import datetime, timezone
+
+import pytest
+from msgspec import msgpack
+
+from conftest import wipe_db
+from src.gastrack.core import calcgraph, calcs
+from src.gastrack.core.cache import FactorCache
+from src.gastrack.core.models import AnalyzerReading, DailyFlowInput, Factor
+from src.gastrack.db import derived
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+@pytest.fixture
+def factors():
+    values = {
+        "HHV_PER_CH4_PCT": 10.4,
+        "H2S_PPM_TO_GRAINS_CCF_RATIO": 16.0,
+        "EMF_NOX_LBS_MMBTU": 0.05,
+        "EMF_CO_LBS_MMBTU": 0.1,
+        "EMF_VOC_LBS_MMBTU": 0.03,
+        "EMF_SO2_H2S_CONVERSION_FACTOR": 0.8,
+    }
+    return FactorCache().store([Factor(key=k, value=v) for k, v in values.items()], 0)
+
+
+def test_evaluate(factors):
+    columns = {
+        "biogas_flared_scf": array("d", [1_000_000.0, calcgraph.NAN]),
+        "ch4_pct": array("d", [60.0, 60.0]),
+        "h2s_ppm": array("d", [160.0, 160.0]),
+    }
+    out = calcgraph.evaluate(columns, factors)
+
+    assert out["btu"][0] == pytest.approx(1_000_000 * 60 * 10.4)
+    assert out["mmbtu"][0] == pytest.approx(624.0)
+    assert out["nox_lbs"][0] == pytest.approx(624.0 * 0.05)
+    # 160 ppm = 10 gr/ccf; 1e6 scf = 1e4 ccf -> 1e5 gr = 14.2857 lb H2S
+    assert out["so2_lbs"][0] == pytest.approx(1e5 / 7000 * calcgraph.MW_SO2 / calcgraph.MW_H2S * 0.8)
+    assert math.isnan(out["mmbtu"][1])  # missing flow stays missing
+
+
+def test_month_range():
+    assert calcs.month_range("2025-12") == ("2025-12-01", "2026-01-01")
+    with pytest.raises(ValueError):
+        calcs.month_range("December")
+
+
+def test_emissions_report_endpoint(client):
+    flows = [DailyFlowInput(date="2025-09-01", biogas_flared_scf_day=1_000_000.0),
+             DailyFlowInput(date="2025-09-02", biogas_flared_scf_day=500_000.0)]
+    readings = [
+        AnalyzerReading(timestamp=datetime(2025, 9, 1, h, tzinfo=timezone.utc), sample_point="Outlet", ch4_pct=ch4)
+        for h, ch4 in ((6, 58.0), (18, 62.0))
+    ]
+    assert client.post("/api/flows/ingest", content=msgpack.encode(flows)).status_code == 201
+    assert client.post("/api/readings/ingest", content=msgpack.encode(readings)).status_code == 201
+
+    response = client.get("/api/reports/emissions", params={"month": "2025-09"})
+    assert response.status_code == 200
+    report = response.json()
+    assert [d["date"] for d in report["days"]] == ["2025-09-01", "2025-09-02"]
+    first, second = report["days"]
+    assert first["reading_count"] == 2 and first["ch4_pct"] == pytest.approx(60.0)
+    assert first["mmbtu"] == pytest.approx(624.0)
+    assert second["mmbtu"] is None  # no analyzer readings that day
+    assert report["totals"]["mmbtu"] == pytest.approx(624.0)
+
+    assert client.get("/api/reports/emissions").status_code == 400
+
+
+def test_load_daily_with_other_factors_is_not_persisted(client, factors):
+    flows = [DailyFlowInput(date="2025-08-01", biogas_flared_scf_day=1_000_000.0)]
+    reading = AnalyzerReading(timestamp=datetime(2025, 8, 1, tzinfo=timezone.utc), sample_point="Outlet", h2s_ppm=160.0)
+    assert client.post("/api/flows/ingest", content=msgpack.encode(flows)).status_code == 201
+    assert client.post("/api/readings/ingest", content=msgpack.encode([reading])).status_code == 201
+
+    columns, pending = derived.load_daily("Outlet", "2025-08-01", "2025-08-02", factors)
+    assert columns["date"] == ["2025-08-01"] and columns["reading_count"] == [1]
+    assert columns["so2_lbs"][0] == pytest.approx(1e5 / 7000 * calcgraph.MW_SO2 / calcgraph.MW_H2S * 0.8)
+    assert columns["mmbtu"] == [None]  # no CH4 that day
+    assert pending is None  # not the stored factors
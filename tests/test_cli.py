@@ -0,0 +1,20 @@
+# --- tests/test_cli.py ---
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_cli_import_does_not_load_server_or_db(tmp_path):
+    """Start-up cost: commands import what they need, the CLI module itself stays light."""
+    code = (
+        "import sys, src.cli; "
+        "print(sorted(m for m in ('uvicorn', 'starlette', 'sqlite3', 'src.gastrack.db.connection') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        env={"GASTRACK_DB_PATH": str(tmp_path / "cli.db"), "PATH": ""},
+    ).stdout
+    assert out.strip() == "[]"
+    assert not (tmp_path / "cli.db").exists()  # and importing never creates the database
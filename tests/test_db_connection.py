@@ -0,0 +1,78 @@
+# --- tests/test_db_connection.py ---
+import threading
+
+import pytest
+
+from src.gastrack.db.connection import SCHEMA_VERSION, ConnectionPool, init_db, schema_version
+
+
+@pytest.fixture
+def pool(tmp_path):
+    db_path = tmp_path / "pool.db"
+    pool = ConnectionPool(db_path).open()
+    with pool.writer() as conn:
+        init_db(conn)
+    yield pool
+    pool.close()
+
+
+def test_reader_connection_is_reused_per_thread(pool):
+    with pool.reader() as first:
+        pass
+    with pool.reader() as second:
+        pass
+    assert first is second
+
+    seen = []
+    def worker():
+        with pool.reader() as conn:
+            seen.append(conn)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert seen[0] is not first
+
+
+def test_writer_rolls_back_on_error(pool):
+    with pytest.raises(RuntimeError):
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO factors (key, value) VALUES ('TMP', 1.0)")
+            raise RuntimeError("boom")
+
+    with pool.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM factors WHERE key = 'TMP'").fetchone()[0] == 0
+
+
+def test_reader_is_query_only(pool):
+    with pool.reader() as conn:
+        with pytest.raises(Exception):
+            conn.execute("DELETE FROM factors")
+
+
+def test_closed_pool_refuses_connections(pool):
+    pool.close()
+    with pytest.raises(RuntimeError):
+        with pool.writer():
+            pass
+
+
+def test_read_only_pool_has_no_writer(pool):
+    read_only = ConnectionPool(pool.db_path, read_only=True).open()
+    try:
+        with read_only.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM factors").fetchone()[0] >= 0
+        with pytest.raises(RuntimeError, match="read-only"):
+            with read_only.writer():
+                pass
+    finally:
+        read_only.close()
+
+
+def test_init_db_skips_schema_when_version_is_current(pool):
+    with pool.writer() as conn:
+        assert schema_version(conn) == SCHEMA_VERSION
+        assert init_db(conn) is False
+        conn.execute("DELETE FROM factors")
+        assert init_db(conn, force=True) is True  # re-seeds the default factors
+        assert conn.execute("SELECT COUNT(*) FROM factors").fetchone()[0] > 0
@@ -0,0 +1,59 @@
+# --- tests/test_db_executor.py ---
+import asyncio
+import threading
+
+import pytest
+
+from src.gastrack.db.executor import DBExecutor, DBBusyError, DBTimeoutError
+
+
+@pytest.fixture
+def executor():
+    ex = DBExecutor(reader_threads=2, max_pending_writes=1, admit_timeout=0.05, call_timeout=1.0).start()
+    yield ex
+    ex.shutdown()
+
+
+async def test_writes_run_on_a_single_thread(executor):
+    names = await asyncio.gather(*[
+        executor.run_write(lambda: threading.current_thread().name) for _ in range(3)
+    ])
+    assert len(set(names)) == 1
+    assert names[0].startswith("gastrack-db-writer")
+
+
+async def test_write_backpressure_does_not_block_reads(executor):
+    release = threading.Event()
+    slow_write = asyncio.ensure_future(executor.run_write(release.wait, 2))
+    await asyncio.sleep(0.01)
+
+    # The single write slot is taken: a second write is rejected after admit_timeout ...
+    with pytest.raises(DBBusyError):
+        await executor.run_write(lambda: None)
+    # ... while reads still go through.
+    assert await executor.run_read(lambda: 42) == 42
+
+    release.set()
+    assert await slow_write is True
+
+
+async def test_call_timeout(executor):
+    executor.call_timeout = 0.05
+    release = threading.Event()
+    with pytest.raises(DBTimeoutError):
+        await executor.run_read(release.wait, 1)
+    release.set()
+
+
+async def test_timed_out_call_keeps_its_slot(executor):
+    executor.call_timeout = 0.05
+    release = threading.Event()
+    with pytest.raises(DBTimeoutError):
+        await executor.run_write(release.wait, 2)
+    # The timed-out write still runs on the writer thread, so the slot is still taken.
+    with pytest.raises(DBBusyError):
+        await executor.run_write(lambda: None)
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert await executor.run_write(lambda: 42) == 42
@@ -0,0 +1,105 @@
+# --- tests/test_db_migrate.py ---
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from src.gastrack.db.connection import ConnectionPool, LegacyStorageError, init_db
+from src.gastrack.db.migrate import migrate_storage
+from src.gastrack.db.storage import from_epoch_us, to_epoch_us
+
+LEGACY_DDL = """
+CREATE TABLE ts_analyzer_reading (
+    id UUID PRIMARY KEY, timestamp TIMESTAMP, sample_point VARCHAR,
+    o2_pct DOUBLE, co2_pct DOUBLE, h2s_ppm DOUBLE, ch4_pct DOUBLE,
+    net_cal_val_mj_m3 DOUBLE, gross_cal_val_mj_m3 DOUBLE, t_sensor_f DOUBLE, balance_n2_pct DOUBLE,
+    is_manual_override BOOLEAN DEFAULT FALSE, override_note VARCHAR
+);
+CREATE INDEX idx_ts_analyzer_reading_point_time ON ts_analyzer_reading (sample_point, timestamp, id);
+"""
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_DDL)
+    conn.executemany(
+        "INSERT INTO ts_analyzer_reading (id, timestamp, sample_point, ch4_pct, is_manual_override) VALUES (?, ?, ?, ?, ?)",
+        [(str(uuid.uuid4()), f"2025-01-0{d}T12:00:00+00:00", "Inlet", 50.0 + d, d == 1) for d in range(1, 6)],
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_storage_roundtrip():
+    ts = datetime(2025, 6, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    assert from_epoch_us(to_epoch_us(ts)) == ts
+    assert to_epoch_us(ts.replace(tzinfo=None)) == to_epoch_us(ts)  # naive means UTC
+
+
+def test_legacy_database_is_refused_then_migrated(legacy_db):
+    conn = sqlite3.connect(legacy_db)
+    with pytest.raises(LegacyStorageError):
+        init_db(conn)
+    conn.close()
+
+    seen = []
+    assert migrate_storage(legacy_db, batch_size=2, vacuum=False, progress=lambda done, total: seen.append(done)) == 5
+    assert seen == [2, 4, 5]
+    assert migrate_storage(legacy_db) == 0  # idempotent
+
+    pool = ConnectionPool(legacy_db).open()
+    try:
+        with pool.reader() as conn:
+            ddl = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'ts_analyzer_reading'").fetchone()[0]
+            assert "WITHOUT ROWID" in ddl
+            row = conn.execute("SELECT id, timestamp, is_manual_override FROM ts_analyzer_reading ORDER BY timestamp").fetchone()
+            assert len(row["id"]) == 16
+            assert from_epoch_us(row["timestamp"]) == datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+            assert row["is_manual_override"] == 1
+            assert conn.execute("SELECT COUNT(*) FROM rollup_analyzer_daily").fetchone()[0] == 5
+    finally:
+        pool.close()
+
+
+def test_interrupted_migration_resumes(legacy_db, monkeypatch):
+    import src.gastrack.db.migrate as migrate
+
+    calls = {"n": 0}
+    real = migrate._legacy_row
+
+    def flaky(row):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise KeyboardInterrupt
+        return real(row)
+
+    monkeypatch.setattr(migrate, "_legacy_row", flaky)
+    with pytest.raises(KeyboardInterrupt):
+        migrate_storage(legacy_db, batch_size=2, vacuum=False)
+
+    monkeypatch.setattr(migrate, "_legacy_row", real)
+    assert migrate_storage(legacy_db, batch_size=2, vacuum=False) == 3  # first batch was already committed
+
+    conn = sqlite3.connect(legacy_db)
+    assert conn.execute("SELECT COUNT(*) FROM ts_analyzer_reading").fetchone()[0] == 5
+    conn.close()
+
+
+def test_resumed_migration_logs_one_change_per_reading(legacy_db):
+    def interrupt(done, total):
+        raise KeyboardInterrupt  # after the first batch has committed
+
+    with pytest.raises(KeyboardInterrupt):
+        migrate_storage(legacy_db, batch_size=2, vacuum=False, progress=interrupt)
+    assert migrate_storage(legacy_db, batch_size=2, vacuum=False) == 3
+
+    conn = sqlite3.connect(legacy_db)
+    try:
+        changes = conn.execute("SELECT COUNT(*), COUNT(DISTINCT reading_id) FROM reading_change").fetchone()
+        assert changes == (5, 5)
+    finally:
+        conn.close()
@@ -0,0 +1,138 @@
+# --- tests/test_derived.py ---
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from msgspec import msgpack
+
+from conftest import wipe_db
+from src.gastrack.core import calcgraph
+from src.gastrack.core.models import AnalyzerReading, DailyFlowInput, Factor
+from src.gastrack.db import crud, derived
+from src.gastrack.db.connection import DB_PATH
+
+T0 = datetime(2025, 11, 1, tzinfo=timezone.utc)
+NOVEMBER = {"2025-11": ("2025-11-01", "2025-12-01")}
+
+
+@pytest.fixture(autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    flows = [DailyFlowInput(date=f"2025-11-{d:02d}", biogas_flared_scf_day=1_000_000.0) for d in range(1, 11)]
+    assert client.post("/api/flows/ingest", content=msgpack.encode(flows)).status_code == 201
+    readings = [
+        AnalyzerReading(timestamp=T0 + timedelta(hours=h), sample_point="Outlet", ch4_pct=60.0, h2s_ppm=160.0)
+        for h in range(24 * 10)
+    ]
+    assert client.post("/api/readings/ingest", content=msgpack.encode(readings)).status_code == 201
+    yield
+    wipe_db()
+
+
+@pytest.fixture
+def resampled(monkeypatch):
+    """The days the derived rows resample readings for."""
+    calls = []
+    get_resampled_days = crud.get_resampled_days
+
+    def spy(sample_point, start_day, end_day, cached=True):
+        calls.append((start_day, end_day))
+        return get_resampled_days(sample_point, start_day, end_day, cached)
+
+    monkeypatch.setattr(crud, "get_resampled_days", spy)
+    return calls
+
+
+def _dirty():
+    with sqlite3.connect(DB_PATH) as conn:
+        return dict(conn.execute("SELECT date, dirty FROM derived_daily WHERE dirty != 0 ORDER BY date").fetchall())
+
+
+def test_graph_marks_only_dependents():
+    assert calcgraph.dependents(["mmbtu"]) == ["nox_lbs", "co_lbs", "voc_lbs"]
+    assert calcgraph.dependents(["h2s_ppm"]) == ["so2_lbs"]
+    assert calcgraph.factor_mask(["EMF_NOX_LBS_MMBTU"]) == calcgraph.DIRTY_BITS["nox_lbs"]
+    assert calcgraph.factor_mask(["HHV_PER_CH4_PCT"]) == calcgraph.dirty_mask(["btu", "mmbtu", "nox_lbs", "co_lbs", "voc_lbs"])
+    assert not calcgraph.flow_mask() & calcgraph.DIRTY_BITS[calcgraph.READINGS]
+
+
+def test_results_are_persisted_and_reused(resampled):
+    first = derived.get_daily("Outlet", "2025-11-01", "2025-11-11")
+    assert first["mmbtu"] == [pytest.approx(624.0)] * 10
+    assert resampled == [("2025-11-01", "2025-11-11")] and _dirty() == {}
+
+    assert derived.get_daily("Outlet", "2025-11-01", "2025-11-11") == first
+    assert len(resampled) == 1  # nothing was stale
+
+
+def test_reingested_flow_recomputes_only_its_day(client, resampled):
+    derived.get_daily("Outlet", "2025-11-01", "2025-11-11")
+    flow = DailyFlowInput(date="2025-11-04", biogas_flared_scf_day=2_000_000.0)
+    assert client.post("/api/flows/ingest", content=msgpack.encode([flow])).status_code == 201
+    assert _dirty() == {"2025-11-04": calcgraph.flow_mask()}
+
+    days = derived.get_daily("Outlet", "2025-11-01", "2025-11-11")
+    assert days["mmbtu"][3] == pytest.approx(1248.0) and days["mmbtu"][2] == pytest.approx(624.0)
+    assert len(resampled) == 1  # the gas composition was not stale, so no readings were read again
+    assert _dirty() == {}
+
+
+def test_new_readings_mark_their_days(client, resampled):
+    derived.get_daily("Outlet", "2025-11-01", "2025-11-11")
+    spike = AnalyzerReading(timestamp=T0 + timedelta(days=5, hours=23, minutes=30), sample_point="Outlet", ch4_pct=90.0)
+    assert client.post("/api/readings/ingest", content=msgpack.encode([spike])).status_code == 201
+    assert set(_dirty()) == {"2025-11-06", "2025-11-07"}  # the value may carry past midnight
+
+    days = derived.get_daily("Outlet", "2025-11-01", "2025-11-11")
+    assert resampled[1:] == [("2025-11-06", "2025-11-08")]
+    assert days["ch4_pct"][5] == pytest.approx(60.0 + 30.0 * 30 / (24 * 60))
+    assert days["reading_count"][5] == 25 and days["ch4_pct"][6] == 60.0
+
+
+def test_factor_change_recomputes_dependent_nodes(client):
+    derived.get_daily("Outlet", "2025-11-01", "2025-11-11")
+    unchanged = Factor(key="HHV_PER_CH4_PCT", value=10.4)
+    assert client.post("/api/factors", content=msgpack.encode([unchanged])).status_code == 201
+    assert _dirty() == {}
+
+    nox = Factor(key="EMF_NOX_LBS_MMBTU", value=0.1)
+    assert client.post("/api/factors", content=msgpack.encode([nox])).status_code == 201
+    assert set(_dirty().values()) == {calcgraph.DIRTY_BITS["nox_lbs"]}
+    report = client.get("/api/reports/emissions", params={"month": "2025-11"}).json()
+    assert report["totals"]["nox_lbs"] == pytest.approx(10 * 624.0 * 0.1)
+    assert _dirty() == {}
+
+
+def test_rows_computed_from_changed_inputs_are_not_saved(client):
+    days, pending = derived.load_daily("Outlet", "2025-11-01", "2025-11-11")
+    flow = DailyFlowInput(date="2025-11-02", biogas_flared_scf_day=5.0)
+    assert client.post("/api/flows/ingest", content=msgpack.encode([flow])).status_code == 201
+    assert not derived.save(pending)
+    assert derived.get_daily("Outlet", "2025-11-01", "2025-11-11")["biogas_flared_scf"][1] == 5.0
+
+
+def test_monthly_totals(client):
+    totals = derived.get_monthly_totals("Outlet", NOVEMBER)["2025-11"]
+    assert totals["days"] == 10 and totals["mmbtu"] == pytest.approx(6240.0)
+
+    flow = DailyFlowInput(date="2025-11-20", biogas_flared_scf_day=1_000_000.0)
+    assert client.post("/api/flows/ingest", content=msgpack.encode([flow])).status_code == 201
+    totals = derived.get_monthly_totals("Outlet", NOVEMBER)["2025-11"]
+    assert totals["days"] == 11 and totals["mmbtu"] == pytest.approx(6240.0)  # no readings on the 20th
+    assert totals["biogas_flared_scf"] == pytest.approx(11_000_000.0)
+
+
+def test_report_endpoint_saves_on_the_writer_thread(client, monkeypatch):
+    threads = []
+    save = derived.save
+
+    def spy(pending):
+        threads.append(threading.current_thread().name)
+        return save(pending)
+
+    monkeypatch.setattr(derived, "save", spy)
+    assert client.get("/api/reports/emissions", params={"month": "2025-11"}).status_code == 200
+    assert len(threads) == 1 and threads[0].startswith("gastrack-db-writer")
+    assert _dirty() == {} and client.get("/api/reports/emissions", params={"month": "2025-11"}).status_code == 200
+    assert len(threads) == 1  # nothing left to save
@@ -0,0 +1,94 @@
+# --- tests/test_downsample.py ---
+from array import array
+from datetime import datetime, timedelta, timezone
+
+import msgspec
+import pytest
+
+from conftest import wipe_db
+from src.gastrack.core.cache import SeriesCache, series_cache
+from src.gastrack.core.downsample import lttb, merge_extremes
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    series_cache.clear()
+    readings = [
+        {"timestamp": (T0 + timedelta(minutes=i)).isoformat(), "sample_point": "Inlet",
+         "ch4_pct": 99.0 if i == 1234 else 60.0 + (i % 10) / 10, "h2s_ppm": None if i % 2 else 500.0}
+        for i in range(2000)
+    ]
+    assert client.post("/api/readings/ingest", json=readings).status_code == 201
+    yield
+    wipe_db()
+
+
+def test_lttb_keeps_ends_and_spikes():
+    ts = array("q", range(1000))
+    vs = array("d", [50.0] * 1000)
+    vs[500] = 90.0
+    out_t, out_v = lttb(ts, vs, 20)
+    assert len(out_t) == 20
+    assert (out_t[0], out_t[-1]) == (0, 999)
+    assert 90.0 in out_v
+
+
+def test_merge_extremes_orders_by_time():
+    ts, vs = merge_extremes([(0, 5, 1.0, 2, 9.0), (1, 12, 4.0, 12, 4.0)])
+    assert list(ts) == [2, 5, 12]
+    assert list(vs) == [9.0, 1.0, 4.0]
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_series_is_bounded_and_keeps_the_spike(client, method):
+    response = client.get(f"/api/readings/series?sample_point=Inlet&channel=ch4_pct&points=100&method={method}")
+    assert response.status_code == 200
+    series = response.json()
+    assert series["raw_count"] == 2000
+    assert 3 <= len(series["values"]) <= 100
+    assert len(series["timestamps_ms"]) == len(series["values"])
+    assert 99.0 in series["values"]
+    assert series["timestamps_ms"] == sorted(series["timestamps_ms"])
+
+
+def test_small_ranges_and_null_values_are_returned_raw(client):
+    start, end = T0.isoformat(), (T0 + timedelta(minutes=10)).isoformat()
+    response = client.get(
+        "/api/readings/series", params={"sample_point": "Inlet", "channel": "h2s_ppm", "start": start, "end": end},
+        headers={"Accept": "application/msgpack"},
+    )
+    series = msgspec.msgpack.decode(response.content)
+    assert series["raw_count"] == 5  # odd minutes have no H2S value
+    assert series["timestamps_ms"][0] == int(T0.timestamp() * 1000)
+
+
+def test_series_rejects_unknown_channel(client):
+    assert client.get("/api/readings/series?sample_point=Inlet&channel=secret").status_code == 400
+    assert client.get("/api/readings/series?sample_point=Inlet&channel=ch4_pct&method=avg").status_code == 400
+
+
+def test_series_cache_is_invalidated_only_by_overlapping_ingests():
+    cache = SeriesCache()
+    cache.store("day1", "Inlet", 0, 100, cache.generation, {"v": 1})
+    cache.store("open", "Inlet", None, None, cache.generation, {"v": 2})
+
+    cache.note_ingest({"Inlet": (200, 300)})   # after day1
+    cache.note_ingest({"Outlet": (50, 60)})    # other point
+    assert cache.get("day1") == b'{"v":1}'
+    assert cache.get("open") is None
+
+    cache.note_ingest({"Inlet": (100, 100)})   # end is exclusive
+    assert cache.get("day1") is not None
+    cache.note_ingest({"Inlet": (99, 150)})
+    assert cache.get("day1") is None
+
+
+def test_store_discards_results_raced_by_an_ingest():
+    cache = SeriesCache()
+    generation = cache.generation
+    cache.note_ingest({"Inlet": (10, 10)})
+    cache.store("k", "Inlet", 0, 100, generation, {"v": 1})
+    assert cache.get("k") is None
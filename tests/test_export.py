@@ -0,0 +1,89 @@
+# --- tests/test_export.py ---
+import csv
+import gzip
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from msgspec import msgpack
+from typer.testing import CliRunner
+
+from conftest import wipe_db
+from src.cli import app as cli_app
+from src.gastrack.api import handlers
+from src.gastrack.api.export import READING_EXPORT_COLUMNS, decode_columnar
+from src.gastrack.core.models import AnalyzerReading, DailyFlowInput
+
+BASE = datetime(2025, 3, 1, tzinfo=timezone.utc)
+READINGS = [
+    AnalyzerReading(timestamp=BASE + timedelta(hours=i), sample_point=point, ch4_pct=50.0 + i, h2s_ppm=None)
+    for point in ("Inlet", "Outlet") for i in range(12)
+]
+READINGS[3].is_manual_override = True
+READINGS[3].override_note = 'analyzer drift, "corrected"'
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    assert client.post("/api/readings/ingest", content=msgpack.encode(READINGS)).status_code == 201
+    flows = [DailyFlowInput(date=f"2025-03-{d:02d}", biogas_flared_scf_day=1000.0 * d) for d in range(1, 6)]
+    assert client.post("/api/flows/ingest", content=msgpack.encode(flows)).status_code == 201
+    yield
+    wipe_db()
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(handlers, "EXPORT_BATCH_ROWS", 5)  # several batches per sample point
+
+
+def test_readings_csv_streams_every_row(client, small_batches):
+    response = client.get("/api/export/readings", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert tuple(rows[0]) == READING_EXPORT_COLUMNS
+    assert [(r["sample_point"], r["id"]) for r in rows] == [(r.sample_point, str(r.id)) for r in READINGS]
+    assert rows[0]["timestamp"] == "2025-03-01T00:00:00Z" and rows[0]["h2s_ppm"] == ""
+    assert rows[3]["override_note"] == READINGS[3].override_note and rows[3]["is_manual_override"] == "1"
+
+
+def test_readings_filters_and_gzip(client, small_batches):
+    response = client.get(
+        "/api/export/readings",
+        params={"sample_point": "Outlet", "start": "2025-03-01T02:00:00Z", "end": "2025-03-01T09:00:00Z"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    rows = list(csv.DictReader(io.StringIO(response.text)))  # httpx already gunzipped it
+    assert [float(r["ch4_pct"]) for r in rows] == [52.0 + i for i in range(7)]
+    assert {r["sample_point"] for r in rows} == {"Outlet"}
+
+
+def test_readings_columnar_msgpack(client, small_batches):
+    response = client.get("/api/export/readings", params={"format": "msgpack", "point": "Inlet"})
+    batches = decode_columnar(response.content)
+    assert [len(b["id"]) for b in batches] == [5, 5, 2]
+    ch4 = [v for b in batches for v in b["ch4_pct"]]
+    assert ch4 == [50.0 + i for i in range(12)]
+    assert batches[0]["timestamp_us"][1] - batches[0]["timestamp_us"][0] == 3600 * 10 ** 6
+    assert batches[0]["id"][0] == READINGS[0].id.bytes
+
+
+def test_flows_export_and_bad_format(client):
+    response = client.get("/api/export/flows", params={"start": "2025-03-02", "end": "2025-03-05"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(r["date"], r["biogas_flared_scf_day"]) for r in rows] == [
+        ("2025-03-02", "2000.0"), ("2025-03-03", "3000.0"), ("2025-03-04", "4000.0"),
+    ]
+    assert client.get("/api/export/readings", params={"format": "parquet"}).status_code == 400
+
+
+def test_cli_export_writes_gzip_file(tmp_path):
+    target = tmp_path / "inlet.csv.gz"
+    result = CliRunner().invoke(cli_app, ["export", "readings", "-s", "Inlet", "-o", str(target)])
+    assert result.exit_code == 0, result.output
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(target.read_bytes()).decode())))
+    assert len(rows) == 12 and not (tmp_path / "inlet.csv.gz.part").exists()
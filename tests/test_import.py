@@ -0,0 +1,167 @@
+# --- tests/test_import.py ---
+import os
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+from conftest import wipe_db
+from src.gastrack.core.spreadsheet import iter_rows, sheet_names
+from src.gastrack.db import importer
+from src.gastrack.db.connection import DB_PATH
+
+JAN_1_2025 = 45658  # Excel serial day
+
+
+@pytest.fixture(autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def _column(i: int) -> str:
+    letters = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        letters = chr(65 + r) + letters
+    return letters
+
+
+def write_xlsx(path, sheets):
+    """A minimal workbook: strings in the shared-string table, numbers as numbers, None as no cell."""
+    strings = []
+    with zipfile.ZipFile(path, "w") as zf:
+        rels = "".join(
+            f'<Relationship Id="rId{i}" Type="worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(sheets) + 1)
+        )
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>',
+        )
+        names = "".join(f'<sheet name="{escape(n)}" sheetId="{i}" r:id="rId{i}"/>' for i, n in enumerate(sheets, 1))
+        zf.writestr(
+            "xl/workbook.xml",
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>{names}</sheets></workbook>',
+        )
+        for i, rows in enumerate(sheets.values(), 1):
+            xml_rows = []
+            for r, row in enumerate(rows, 1):
+                cells = []
+                for c, value in enumerate(row):
+                    if value is None:
+                        continue
+                    if isinstance(value, str):
+                        strings.append(value)
+                        cells.append(f'<c r="{_column(c)}{r}" t="s"><v>{len(strings) - 1}</v></c>')
+                    else:
+                        cells.append(f'<c r="{_column(c)}{r}"><v>{value}</v></c>')
+                xml_rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+            zf.writestr(
+                f"xl/worksheets/sheet{i}.xml",
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<sheetData>{"".join(xml_rows)}</sheetData></worksheet>',
+            )
+        sst = "".join(f"<si><t>{escape(s)}</t></si>" for s in strings)
+        zf.writestr(
+            "xl/sharedStrings.xml", f'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">{sst}</sst>'
+        )
+
+
+def _workbook(path, days=3):
+    inlet = [["Date", "Time", "O2 %", "CH4 %", "H2S (ppm)"]] + [
+        [JAN_1_2025 + d, h / 24, 0.5, 55.0, None] for d in range(days) for h in range(24)
+    ]
+    write_xlsx(path, {
+        "Inlet": inlet,
+        "BGFlow": [["Date", "Biogas Flared"]] + [[JAN_1_2025 + d, 1000.0 * (d + 1)] for d in range(days)],
+        "EmFactors": [["key", "value"], ["HHV", 10.4]],
+    })
+
+
+def _count(sample_point=None):
+    import sqlite3
+    with sqlite3.connect(DB_PATH) as conn:
+        if sample_point is None:
+            return conn.execute("SELECT COUNT(*) FROM ts_analyzer_reading").fetchone()[0]
+        return conn.execute(
+            "SELECT COUNT(*) FROM ts_analyzer_reading WHERE sample_point = ?", (sample_point,)
+        ).fetchone()[0]
+
+
+def test_spreadsheet_reader_streams_xlsx_rows(tmp_path):
+    path = tmp_path / "bg.xlsx"
+    write_xlsx(path, {"Inlet": [["a", None, "c"], [], [1.5, "x", None]]})
+    assert sheet_names(path) == ["Inlet"]
+    assert list(iter_rows(path, "Inlet")) == [(1, ["a", None, "c"]), (3, [1.5, "x"])]
+
+
+def test_import_workbook_and_csv(client, tmp_path):
+    _workbook(tmp_path / "biogasCalcsV2.xlsx")
+    (tmp_path / "Sheet 1.csv").write_text(
+        "Timestamp,O2 %,CH4 %,Note\n"
+        "1/2/2025 13:45,0.4,56,\n"
+        '2025-01-02T14:00:00Z,n/a,"1,057",rechecked\n'
+        "not a date,1,1,\n"
+    )
+    summary = importer.import_files([tmp_path], DB_PATH, workers=1)
+
+    by_sheet = {t.sheet: t for t in summary.tables}
+    assert (by_sheet["Inlet"].kind, by_sheet["Inlet"].imported) == ("readings", 72)
+    assert (by_sheet["BGFlow"].kind, by_sheet["BGFlow"].imported) == ("flows", 3)
+    assert by_sheet["EmFactors"].status == "skipped"
+    assert (by_sheet["Sheet 1"].imported, by_sheet["Sheet 1"].rejected) == (2, 1)
+    assert by_sheet["Sheet 1"].errors == ["row 4: timestamp: not a date/time: 'not a date'"]
+
+    page = client.get("/api/readings", params={"sample_point": "Inlet", "limit": 2}).json()["items"]
+    assert [r["timestamp"] for r in page] == ["2025-01-01T00:00:00Z", "2025-01-01T01:00:00Z"]
+    assert page[0]["h2s_ppm"] is None and page[0]["ch4_pct"] == 55.0
+    sheet1 = client.get("/api/readings", params={"sample_point": "Sheet 1"}).json()["items"]
+    assert [(r["timestamp"], r["o2_pct"], r["ch4_pct"]) for r in sheet1] == [
+        ("2025-01-02T13:45:00Z", 0.4, 56.0), ("2025-01-02T14:00:00Z", None, 1057.0),
+    ]
+    assert sheet1[1]["override_note"] == "rechecked"
+    flows = client.get("/api/export/flows").text.splitlines()
+    assert flows[1].startswith("2025-01-01,") and flows[1].endswith(",1000.0")
+
+
+def test_interrupted_import_resumes_without_duplicates(tmp_path, monkeypatch):
+    _workbook(tmp_path / "bg.xlsx", days=10)
+    insert = importer._insert_readings
+    calls = []
+
+    def failing_insert(conn, readings):
+        calls.append(len(readings))
+        if len(calls) == 5:
+            raise KeyboardInterrupt  # e.g. Ctrl-C in the middle of a transaction
+        return insert(conn, readings)
+
+    monkeypatch.setattr(importer, "_insert_readings", failing_insert)
+    with pytest.raises(KeyboardInterrupt):
+        importer.import_files([tmp_path / "bg.xlsx"], DB_PATH, workers=1, batch_rows=20, txn_rows=40)
+    assert _count() == 80  # two committed transactions of 2 x 20 rows; the third rolled back
+
+    monkeypatch.setattr(importer, "_insert_readings", insert)
+    resumed = importer.import_files([tmp_path / "bg.xlsx"], DB_PATH, workers=1, batch_rows=20, txn_rows=40)
+    inlet = next(t for t in resumed.tables if t.sheet == "Inlet")
+    assert inlet.note == "resumed after 80 rows" and inlet.imported == 160
+    assert _count("Inlet") == 240
+
+    again = importer.import_files([tmp_path / "bg.xlsx"], DB_PATH, workers=1)
+    assert {t.status for t in again.tables} == {"already imported", "skipped"} and again.imported == 0
+
+    os.utime(tmp_path / "bg.xlsx", ns=(0, 0))
+    changed = importer.import_files([tmp_path / "bg.xlsx"], DB_PATH, workers=1)
+    assert {t.status for t in changed.tables} == {"changed"}
+
+
+def test_parser_pool(tmp_path):
+    for point in ("Inlet", "Outlet", "Sheet 2"):
+        lines = ["timestamp,ch4_pct"] + [f"2025-02-01T{h:02d}:00:00,{50 + h}" for h in range(24)]
+        (tmp_path / f"{point}.csv").write_text("\n".join(lines) + "\n")
+    summary = importer.import_files([tmp_path], DB_PATH, workers=2, batch_rows=10)
+    assert summary.imported == 72 and {t.status for t in summary.tables} == {"imported"}
+    assert [_count(p) for p in ("Inlet", "Outlet", "Sheet 2")] == [24, 24, 24]
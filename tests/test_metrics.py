@@ -0,0 +1,64 @@
+# --- tests/test_metrics.py ---
+import logging
+
+import pytest
+
+from conftest import wipe_db
+from src.gastrack.core.metrics import Histogram, SqlMetrics, request_metrics, sql_metrics
+from src.gastrack.db import crud
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def test_metrics_endpoint_reports_routes_and_sql(client):
+    request_metrics.clear()
+    sql_metrics.clear()
+    client.get("/api/factors")
+    client.get("/api/readings?sample_point=Nowhere")
+    crud.get_all_factors()
+
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'gastrack_http_requests_total{method="GET",route="/api/factors",status="200"} 1' in body
+    assert 'gastrack_http_requests_total{method="GET",route="/api/readings",status="400"} 1' in body
+    assert 'gastrack_http_request_duration_seconds_count{method="GET",route="/api/factors"} 1' in body
+    assert 'gastrack_sql_statements_total{statement="SELECT key, value, description FROM factors' in body
+
+
+def test_unmatched_paths_share_one_label(client):
+    request_metrics.clear()
+    client.get("/api/no-such-thing/123")
+    client.get("/api/no-such-thing/456")
+    client.get("/no-such-page")
+    body = client.get("/api/metrics").text
+    assert 'route="/api/*",status="404"} 2' in body
+    assert 'route="<unmatched>",status="404"} 1' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram()
+    for seconds in (0.0001, 0.003, 0.003, 60.0):
+        hist.observe(seconds)
+    buckets = dict(hist.cumulative())
+    assert buckets["0.0005"] == 1
+    assert buckets["0.005"] == 3
+    assert buckets["10.0"] == 3
+    assert buckets["+Inf"] == hist.count == 4
+
+
+def test_slow_statements_are_logged_and_counted(caplog):
+    metrics = SqlMetrics(slow_query_ms=50)
+    with caplog.at_level(logging.WARNING, logger="src.gastrack.core.metrics"):
+        metrics.observe("SELECT  *\n FROM ts_analyzer_reading", 0.2)
+        metrics.observe("SELECT 1", 0.001)
+
+    assert metrics.slow_count == 1
+    assert "Slow SQL (200.0 ms): SELECT * FROM ts_analyzer_reading" in caplog.text
+    assert metrics.snapshot()["SELECT * FROM ts_analyzer_reading"] == (1, 0.2, 0.2)
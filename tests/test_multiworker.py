@@ -0,0 +1,117 @@
+# --- tests/test_multiworker.py ---
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from conftest import wipe_db
+from src.gastrack.core.cache import factor_cache, latest_readings
+from src.gastrack.core.models import AnalyzerReading
+from src.gastrack.db import crud
+from src.gastrack.db.coherence import CacheCoherence
+from src.gastrack.db.connection import DB_PATH, _connect, init_db
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# One "worker process": its own pool, many small write transactions on the same rollup rows.
+WORKER_SCRIPT = """
+import sys
+from datetime import datetime, timedelta, timezone
+from src.gastrack.core.models import AnalyzerReading
+from src.gastrack.db import connection, crud
+
+worker = int(sys.argv[1])
+connection.open_pool()
+start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+for batch in range(20):
+    crud.ingest_analyzer_readings([
+        AnalyzerReading(timestamp=start + timedelta(seconds=worker * 10000 + batch * 50 + i), sample_point="Inlet", ch4_pct=60.0)
+        for i in range(50)
+    ])
+connection.close_pool()
+"""
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def _init_worker_db(tmp_path) -> Path:
+    db_path = tmp_path / "workers.db"
+    conn = _connect(db_path)
+    init_db(conn)
+    conn.close()
+    return db_path
+
+
+def _start_worker(db_path: Path, worker: int, busy_timeout_ms: int = 5000) -> subprocess.Popen:
+    env = {"GASTRACK_DB_PATH": str(db_path), "GASTRACK_DB_BUSY_TIMEOUT_MS": str(busy_timeout_ms), "PATH": ""}
+    return subprocess.Popen(
+        [sys.executable, "-c", WORKER_SCRIPT, str(worker)], cwd=REPO_ROOT, env=env, stderr=subprocess.PIPE,
+    )
+
+
+def test_concurrent_writer_processes_lose_nothing(tmp_path):
+    db_path = _init_worker_db(tmp_path)
+    procs = [_start_worker(db_path, w) for w in range(4)]
+    for proc in procs:
+        _, err = proc.communicate(timeout=60)
+        assert proc.returncode == 0, err.decode()
+
+    conn = _connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM ts_analyzer_reading").fetchone()[0] == 4 * 20 * 50
+        assert tuple(conn.execute("SELECT SUM(reading_count), SUM(ch4_pct_count) FROM rollup_analyzer_daily").fetchone()) == (4000, 4000)
+    finally:
+        conn.close()
+
+
+def test_writers_only_wait_for_the_lock_with_busy_timeout(tmp_path):
+    db_path = _init_worker_db(tmp_path)
+    holder = _connect(db_path)  # "another worker" in the middle of a write transaction
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        _, err = _start_worker(db_path, 0, busy_timeout_ms=0).communicate(timeout=60)
+        assert b"DBBusyError" in err  # no waiting: the write fails at once
+
+        patient = _start_worker(db_path, 1)
+        time.sleep(0.5)
+    finally:
+        holder.rollback()
+        holder.close()
+    _, err = patient.communicate(timeout=60)
+    assert patient.returncode == 0, err.decode()
+
+    conn = _connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM ts_analyzer_reading").fetchone()[0] == 20 * 50
+    finally:
+        conn.close()
+
+
+def test_coherence_picks_up_another_workers_writes():
+    coherence = CacheCoherence()
+    coherence.apply(*coherence._load_if_changed())
+    assert coherence._load_if_changed() is None  # nothing committed since
+
+    # "Another worker": a separate connection, bypassing this process's caches.
+    reading = AnalyzerReading(timestamp=datetime(2025, 6, 1, tzinfo=timezone.utc), sample_point="Outlet", h2s_ppm=12.0)
+    crud.get_factor_snapshot()
+    other = _connect(DB_PATH)
+    with other:
+        crud._insert_readings(other, [reading])
+        other.execute("UPDATE factors SET value = value + 1 WHERE key = (SELECT MIN(key) FROM factors)")
+    other.close()
+    assert latest_readings.get("Outlet") is None
+
+    loaded = coherence._load_if_changed()
+    assert loaded is not None
+    coherence.apply(*loaded)
+    assert latest_readings.get("Outlet").id == reading.id
+    assert factor_cache.snapshot() is None  # invalidated, reloads on next use
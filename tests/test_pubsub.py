@@ -0,0 +1,64 @@
+# --- tests/test_pubsub.py ---
+import threading
+from datetime import datetime, timezone
+
+import msgspec
+
+from src.gastrack.core.models import AnalyzerReading
+from src.gastrack.core.pubsub import ReadingBroker
+from src.gastrack.api.streaming import sse_event
+
+
+def _reading(point, o2=None):
+    return AnalyzerReading(timestamp=datetime.now(timezone.utc), sample_point=point, o2_pct=o2)
+
+
+async def test_fan_out_filters_by_sample_point():
+    broker = ReadingBroker()
+    inlet = broker.subscribe(["Inlet"])
+    everything = broker.subscribe()
+
+    broker.publish([_reading("Inlet", 1.0), _reading("Outlet", 2.0)])
+
+    got = await inlet.get(timeout=1)
+    assert got.reading.sample_point == "Inlet"
+    assert inlet.queue.empty()
+    assert [(await everything.get(timeout=1)).reading.o2_pct for _ in range(2)] == [1.0, 2.0]
+    assert msgspec.json.decode(got.json_body)["o2_pct"] == 1.0
+
+
+async def test_slow_subscriber_drops_oldest_and_does_not_block():
+    broker = ReadingBroker(queue_size=2)
+    slow = broker.subscribe()
+
+    broker.publish([_reading("Inlet", float(i)) for i in range(5)])
+
+    assert slow.dropped == 3
+    assert [(await slow.get(timeout=1)).reading.o2_pct for _ in range(2)] == [3.0, 4.0]
+
+
+async def test_publish_from_writer_thread_reaches_loop():
+    broker = ReadingBroker()
+    sub = broker.subscribe()
+
+    thread = threading.Thread(target=broker.publish, args=([_reading("Sheet 1")],))
+    thread.start()
+    thread.join()
+
+    assert (await sub.get(timeout=1)).reading.sample_point == "Sheet 1"
+
+
+async def test_close_ends_subscriptions_and_unsubscribe():
+    broker = ReadingBroker()
+    async with broker.subscribe() as sub:
+        assert broker.subscriber_count == 1
+    assert broker.subscriber_count == 0
+
+    other = broker.subscribe()
+    broker.close()
+    assert await other.get(timeout=1) is None
+    broker.publish([_reading("Inlet")])  # no loop bound, nobody listening: no-op
+
+
+def test_sse_event_framing():
+    assert sse_event(b'{"a":1}', event="reading", event_id="42") == b'event: reading\nid: 42\ndata: {"a":1}\n\n'
@@ -0,0 +1,65 @@
+# --- tests/test_report_batch.py ---
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from msgspec import msgpack
+
+from conftest import wipe_db
+from src.gastrack.core import report_batch
+from src.gastrack.core.models import AnalyzerReading, DailyFlowInput
+from src.gastrack.db.connection import DB_PATH
+
+MONTHS = ["2025-10", "2025-11"]
+LOW_NOX = report_batch.Scenario(name="low-nox", overrides={"EMF_NOX_LBS_MMBTU": 0.1})
+
+
+@pytest.fixture(autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    flows = [DailyFlowInput(date=f"2025-{m}-{d:02d}", biogas_flared_scf_day=1_000_000.0) for m in (10, 11) for d in (1, 2)]
+    assert client.post("/api/flows/ingest", content=msgpack.encode(flows)).status_code == 201
+    t0 = datetime(2025, 9, 30, tzinfo=timezone.utc)
+    readings = [
+        AnalyzerReading(timestamp=t0 + timedelta(hours=h), sample_point="Outlet", ch4_pct=60.0, h2s_ppm=160.0)
+        for h in range(24 * 65)
+    ]
+    assert client.post("/api/readings/ingest", content=msgpack.encode(readings)).status_code == 201
+    yield
+    wipe_db()
+
+
+def test_parse_scenario():
+    assert report_batch.parse_scenario("low-nox: EMF_NOX_LBS_MMBTU=0.1") == LOW_NOX
+    for bad in ("low-nox", "baseline:EMF_NOX_LBS_MMBTU=1", "x:EMF_NOX_LBS_MMBTU", "x:EMF_NOX_LBS_MMBTU=high"):
+        with pytest.raises(ValueError):
+            report_batch.parse_scenario(bad)
+    assert report_batch.year_months(2025)[::11] == ["2025-01", "2025-12"]
+
+
+def test_batch_totals_per_scenario_and_month():
+    done = []
+    result = report_batch.run_batch(MONTHS, [LOW_NOX], workers=1, progress=lambda d, t: done.append((d, t)))
+    assert done[-1] == (4, 4)
+    assert [(p.scenario, p.month, p.days) for p in result.periods] == [
+        ("baseline", "2025-10", 2), ("baseline", "2025-11", 2), ("low-nox", "2025-10", 2), ("low-nox", "2025-11", 2),
+    ]
+    baseline, low = result.totals["baseline"], result.totals["low-nox"]
+    assert baseline["days"] == 4 and baseline["mmbtu"] == low["mmbtu"] == pytest.approx(4 * 624.0)
+    assert low["nox_lbs"] == pytest.approx(4 * 624.0 * 0.1) and low["nox_lbs"] != baseline["nox_lbs"]
+
+    with sqlite3.connect(DB_PATH) as conn:  # only the stored factors' results are persisted
+        assert conn.execute("SELECT COUNT(*), SUM(dirty) FROM derived_monthly").fetchone() == (2, 0)
+        nox = conn.execute("SELECT SUM(nox_lbs) FROM derived_monthly").fetchone()[0]
+    assert nox == pytest.approx(baseline["nox_lbs"])
+
+
+def test_unknown_factor_is_rejected():
+    with pytest.raises(ValueError, match="NOPE"):
+        report_batch.run_batch(MONTHS, [report_batch.Scenario(name="x", overrides={"NOPE": 1.0})], workers=1)
+
+
+def test_process_pool_matches_inline():
+    pooled = report_batch.run_batch(MONTHS, [LOW_NOX], workers=2)
+    inline = report_batch.run_batch(MONTHS, [LOW_NOX], workers=1)
+    assert pooled.periods == inline.periods and pooled.totals == inline.totals
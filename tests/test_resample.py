@@ -0,0 +1,81 @@
+# --- tests/test_resample.py ---
+from array import array
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from msgspec import msgpack
+
+from conftest import wipe_db
+from src.gastrack.core.cache import resample_cache
+from src.gastrack.core.models import AnalyzerReading, DailyFlowInput
+from src.gastrack.core.resample import resample_channel, resample_daily
+from src.gastrack.db import crud
+from src.gastrack.db.storage import US_PER_DAY, day_start_us
+
+HOUR = 3600 * 10 ** 6
+ORIGIN = day_start_us("2025-10-01")
+T0 = datetime(2025, 10, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def test_values_are_weighted_by_how_long_they_stood():
+    timestamps = array("q", [ORIGIN, ORIGIN + 18 * HOUR])
+    first, second = resample_channel(timestamps, array("d", [10.0, 40.0]), ORIGIN, 2, max_gap_us=12 * HOUR)
+
+    assert first.mean == pytest.approx((10.0 * 12 + 40.0 * 6) / 18)  # 12:00-18:00 is a gap
+    assert (first.coverage, first.gap, first.last, first.count) == (0.75, True, 40.0, 2)
+    # No reading on the second day: the 18:00 value is carried to 06:00, then goes stale.
+    assert (second.mean, second.coverage, second.last, second.count) == (40.0, 0.25, None, 0)
+
+
+def test_value_carried_in_from_before_the_first_day():
+    timestamps = array("q", [ORIGIN - HOUR, ORIGIN + HOUR])
+    (day,) = resample_channel(timestamps, array("d", [50.0, 60.0]), ORIGIN, 1, max_gap_us=US_PER_DAY)
+    assert day.mean == pytest.approx((50.0 + 60.0 * 23) / 24)
+    assert (day.coverage, day.gap, day.last, day.count) == (1.0, False, 60.0, 1)
+
+
+def test_missing_channel_values_do_not_break_the_carry():
+    timestamps = array("q", [ORIGIN, ORIGIN + HOUR, ORIGIN + 2 * HOUR])
+    columns = {"ch4_pct": (55.0, None, 65.0), "h2s_ppm": (None, None, None)}
+    (day,) = resample_daily("Outlet", timestamps, columns, ORIGIN, 1, max_gap_us=4 * HOUR)
+    assert day.reading_count == 3 and day.day == "2025-10-01"
+    assert day.channels["ch4_pct"].mean == pytest.approx((55.0 * 2 + 65.0 * 4) / 6)
+    assert day.channels["h2s_ppm"].mean is None and day.channels["h2s_ppm"].coverage == 0.0
+
+
+def _ingest(client, *readings):
+    assert client.post("/api/readings/ingest", content=msgpack.encode(list(readings))).status_code == 201
+
+
+def test_days_are_cached_until_readings_land_in_them(client):
+    _ingest(client, *(
+        AnalyzerReading(timestamp=T0 + timedelta(days=d, minutes=15 * i), sample_point="Outlet", ch4_pct=60.0)
+        for d in range(3) for i in range(96)
+    ))
+    flows = [DailyFlowInput(date=f"2025-10-0{d}", biogas_flared_scf_day=1_000_000.0) for d in (1, 2, 3)]
+    assert client.post("/api/flows/ingest", content=msgpack.encode(flows)).status_code == 201
+
+    days = crud.get_resampled_days("Outlet", "2025-10-01", "2025-10-04")
+    assert [d.channels["ch4_pct"].mean for d in days] == [60.0, 60.0, 60.0]
+    assert resample_cache.get("Outlet", "2025-10-02") is days[1]
+
+    # A reading late on Oct 2 drops that day and the next (a value can carry over midnight);
+    # Oct 1 stays cached.
+    _ingest(client, AnalyzerReading(timestamp=T0 + timedelta(days=1, hours=23, minutes=50), sample_point="Outlet",
+                                    ch4_pct=90.0))
+    assert resample_cache.get("Outlet", "2025-10-01") is days[0]
+    assert resample_cache.get("Outlet", "2025-10-02") is None and resample_cache.get("Outlet", "2025-10-03") is None
+
+    report = client.get("/api/reports/emissions", params={"start": "2025-10-01", "end": "2025-10-04"}).json()
+    ch4 = [d["ch4_pct"] for d in report["days"]]
+    assert ch4[0] == 60.0 and ch4[2] == 60.0
+    assert ch4[1] == pytest.approx(60.0 + 30.0 * 10 / (24 * 60))  # 10 minutes at 90 %
+    assert [d["ch4_coverage"] for d in report["days"]] == [1.0, 1.0, 1.0]
+    assert report["days"][1]["reading_count"] == 97
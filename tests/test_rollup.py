@@ -0,0 +1,50 @@
+# --- tests/test_rollup.py ---
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from msgspec import msgpack
+
+from conftest import wipe_db
+from src.gastrack.core.models import AnalyzerReading
+from src.gastrack.db import crud
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def test_rollup_is_maintained_on_ingest_and_matches_rebuild(client):
+    base = datetime(2025, 3, 1, 1, tzinfo=timezone.utc)
+    first = [AnalyzerReading(timestamp=base + timedelta(hours=h), sample_point="Inlet", ch4_pct=50.0 + h)
+             for h in range(3)]
+    second = [
+        AnalyzerReading(timestamp=base + timedelta(hours=5), sample_point="Inlet", ch4_pct=70.0, h2s_ppm=900.0),
+        AnalyzerReading(timestamp=base + timedelta(days=1), sample_point="Inlet"),
+    ]
+    for batch in (first, second):
+        assert client.post("/api/readings/ingest", content=msgpack.encode(batch)).status_code == 201
+
+    response = client.get("/api/readings/daily", params={"sample_point": "Inlet", "start": "2025-03-01"})
+    assert response.status_code == 200
+    day1, day2 = response.json()
+    assert day1["day"] == "2025-03-01" and day1["reading_count"] == 4
+    assert day1["channels"]["ch4_pct"] == {"count": 4, "sum": 223.0, "min": 50.0, "max": 70.0, "mean": 55.75}
+    assert day1["channels"]["h2s_ppm"]["count"] == 1 and day1["channels"]["h2s_ppm"]["min"] == 900.0
+    assert day1["first_timestamp"] == "2025-03-01T01:00:00Z"
+    assert day2["channels"]["ch4_pct"]["mean"] is None
+
+    incremental = crud.get_daily_rollup("Inlet")
+    assert crud.rebuild_daily_rollup() == 2
+    assert crud.get_daily_rollup("Inlet") == incremental
+
+
+def test_failed_ingest_leaves_rollup_untouched(client):
+    reading = AnalyzerReading(timestamp=datetime(2025, 4, 1, tzinfo=timezone.utc), sample_point="Sheet 2", ch4_pct=1.0)
+    assert client.post("/api/readings/ingest", content=msgpack.encode([reading])).status_code == 201
+    assert client.post("/api/readings/ingest", content=msgpack.encode([reading])).status_code == 500  # duplicate id
+
+    (day,) = crud.get_daily_rollup("Sheet 2")
+    assert day.reading_count == 1
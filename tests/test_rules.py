@@ -0,0 +1,106 @@
+# --- tests/test_rules.py ---
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from msgspec import msgpack
+
+from conftest import wipe_db
+from src.gastrack.core.models import AnalyzerReading, ThresholdRule
+from src.gastrack.core.rules import RuleEngine, rule_engine
+from src.gastrack.db.storage import to_epoch_us
+
+BASE = datetime(2025, 5, 1, tzinfo=timezone.utc)
+H2S_MAX = ThresholdRule(key="H2S_MAX", channel="h2s_ppm", op="above", limit=1000)
+H2S_1H = ThresholdRule(key="H2S_1H", channel="h2s_ppm", op="above", limit=500, window_s=3600)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def _readings(values, point="Inlet", minutes=15, start=BASE):
+    return [
+        AnalyzerReading(timestamp=start + timedelta(minutes=minutes * i), sample_point=point, h2s_ppm=v)
+        for i, v in enumerate(values)
+    ]
+
+
+def _engine(*rules, max_gap_s=7200):
+    engine = RuleEngine(max_gap_s=max_gap_s)
+    engine.sync(("test", 0), lambda: list(rules))
+    return engine
+
+
+def _evaluate(engine, readings):
+    return engine.evaluate(readings, [to_epoch_us(r.timestamp) for r in readings], lambda *_: (None, []))
+
+
+def test_instantaneous_rule_opens_tracks_peak_and_closes():
+    engine = _engine(H2S_MAX)
+    (event,) = _evaluate(engine, _readings([900, 1100, 1300, 1200, 800]))
+    assert event.start_us == to_epoch_us(BASE + timedelta(minutes=15))
+    assert (event.peak, event.peak_us) == (1300, to_epoch_us(BASE + timedelta(minutes=30)))
+    assert event.reading_count == 3
+    assert event.end_us == to_epoch_us(BASE + timedelta(minutes=60))
+
+
+def test_window_rule_uses_time_weighted_average():
+    engine = _engine(H2S_1H)
+    # Trailing 1 h average at each reading: -, 0, 500, 666.7, 750, 1000 -> opens at the 4th reading.
+    (event,) = _evaluate(engine, _readings([0, 1000, 1000, 1000, 1000, 1000]))
+    assert event.start_us == to_epoch_us(BASE + timedelta(minutes=45))
+    assert event.peak == pytest.approx(1000.0) and event.end_us is None
+    # Back to 0: the average falls below 500 only after 30 more minutes.
+    (event2,) = _evaluate(engine, _readings([0, 0, 0], start=BASE + timedelta(minutes=90)))
+    assert event2 is event and event.end_us == to_epoch_us(BASE + timedelta(minutes=120))
+
+
+def test_gap_closes_the_open_exceedance_and_late_readings_are_skipped():
+    engine = _engine(H2S_MAX, max_gap_s=3600)
+    (event,) = _evaluate(engine, _readings([1500, 1600]))
+    assert event.end_us is None
+    assert _evaluate(engine, _readings([5000], start=BASE - timedelta(days=1))) == []  # late
+    changed = _evaluate(engine, _readings([1700], start=BASE + timedelta(hours=5)))
+    assert [e.end_us for e in changed] == [to_epoch_us(BASE + timedelta(minutes=15)), None]
+
+
+def test_exceedances_are_persisted_and_survive_a_state_reset(client):
+    spike = _readings([400, 1200, 1500], point="Outlet")
+    assert client.post("/api/readings/ingest", content=msgpack.encode(spike)).status_code == 201
+
+    open_events = client.get("/api/exceedances", params={"sample_point": "Outlet", "open": "true"}).json()
+    assert sorted(e["rule"] for e in open_events) == ["H2S_PPM_1H_AVG", "H2S_PPM_MAX"]
+    (event,) = [e for e in open_events if e["rule"] == "H2S_PPM_MAX"]
+    assert event["peak"] == 1500 and event["end"] is None
+
+    rule_engine.reset()  # e.g. a restart: state is re-seeded from the open event and recent readings
+    tail = _readings([1800, 300], point="Outlet", start=BASE + timedelta(minutes=45))
+    assert client.post("/api/readings/ingest", content=msgpack.encode(tail)).status_code == 201
+
+    events = client.get("/api/exceedances", params={"sample_point": "Outlet", "rule": "H2S_PPM_MAX"}).json()
+    assert [e["id"] for e in events] == [event["id"]]
+    assert events[0]["peak"] == 1800 and events[0]["reading_count"] == 3
+    assert events[0]["end"] == "2025-05-01T01:00:00Z" and events[0]["duration_s"] == 45 * 60
+    still_open = client.get("/api/exceedances", params={"open": "1", "sample_point": "Outlet"}).json()
+    assert [e["rule"] for e in still_open] == ["H2S_PPM_1H_AVG"]  # the hourly average is still above 500
+
+
+def test_threshold_rules_can_be_updated(client):
+    rules = client.get("/api/thresholds").json()
+    assert {"H2S_PPM_MAX", "CH4_PCT_MIN", "O2_PCT_MAX"} <= {r["key"] for r in rules}
+
+    bad = [{"key": "X", "channel": "nope", "op": "above", "limit": 1}]
+    assert client.post("/api/thresholds", json=bad).status_code == 400
+
+    rule = {"key": "CO2_SHEET3", "channel": "co2_pct", "op": "above", "limit": 40, "sample_point": "Sheet 3"}
+    assert client.post("/api/thresholds", json=[rule]).status_code == 201
+    readings = [
+        AnalyzerReading(timestamp=BASE, sample_point="Sheet 3", co2_pct=41.0),
+        AnalyzerReading(timestamp=BASE, sample_point="Sheet 4", co2_pct=41.0),
+    ]
+    assert client.post("/api/readings/ingest", content=msgpack.encode(readings)).status_code == 201
+    events = client.get("/api/exceedances", params={"rule": "CO2_SHEET3"}).json()
+    assert [e["sample_point"] for e in events] == ["Sheet 3"]
@@ -0,0 +1,114 @@
+# --- tests/test_sync.py ---
+import gzip
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from msgspec import msgpack
+
+from conftest import wipe_db
+from src.gastrack.core.models import AnalyzerReading, SyncChanges
+from src.gastrack.db import archive
+from src.gastrack.db.connection import DB_PATH
+
+BASE = datetime(2025, 7, 1, tzinfo=timezone.utc)
+GZIP_MSGPACK = {"Content-Type": "application/msgpack", "Content-Encoding": "gzip"}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db_for_test(client):
+    wipe_db()
+    yield
+    wipe_db()
+
+
+def _readings(n, point="Sheet 1", start=BASE):
+    return [
+        AnalyzerReading(timestamp=start + timedelta(minutes=i), sample_point=point, ch4_pct=55.0)
+        for i in range(n)
+    ]
+
+
+def _push(client, batch_id, readings):
+    return client.post(
+        "/api/sync/push", params={"batch_id": batch_id, "device": "phone-1"},
+        content=gzip.compress(msgpack.encode(readings)), headers=GZIP_MSGPACK,
+    )
+
+
+def _pull(client, **params):
+    response = client.get(
+        "/api/sync/pull", params=params, headers={"Accept": "application/msgpack", "Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    return response, msgpack.decode(response.content, type=SyncChanges)  # httpx already gunzipped it
+
+
+def test_push_is_idempotent_per_batch_id(client):
+    batch = _readings(50)
+    first = _push(client, "dev1-0001", batch)
+    assert first.status_code == 201
+    assert first.json() == {"batch_id": "dev1-0001", "status": "applied", "received": 50, "inserted": 50, "duplicates": 0}
+
+    replay = _push(client, "dev1-0001", batch)
+    assert replay.status_code == 200
+    assert replay.json()["status"] == "replayed" and replay.json()["inserted"] == 50
+
+    # Same readings under a new batch id (the device lost its outbox state): nothing stored twice.
+    overlap = _push(client, "dev1-0002", batch[40:] + _readings(5, start=BASE + timedelta(hours=1)))
+    assert overlap.json() | {"batch_id": None} == {
+        "batch_id": None, "status": "applied", "received": 15, "inserted": 5, "duplicates": 10,
+    }
+
+
+def test_pull_returns_only_changes_after_the_cursor(client):
+    response, changes = _pull(client, since=0)
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(changes.readings) == 55 and not changes.more
+    cursor = changes.cursor
+
+    _, nothing_new = _pull(client, since=cursor)
+    assert nothing_new.readings == [] and nothing_new.cursor == cursor
+
+    # Readings arriving through the regular ingest endpoint are part of the change feed too.
+    later = _readings(3, point="Inlet", start=BASE + timedelta(days=1)) + _readings(2, point="Outlet")
+    assert client.post("/api/readings/ingest", content=msgpack.encode(later)).status_code == 201
+    _, delta = _pull(client, since=cursor, sample_point="Inlet")
+    assert [r.id for r in delta.readings] == [r.id for r in later[:3]]
+    assert delta.cursor == cursor + 5
+
+    _, page = _pull(client, since=0, limit=20)
+    assert len(page.readings) == 20 and page.more and page.cursor == 20
+
+
+def test_push_rejects_bad_requests(client):
+    assert client.post("/api/sync/push", content=msgpack.encode([])).status_code == 400  # no batch_id
+    bad_gzip = client.post("/api/sync/push", params={"batch_id": "x"}, content=b"not gzip", headers=GZIP_MSGPACK)
+    assert bad_gzip.status_code == 400
+    brotli = client.post(
+        "/api/sync/push", params={"batch_id": "x"}, content=b"", headers={"Content-Encoding": "br"},
+    )
+    assert brotli.status_code == 415
+    assert client.get("/api/sync/pull", params={"since": "abc"}).status_code == 400
+
+
+def test_uuid_ids_survive_the_round_trip(client):
+    reading = AnalyzerReading(timestamp=BASE, sample_point="Sheet 6", id=uuid.uuid4(), h2s_ppm=3.0)
+    assert _push(client, "dev2-0001", [reading]).status_code == 201
+    _, changes = _pull(client, since=0, sample_point="Sheet 6")
+    assert changes.readings == [reading]
+
+
+def test_readings_already_archived_are_duplicates(client, tmp_path):
+    old = BASE.replace(year=2024, month=3)
+    batch = _readings(20, point="Sheet 5", start=old)
+    assert _push(client, "dev3-0001", batch).status_code == 201
+    assert archive.archive_months("2024-04", DB_PATH, archive_dir=tmp_path, vacuum=False) == [("2024-03", 20)]
+
+    # The device lost its outbox state and sends the month again, plus one new reading.
+    again = _push(client, "dev3-0002", batch + _readings(1, point="Sheet 5", start=old + timedelta(days=1)))
+    assert again.json() | {"batch_id": None} == {
+        "batch_id": None, "status": "applied", "received": 21, "inserted": 1, "duplicates": 20,
+    }
+    page = client.get("/api/readings", params={"sample_point": "Sheet 5", "limit": 100}).json()
+    assert len(page["items"]) == 21  # hot and archived rows, none twice
@@ -0,0 +1,101 @@
+# --- tests/test_write_queue.py ---
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from conftest import wipe_db
+from src.gastrack.core.models import AnalyzerReading
+from src.gastrack.db import connection, crud, write_queue
+from src.gastrack.db.executor import DBExecutor
+from src.gastrack.db.write_queue import ReadingWriteQueue
+
+
+def _readings(n):
+    return [AnalyzerReading(timestamp=datetime.now(timezone.utc), sample_point="Inlet") for _ in range(n)]
+
+
+class RecordingWriter:
+    """Stands in for crud.ingest_analyzer_reading_batches; fails batches of exactly 2 rows."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, batches):
+        self.calls.append([len(b) for b in batches])
+        return [ValueError("bad batch") if len(b) == 2 else len(b) for b in batches]
+
+
+async def test_concurrent_submits_share_one_commit():
+    writer = RecordingWriter()
+    queue = ReadingWriteQueue(max_batch_rows=1000, max_delay_ms=50, write_fn=writer).start()
+
+    results = await asyncio.gather(
+        queue.submit(_readings(1)), queue.submit(_readings(3)), queue.submit(_readings(2)),
+        return_exceptions=True,
+    )
+    await queue.stop()
+
+    assert writer.calls == [[1, 3, 2]]
+    assert results[0] == 1 and results[1] == 3
+    assert isinstance(results[2], ValueError)  # only the bad caller sees the failure
+
+
+@pytest.fixture
+def traced_sql(client, monkeypatch):
+    """SQL statements run on freshly pooled connections, and an executor for this test's event loop."""
+    wipe_db()
+    statements = []
+    connect = connection._connect
+
+    def traced_connect(db_path):
+        conn = connect(db_path)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(connection, "_connect", traced_connect)
+    connection.close_pool()
+    connection.open_pool()
+    executor = DBExecutor().start()
+    monkeypatch.setattr(write_queue, "get_executor", lambda: executor)
+    yield statements
+    executor.shutdown()
+    monkeypatch.undo()
+    wipe_db()
+
+
+async def test_real_writes_commit_once_per_flush(traced_sql):
+    queue = ReadingWriteQueue(
+        max_batch_rows=1000, max_delay_ms=50, write_fn=crud.ingest_analyzer_reading_batches,
+    ).start()
+    results = await asyncio.gather(*(queue.submit(_readings(n)) for n in (1, 3, 2)))
+    await queue.stop()
+
+    assert results == [1, 3, 2]
+    transaction = [sql for sql in traced_sql if sql.startswith(("BEGIN", "SAVEPOINT", "RELEASE", "COMMIT"))]
+    assert transaction == [
+        "BEGIN IMMEDIATE", "SAVEPOINT batch_0", "RELEASE batch_0", "SAVEPOINT batch_1", "RELEASE batch_1",
+        "SAVEPOINT batch_2", "RELEASE batch_2", "COMMIT",
+    ]
+
+
+async def test_flushes_when_row_limit_reached():
+    writer = RecordingWriter()
+    queue = ReadingWriteQueue(max_batch_rows=3, max_delay_ms=10_000, write_fn=writer).start()
+
+    assert await asyncio.wait_for(asyncio.gather(queue.submit(_readings(3))), timeout=1) == [3]
+    await queue.stop()
+
+
+async def test_enqueue_mode_acknowledges_before_commit():
+    writer = RecordingWriter()
+    queue = ReadingWriteQueue(max_delay_ms=10_000, durability="enqueue", write_fn=writer).start()
+
+    assert await queue.submit(_readings(4)) == 4
+    assert writer.calls == []
+    await queue.stop()  # stop() flushes what is still queued
+    assert writer.calls == [[4]]
+
+
+def test_rejects_unknown_durability():
+    with pytest.raises(ValueError):
+        ReadingWriteQueue(durability="sometimes")